@@ -6,36 +6,76 @@
 # 版本：V1.0
 # 变更历史:
 # 1，2018-08-20， 吴扬波——首次创建：CMW500类，用于CMW500通用参数设置等
+# 2，2026-10-18， 吴扬波——仪器引用封装为Instrument，操作完成等待改为阻塞*OPC?
+# 3，2026-10-18， 吴扬波——增加设置项联动关系，用于影子缓存失效
+# 4，2026-10-18， 吴扬波——增加verify_settings属性，各制式模块回读生效的频段、信道
+# 5，2026-10-18， 吴扬波——增加load_correction_table，由线损文件生成多点线损表，内容未变时不重新创建
+# 6，2026-10-18， 吴扬波——增加热启动：保存已写入设置项的快照，校验一致时跳过*RST，只写入变化的设置项
+# 7，2026-10-18， 吴扬波——连接改用visa_backend共享会话，链路断开时自动重连，连接失败时抛出异常
+# 8，2026-10-18， 吴扬波——快照默认保存在用例脚本所在文件夹下，与用例执行文件夹并列，不随当前工作目录变化
+# 9，2026-10-18， 吴扬波——线损表先以EXISt?确认存在再查询DETails?，首次运行不查询不存在的线损表
+# 10，2026-10-18， 吴扬波——热启动说明改为实际跳过的操作，快照只在用例正常结束时保存
 # 若引用或修改API，请保留API变更历史。
 ###############################################################################
 
-import visa
-from Utility import pylogger
+from Utility import pylogger, visa_backend, instrument, cable_loss
 import lte
-import time
 import wcdma
 import gsm
 from datetime import datetime
-
+import os
+import sys
+
+# 设置项联动关系：频段、带宽、连接类型改变时，仪器会自动调整信道、RB配置，需清除对应缓存
+DEPENDENT_SETTINGS = {
+    'CONF:LTE:SIGN:BAND': ('CONF:LTE:SIGN:RFS:CHAN',),
+    'CONF:LTE:SIGN:CELL:BAND:DL': ('CONF:LTE:SIGN:CONN:RMC',),
+    'CONF:LTE:SIGN:CONN:STYP': ('CONF:LTE:SIGN:CONN:RMC',),
+    'CONF:GSM:SIGN:BAND:BCCH': ('CONF:GSM:SIGN:RFS:CHAN',),
+}
+# 设置项快照所在的文件夹名，位于用例脚本所在文件夹下
+SNAPSHOT_FOLDER = 'instrument_state'
+# 热启动时回读校验快照的设置项，与快照不一致（如面板上修改过）时复位
+FINGERPRINT_SETTINGS = (
+    'ROUT:LTE:SIGN:SCEN:SCEL',
+    'CONF:LTE:SIGN:BAND', 'CONF:LTE:SIGN:RFS:CHAN:DL', 'CONF:LTE:SIGN:CELL:BAND:DL',
+    'CONF:GSM:SIGN:BAND:BCCH', 'CONF:GSM:SIGN:RFS:CHAN:BCCH',
+)
 
 class CMW500(object):
     '''
     CMW500类，用于CMW500通用参数设置等。
     '''
 
-    def __init__(self, ip):
+    def __init__(self, ip, warm_start=False, snapshot_folder=None):
         '''
-        初始化日志、仪器连接、复位
+        初始化日志、仪器连接、复位。
+        ip：仪器的ip地址；
+        warm_start：是否热启动，上次写入的设置项快照与仪器一致时跳过*RST，与快照相同的设置项不再写入；
+        各制式任务结束时关闭小区，使终端切换到下一制式，因此小区开启、终端附着不能跳过；
+        snapshot_folder：设置项快照所在的文件夹，默认为用例脚本所在文件夹下的SNAPSHOT_FOLDER。
         '''
         self.logger = pylogger.setup_logger(self.__class__.__name__)
 
         # 与仪器通过VXI协议建立连接
         self._inst = self._connect(ip)
-        self.reset()
+        if snapshot_folder is None:
+            snapshot_folder = os.path.join(sys.path[0], SNAPSHOT_FOLDER)
+        snapshot_file = os.path.join(snapshot_folder, 'CMW500_%s.json' % ip)
+        self.warm_started = self._inst.enable_snapshot(snapshot_file, FINGERPRINT_SETTINGS,
+                                                       warm_start)
+        if self.warm_started:
+            self.logger.info('Warm start, settings restored from %s.' % snapshot_file)
+        else:
+            if warm_start:
+                self.logger.info('Snapshot missing or changed, reset.')
+            self.reset()
 
         # 射频物理链路实例变量
         self.converter = ''
         self.connector = ''
+        # 各制式模块设置频段、信道后是否回读仪器生效的配置值，默认由本地频段表计算，不回读
+        self.verify_settings = False
 
     def start_trace(self):
         '''
@@ -60,58 +100,53 @@ class CMW500(object):
         '''
         该方法用于实例化LTE模块实例。
         '''
-        self.lte = lte.LTE(self._inst, self.connector, self.converter)
+        self.lte = lte.LTE(self._inst, self.connector, self.converter, self.verify_settings)
 
     def init_wcdma(self):
         '''
         该方法用于实例化WCDMA模块实例。
         '''
-        self.wcdma = wcdma.WCDMA(self._inst, self.connector, self.converter)
+        self.wcdma = wcdma.WCDMA(self._inst, self.connector, self.converter,
+                                 self.verify_settings)
 
     def init_gsm(self):
         '''
         该方法用于实例化GSM模块实例。
         '''
-        self.gsm = gsm.GSM(self._inst, self.connector, self.converter)
+        self.gsm = gsm.GSM(self._inst, self.connector, self.converter, self.verify_settings)
 
     def _connect(self, ip):
         '''
         该方法用于与仪器建立连接并返回控制实例。
         ip：仪器的ip地址；
-        返回仪器引用。
+        返回仪器引用，连接失败时抛出visa_backend.SessionError。
         '''
-        rm = visa.ResourceManager()
         dev_addr = 'TCPIP0::%s::inst0::INSTR' % ip
         try:
-            inst = rm.open_resource(dev_addr)
-            self.logger.info('connect successfully!')
-            # 设置仪器返回值终止符，visa会自动去除终止符
-            inst.read_termination = '\n'
-            # 设置等待仪器返回超时时间为10s
-            inst.timeout = 10000
-            return inst
-
-        except Exception, e:
+            inst = visa_backend.open_session(dev_addr, self.__class__.__name__)
+        except visa_backend.SessionError, e:
             self.logger.error('connect failed!')
             self.logger.error(e)
+            raise
+        self.logger.info('connect successfully!')
+        # 设置仪器返回值终止符，visa会自动去除终止符
+        inst.read_termination = '\n'
+        # 设置等待仪器返回超时时间为10s
+        inst.timeout = 10000
+        return instrument.Instrument(inst, self.__class__.__name__, DEPENDENT_SETTINGS)
 
     def reset(self):
         '''
         该方法用于复位仪器参数至默认值。
         '''
         self._inst.write('*RST')
-        self._wait_for_operation_done()
+        self._inst.wait_for_operation_done()
 
-    def _wait_for_operation_done(self):
+    def save_snapshot(self):
         '''
-        该方法用于等待仪器完成操作，用于设置参数的方法后。
+        该方法用于保存已写入设置项的快照，供下次热启动使用，只在用例正常执行结束时调用。
         '''
-        done = False
-        while not done:
-            temp = self._inst.query('*OPC?')
-            if not cmp(temp.strip(), '1'):
-                done = True
-            time.sleep(0.1)
+        self._inst.save_snapshot()
 
     def set_signal_routing(self, connector, converter):
         '''
@@ -130,15 +165,48 @@ class CMW500(object):
         f1，f2，为线损表两端的频率；
         corr1，corr2为线损表两端的补偿值。
         '''
-        table_name = "'custom'"
-        self._inst.write("CONFigure:BASE:FDCorrection:CTABle:CREate %s, %sMHz, %s, %sMHz, %s" %
-                         (table_name, f1, corr1, f2, corr2))
-        self._wait_for_operation_done()
-        self.logger.debug(
-            self._inst.query("CONFigure:BASE:FDCorrection:CTABle:DETails? %s" % table_name))
-        self.logger.info('Create correction table.')
-        self._inst.write("CONFigure:FDCorrection:ACTivate RF%sC, %s, RXTX, RF%s" %
+        self.set_correction_points([(float(f1), float(corr1)), (float(f2), float(corr2))],
+                                   'custom')
+
+    def load_correction_table(self, file_name):
+        '''
+        该方法用于由线损文件配置当前信号链路的线损表，需在set_signal_routing之后调用。
+        文件格式见cable_loss.load，线损表以信号链路命名，如'RF1C_RX1'。
+        file_name：线损文件名；
+        文件中没有当前信号链路的测量点时抛出cable_loss.CableLossError。
+        '''
+        points = cable_loss.get_points(cable_loss.load(file_name), self.connector, self.converter)
+        if not points:
+            raise cable_loss.CableLossError('%s: no points for RF%sC, RX%s'
+                                            % (file_name, self.connector, self.converter))
+        self.set_correction_points(points, cable_loss.table_name(self.connector, self.converter))
+
+    def set_correction_points(self, points, table_name):
+        '''
+        该方法用于配置多点线损表，并在当前信号链路上启用。
+        仪器中已有同名且内容相同的线损表时（线损表不随*RST清除），只需查询是否存在及内容，不重新创建。
+        线损表不存在时查询DETails?会报错，先以EXISt?确认。
+        points：[(频率(MHz), 线损(dB)), ...]，按频率排序；
+        table_name：线损表名称。
+        '''
+        points_hz = cable_loss.to_hz(points)
+        details = None
+        exists = self._inst.query("CONFigure:BASE:FDCorrection:CTABle:EXISt? '%s'" % table_name)
+        if exists.strip().upper() in ('1', 'ON'):
+            details = cable_loss.parse_details(self._inst.query(
+                "CONFigure:BASE:FDCorrection:CTABle:DETails? '%s'" % table_name))
+        if details is not None and \
+                cable_loss.table_hash(details) == cable_loss.table_hash(points_hz):
+            self.logger.info('Reuse correction table %s, %d points.' % (table_name, len(points)))
+        else:
+            with self._inst.batch():
+                for message in cable_loss.format_commands(table_name, points_hz):
+                    self._inst.write(message)
+                self._inst.wait_for_operation_done()
+            self.logger.info('Create correction table %s, %d points.' % (table_name, len(points)))
+        self._inst.write("CONFigure:FDCorrection:ACTivate RF%sC, '%s', RXTX, RF%s" %
                          (self.connector, table_name, self.converter))
-        self._wait_for_operation_done()
-        self.logger.debug('correction table:' + self._inst.query
-        ("CONFigure:FDCorrection:USAGe?  RF%sC,RF%s" % (self.connector, self.converter)))
+        self._inst.wait_for_operation_done()
+        if self.verify_settings:
+            self.logger.debug('correction table:' + self._inst.query(
+                "CONFigure:FDCorrection:USAGe? RF%sC, RF%s" % (self.connector, self.converter)))
@@ -6,28 +6,45 @@
 # 版本：V1.0
 # 变更历史:
 # 1，2018-08-20， 吴扬波——首次创建：GSM类，用于GSM信号模块配置、测量等
+# 2，2026-10-18， 吴扬波——操作完成等待改用Instrument.wait_for_operation_done
+# 3，2026-10-18， 吴扬波——信道、切换、测量配置改为批量写入
+# 4，2026-10-18， 吴扬波——状态等待改用wait.wait_until，增加超时及恢复操作
+# 5，2026-10-18， 吴扬波——频段代码由bands查表，BCCH、TCH的频段及信道在本地记录，回读改为verify模式
+# 6，2026-10-18， 吴扬波——verify模式的回读绕过影子缓存，直接查询仪器
 # 若引用或修改API，请保留API变更历史。
 ###############################################################################
-from Utility import pylogger
+from Utility import pylogger, wait, bands
 import time
 
+# 状态等待的超时，单位秒
+OUTPUT_TIMEOUT = 30
+SYNCHRONIZE_TIMEOUT = 60
+CONNECT_TIMEOUT = 60
+HANDOVER_TIMEOUT = 30
+MEASUREMENT_TIMEOUT = 30
+
 
 class GSM(object):
     '''
     GSM类，用于GSM信号模块配置、测量等。
     '''
 
-    def __init__(self, inst, connector, converter):
+    def __init__(self, inst, connector, converter, verify=False):
         '''
         初始化配置参数实例变量、信号路由、测量配置。
+        verify：是否回读仪器生效的配置值，与本地计算的结果比较，不一致时记录警告。
         '''
         self.logger = pylogger.setup_logger(self.__class__.__name__)
         self._inst = inst
+        self.verify = verify
         self.set_signal_routing(connector, converter)
         self.bcch_band = ''
         self.bcch_dl_channel = ''
+        # TCH的频段、信道，为''时表示未知，需要时由仪器查询
         self.tch_band = ''
         self.tch_dl_channel = ''
+        # 仪器当前的band indicator，未查询时为None
+        self._band_indicator = None
         self._switch_off_ps_domain()
         self._config_measurement()
 
@@ -41,17 +58,6 @@ class GSM(object):
                          % (connector, converter, connector, converter))
         self.logger.debug('GSM route: ' + self._inst.query('ROUTe:WCDMa:SIGN:SCENario:SCELl?'))
 
-    def _wait_for_operation_done(self):
-        '''
-        该方法用于等待仪器完成操作，用于设置参数的方法后。
-        '''
-        done = False
-        while not done:
-            temp = self._inst.query('*OPC?')
-            if not cmp(temp, '1'):
-                done = True
-            time.sleep(0.1)
-
     def enable_output(self):
         '''
         该方法用于使能GSM信号输出。
@@ -59,88 +65,107 @@ class GSM(object):
         state = self._inst.query('SOURce:GSM:SIGN:CELL:STATe:ALL?')
         if not state.startswith('ON'):
             self._inst.write('SOURce:GSM:SIGN:CELL:STATe ON')
-            while True:
-                state = self._inst.query('SOURce:GSM:SIGN:CELL:STATe:ALL?')
-                if state.startswith('ON,ADJ'):
-                    self.logger.info('Output on.')
-                    break
-                time.sleep(0.1)
+            wait.wait_until('GSM output on', self._query_cell_state,
+                            lambda state: state.startswith('ON,ADJ'), OUTPUT_TIMEOUT,
+                            logger=self.logger)
+            self.logger.info('Output on.')
 
     def disable_output(self):
         '''
         该方法用于关闭GSM信号输出。
         '''
         self._inst.write('SOURce:GSM:SIGN:CELL:STATe OFF')
-        is_output_disable = False
-        while not is_output_disable:
-            state = self._inst.query('SOURce:GSM:SIGN:CELL:STATe:ALL?')
-            if state.startswith('OFF,ADJ'):
-                is_output_disable = True
-                self.logger.info('Output off.')
-            time.sleep(0.1)
+        wait.wait_until('GSM output off', self._query_cell_state,
+                        lambda state: state.startswith('OFF,ADJ'), OUTPUT_TIMEOUT,
+                        logger=self.logger)
+        self.logger.info('Output off.')
+
+    def _restart_cell(self):
+        '''
+        该方法用于关闭再打开小区，使UE重新同步网络，作为同步超时的恢复操作。
+        '''
+        self.disable_output()
+        self.enable_output()
+
+    def _query_cell_state(self):
+        return self._inst.query('SOURce:GSM:SIGN:CELL:STATe:ALL?')
+
+    def _query_cs_state(self):
+        return self._inst.query('FETCh:GSM:SIGN:CSWitched:STATe?')
 
-    def synchronize(self):
+    def synchronize(self, timeout=SYNCHRONIZE_TIMEOUT, retries=1):
         '''
         该方法用于等待UE同步网络。
+        timeout：单次等待的超时，单位秒；
+        retries：超时后关闭再打开小区、重新等待的最多次数，仍未同步时抛出wait.WaitTimeout。
         '''
-        state = self._inst.query('FETCh:GSM:SIGN:CSWitched:STATe?')
+        state = self._query_cs_state()
         if not (state.startswith('SYNC') or state.startswith('CEST')):
-            while True:
-                state = self._inst.query('FETCh:GSM:SIGN:CSWitched:STATe?')
-                if state.startswith('SYNC'):
-                    self.logger.info('UE synchronizes successfully!')
-                    break
-                time.sleep(0.1)
+            wait.wait_until('GSM synchronize', self._query_cs_state,
+                            lambda state: state.startswith('SYNC'), timeout,
+                            self._restart_cell, retries, self.logger)
+            self.logger.info('UE synchronizes successfully!')
 
-    def setup_cs_connection(self):
+    def setup_cs_connection(self, timeout=CONNECT_TIMEOUT, retries=1):
         '''
         该方法用于建立UE与网络的CS域连接。
+        timeout：单次等待的超时，单位秒；
+        retries：超时后重新发起连接的最多次数，仍未连接时抛出wait.WaitTimeout。
         '''
-        state = self._inst.query('FETCh:GSM:SIGN:CSWitched:STATe?')
+        state = self._query_cs_state()
         if not state.startswith('CEST'):
             self._inst.write('CALL:GSM:SIGN:CSWitched:ACTion CONNect')
-            while True:
-                state = self._inst.query('FETCh:GSM:SIGN:CSWitched:STATe?')
-                if state.startswith('CEST'):
-                    self.logger.info('CS domain establishes successfully!')
-                    break
-                time.sleep(0.1)
+            wait.wait_until('GSM CS connection', self._query_cs_state,
+                            lambda state: state.startswith('CEST'), timeout,
+                            lambda: self._inst.write('CALL:GSM:SIGN:CSWitched:ACTion CONNect'),
+                            retries, self.logger)
+            self.logger.info('CS domain establishes successfully!')
 
     def set_bcch_downlink_channel(self, band, dl_channel):
         '''
         该方法用于设置bcch的频段和下行通道。
         band：频段，如使用GSM850，则传入参数‘GSM850’；
         dl_channel：信道号，如使用信道128，则传入参数‘128’；
-        '''
-        # 设置bcch频段
-        symbol = {'GSM850': 'G085', 'GSM900': 'G09', 'DCS1800': 'G18', 'PCS1900': 'G19'}
-        self._inst.write('CONFigure:GSM:SIGN:BAND:BCCH %s' % symbol[band])
-        self._wait_for_operation_done()
-        # 设置bcch信道
-        self._inst.write('CONFigure:GSM:SIGN:RFSettings:CHANnel:BCCH %s' % dl_channel)
-        self._wait_for_operation_done()
+        频段、信道不合法时抛出bands.ChannelError。
+        '''
+        channel = bands.gsm_channel(band, dl_channel)
+        with self._inst.batch():
+            # 设置bcch频段
+            self._inst.write('CONFigure:GSM:SIGN:BAND:BCCH %s' % channel.band_code)
+            self._inst.wait_for_operation_done()
+            # 设置bcch信道
+            self._inst.write('CONFigure:GSM:SIGN:RFSettings:CHANnel:BCCH %s' % dl_channel)
+            self._inst.wait_for_operation_done()
 
-        # 根据仪器返回值修改信道实例变量
-        result = self._inst.query('CONFigure:GSM:SIGN:BAND:BCCH?')
-        for key, val in symbol.items():
-            if not cmp(result, val):
-                self.bcch_band = key
-        self.bcch_dl_channel = self._inst.query('CONFigure:GSM:SIGN:RFSettings:CHANnel:BCCH?')
+        self.bcch_band = band
+        self.bcch_dl_channel = dl_channel
+        # 未建立通话时TCH与BCCH位于同一频段
+        self.tch_band = band
+        if self.verify:
+            band_code = self._inst.query_uncached('CONFigure:GSM:SIGN:BAND:BCCH?')
+            dl_channel = self._inst.query_uncached('CONFigure:GSM:SIGN:RFSettings:CHANnel:BCCH?')
+            if band_code != channel.band_code or int(dl_channel) != channel.dl_channel:
+                self.logger.warning('BCCH read back %s, %s, expected %s, %s'
+                                    % (band_code, dl_channel, channel.band_code,
+                                       self.bcch_dl_channel))
+                self.bcch_band = bands.GSM_BANDS_BY_CODE.get(band_code, band_code)
+                self.bcch_dl_channel = dl_channel
         self.logger.info('Set BCCH --- @BAND: %s,DLCH: %s' % (self.bcch_band, self.bcch_dl_channel))
 
     def set_tch_downlink_channel(self, dl_channel):
         '''
         该方法用于设置tch的频段和下行通道。
         dl_channel：信道号，如使用信道128，则传入参数‘128’；
+        信道不属于当前TCH频段时抛出bands.ChannelError。
         '''
-        symbol = {'GSM850': 'G085', 'GSM900': 'G09', 'DCS1800': 'G18', 'PCS1900': 'G19'}
+        tch_band = self._get_tch_band()
+        bands.gsm_channel(tch_band, dl_channel)
         self._inst.write('CONFigure:GSM:SIGN:RFSettings:CHANnel:TCH %s' % dl_channel)
-        self._wait_for_operation_done()
-        result = self._inst.query('SENSe:GSM:SIGN:BAND:TCH?')
-        for key, val in symbol.items():
-            if not cmp(result, val):
-                self.tch_band = key
-        self.tch_dl_channel = self._inst.query('CONFigure:GSM:SIGN:RFSettings:CHANnel:TCH?')
+        self._inst.wait_for_operation_done()
+        self.tch_band = tch_band
+        self.tch_dl_channel = dl_channel
+        if self.verify:
+            self._verify_tch()
         self.logger.info('Set TCH --- @BAND: %s,DLCH: %s' % (self.tch_band, self.tch_dl_channel))
 
     def set_bcch_level(self, level):
@@ -149,7 +174,7 @@ class GSM(object):
         level：bcch信号电平，例如设置成-80dbm，则传入参数为‘-85’。
         '''
         self._inst.write('CONFigure:GSM:SIGN:RFSettings:LEVel:BCCH %s' % level)
-        self._wait_for_operation_done()
+        self._inst.wait_for_operation_done()
         self.logger.info('Set BCCH level: %s'
                          % self._inst.query('CONFigure:GSM:SIGN:RFSettings:LEVel:BCCH?'))
 
@@ -159,7 +184,7 @@ class GSM(object):
         level：tch信号电平，例如设置成-80dbm，则传入参数为‘-85’。
         '''
         self._inst.write('CONFigure:GSM:SIGN:RFSettings:LEVel:TCH %s' % level)
-        self._wait_for_operation_done()
+        self._inst.wait_for_operation_done()
         self.logger.info('Set TCH level: %s'
                          % self._inst.query('CONFigure:GSM:SIGN:RFSettings:LEVel:TCH?'))
 
@@ -181,17 +206,45 @@ class GSM(object):
         '''
         self._inst.write('CONFigure:GSM:SIGN:CELL:BSPamfrms %s' % frames)
 
+    def _get_tch_band(self):
+        '''
+        返回TCH的频段，本地未记录时由仪器查询，verify模式下绕过影子缓存。
+        '''
+        if not self.tch_band:
+            query = self._inst.query_uncached if self.verify else self._inst.query
+            band_code = query('SENSe:GSM:SIGN:BAND:TCH?')
+            self.tch_band = bands.GSM_BANDS_BY_CODE.get(band_code, '')
+        return self.tch_band
+
+    def _verify_tch(self):
+        '''
+        该方法用于回读TCH的频段、信道，与本地记录不一致时记录警告，并以仪器的值为准。
+        '''
+        band_code = self._inst.query_uncached('SENSe:GSM:SIGN:BAND:TCH?')
+        dl_channel = self._inst.query_uncached('CONFigure:GSM:SIGN:RFSettings:CHANnel:TCH?')
+        expected_code = bands.GSM_BAND_CODES.get(self.tch_band)
+        if band_code != expected_code or int(dl_channel) != int(self.tch_dl_channel):
+            self.logger.warning('TCH read back %s, %s, expected %s, %s'
+                                % (band_code, dl_channel, expected_code, self.tch_dl_channel))
+            self.tch_band = bands.GSM_BANDS_BY_CODE.get(band_code, '')
+            self.tch_dl_channel = dl_channel
+
     def _set_band_indicator(self, band):
         '''
         该方法用于配置频段indicator，在切换至1800或1900时，必须得修改该参数。
         '''
-        symbol = {'GSM850': 'NA', 'GSM900': 'NA', 'DCS1800': 'G18', 'PCS1900': 'G19'}
-        result = self._inst.query('CONFigure:GSM:SIGN:CELL:BINDicator?')
-        if cmp(symbol[band], 'NA'):
-            if cmp(symbol[band], result):
-                self._inst.write('CONFigure:GSM:SIGN:CELL:BINDicator %s' % symbol[band])
-                time.sleep(5)
-                self._wait_for_operation_done()
+        indicator = bands.GSM_BAND_INDICATORS[band]
+        if indicator is None:
+            return
+        if self.verify:
+            self._band_indicator = self._inst.query_uncached('CONFigure:GSM:SIGN:CELL:BINDicator?')
+        elif self._band_indicator is None:
+            self._band_indicator = self._inst.query('CONFigure:GSM:SIGN:CELL:BINDicator?')
+        if cmp(indicator, self._band_indicator):
+            self._inst.write('CONFigure:GSM:SIGN:CELL:BINDicator %s' % indicator)
+            time.sleep(5)
+            self._inst.wait_for_operation_done()
+            self._band_indicator = indicator
 
     def set_tch_pcl(self, pcl):
         '''
@@ -199,60 +252,71 @@ class GSM(object):
         pcl：tch功率等级，例如设置功率等级为5，则传入参数为‘5’。
         '''
         self._inst.write('CONFigure:GSM:SIGN:RFSettings:PCL:TCH:CSWitched %s' % pcl)
-        self._wait_for_operation_done()
+        self._inst.wait_for_operation_done()
         self.logger.info('Set TCH PCL as %s' % pcl)
 
     def handover(self, band, dl_channel):
         '''
         该方法用于频段之间的切换。
-        '''
-        symbol = {'GSM850': 'G085', 'GSM900': 'G09', 'DCS1800': 'G18', 'PCS1900': 'G19'}
-        tch_channel = self._inst.query('CONFigure:GSM:SIGN:RFSettings:CHANnel:TCH?')
-        tch_band = self._inst.query('SENSe:GSM:SIGN:BAND:TCH?')
-        if cmp(symbol[band], tch_band):
+        频段、信道不合法时抛出bands.ChannelError。
+        '''
+        channel = bands.gsm_channel(band, dl_channel)
+        if self.verify:
+            self.tch_dl_channel = self._inst.query_uncached(
+                'CONFigure:GSM:SIGN:RFSettings:CHANnel:TCH?')
+            self.tch_band = ''
+        elif not self.tch_dl_channel:
+            self.tch_dl_channel = self._inst.query('CONFigure:GSM:SIGN:RFSettings:CHANnel:TCH?')
+        if cmp(band, self._get_tch_band()):
             self._set_band_indicator(band)
-            self._inst.write('PREPare:GSM:SIGN:HANDover:TARGet %s' % symbol[band])
-            self._wait_for_operation_done()
-            self._inst.write('PREPare:GSM:SIGN:HANDover:CHANnel:TCH %s' % dl_channel)
-            self._wait_for_operation_done()
-            self._inst.write('PREPare:GSM:SIGN:HANDover:LEVel:TCH -80')
-            self._wait_for_operation_done()
-            self._inst.write('PREPare:GSM:SIGN:HANDover:TSLot 3')
-            self._wait_for_operation_done()
+            with self._inst.batch():
+                self._inst.write('PREPare:GSM:SIGN:HANDover:TARGet %s' % channel.band_code)
+                self._inst.wait_for_operation_done()
+                self._inst.write('PREPare:GSM:SIGN:HANDover:CHANnel:TCH %s' % dl_channel)
+                self._inst.wait_for_operation_done()
+                self._inst.write('PREPare:GSM:SIGN:HANDover:LEVel:TCH -80')
+                self._inst.wait_for_operation_done()
+                self._inst.write('PREPare:GSM:SIGN:HANDover:TSLot 3')
+                self._inst.wait_for_operation_done()
             self._inst.write('CALL:GSM:SIGN:HANDover:STARt')
-            while True:
-                state = self._inst.query('FETCh:GSM:SIGN:CSWitched:STATe?')
-                if state.startswith('CEST'):
-                    self.logger.debug('Handover --> %s'
-                                      % self._inst.query('SENSe:GSM:SIGN:BAND:TCH?'))
-                    self.logger.info('Handover @BAND: OB%s,DLCH: %s' % (band, dl_channel))
-                    break
-                time.sleep(0.1)
-        elif cmp(tch_channel, dl_channel):
+            wait.wait_until('GSM handover', self._query_cs_state,
+                            lambda state: state.startswith('CEST'), HANDOVER_TIMEOUT,
+                            logger=self.logger)
+            self.tch_band = band
+            self.tch_dl_channel = dl_channel
+            if self.verify:
+                self._verify_tch()
+            self.logger.info('Handover @BAND: OB%s,DLCH: %s' % (band, dl_channel))
+        elif int(self.tch_dl_channel) != channel.dl_channel:
             self._inst.write('CONFigure:GSM:SIGN:RFSettings:CHANnel:TCH %s' % dl_channel)
+            self.tch_dl_channel = dl_channel
             self.logger.info('@BAND: OB%s,DLCH: %s' % (band, dl_channel))
 
     def _config_measurement(self):
         '''
         该方法用于测量参数配置。
         '''
-        # 测量参数关联GSM信号发生器
-        self._inst.write("ROUTe:GSM:MEAS:SCENario:CSPath 'GSM Sig1'")
-        # 设置单次测量-默认
-        self._inst.write('CONFigure:GSM:MEAS:MEValuation:REPetition SINGleshot')
+        with self._inst.batch():
+            # 测量参数关联GSM信号发生器
+            self._inst.write("ROUTe:GSM:MEAS:SCENario:CSPath 'GSM Sig1'")
+            # 设置单次测量-默认
+            self._inst.write('CONFigure:GSM:MEAS:MEValuation:REPetition SINGleshot')
+
+    def _start_measurement(self):
+        self._inst.write('INIT:GSM:MEAS:MEValuation')
+        self._inst.wait_for_operation_done()
 
     def measure_average_tx_power(self):
         '''
         该方法用于上行平均功率测量。
         返回上行平均功率。
         '''
-        self._inst.write('INIT:GSM:MEAS:MEValuation')
-        self._wait_for_operation_done()
-        while True:
-            state = self._inst.query('FETCh:GSM:MEAS:MEValuation:STATe:ALL?')
-            if not cmp(state, 'RDY,ADJ,INV'):
-                break
-            time.sleep(0.1)
+        self._start_measurement()
+        # 测量未完成时重新启动一次测量
+        wait.wait_until('GSM measurement',
+                        lambda: self._inst.query('FETCh:GSM:MEAS:MEValuation:STATe:ALL?'),
+                        lambda state: not cmp(state, 'RDY,ADJ,INV'), MEASUREMENT_TIMEOUT,
+                        self._start_measurement, 1, self.logger)
 
         result = self._inst.query('FETCh:GSM:MEAS:MEValuation:PVTime?')
         tx_power = round(float(result.split(',')[5]), 2)
@@ -6,10 +6,22 @@
 # 版本：V1.0
 # 变更历史:
 # 1，2018-08-20， 吴扬波——首次创建：LTE类，用于LTE信号模块配置、测量等
+# 2，2026-10-18， 吴扬波——操作完成等待改用Instrument.wait_for_operation_done
+# 3，2026-10-18， 吴扬波——信道、功控、RMC、测量配置改为批量写入
+# 4，2026-10-18， 吴扬波——状态等待改用wait.wait_until，增加超时及恢复操作
+# 5，2026-10-18， 吴扬波——上行信道由bands本地计算，回读改为verify模式
+# 6，2026-10-18， 吴扬波——attach时UE已建立连接（如热启动沿用的连接）视为已附着
+# 7，2026-10-18， 吴扬波——verify模式的回读绕过影子缓存，直接查询仪器
 # 若引用或修改API，请保留API变更历史。
 ###############################################################################
-from Utility import pylogger
-import time
+from Utility import pylogger, wait, bands
+
+# 状态等待的超时，单位秒
+OUTPUT_TIMEOUT = 30
+ATTACH_TIMEOUT = 120
+CONNECT_TIMEOUT = 60
+HANDOVER_TIMEOUT = 30
+MEASUREMENT_TIMEOUT = 30
 
 
 class LTE(object):
@@ -17,12 +29,14 @@ class LTE(object):
     LTE类，用于LTE信号模块配置、测量等。
     '''
 
-    def __init__(self, inst, connector, converter):
+    def __init__(self, inst, connector, converter, verify=False):
         '''
         初始化配置参数实例变量、信号路由、测量配置。
+        verify：是否回读仪器生效的配置值，与本地计算的结果比较，不一致时记录警告。
         '''
         self.logger = pylogger.setup_logger(self.__class__.__name__)
         self._inst = inst
+        self.verify = verify
         self._max_power = 0
         self.band = ''
         self.ul_channel = ''
@@ -35,17 +49,6 @@ class LTE(object):
         # 测量通道设置
         self._config_measurement()
 
-    def _wait_for_operation_done(self):
-        '''
-        该方法用于等待仪器完成操作，用于设置参数的方法后。
-        '''
-        done = False
-        while not done:
-            temp = self._inst.query('*OPC?')
-            if not cmp(temp, '1'):
-                done = True
-            time.sleep(0.1)
-
     def _set_signal_routing(self, connector, converter):
         '''
         该方法用于配置LTE信号链路。
@@ -62,48 +65,50 @@ class LTE(object):
         band：频段，如使用band1，则传入参数‘1’；
         dl_channel：信道号，如使用信道25，则传入参数‘25’；
         band_width： 带宽，如带宽为5MHz，则传入参数‘5’。
-        '''
-        # 配置频段
-        self._inst.write('CONFigure:LTE:SIGN:BAND OB%s' % band)
-        self._wait_for_operation_done()
-        # 配置信道
-        self._inst.write('CONFigure:LTE:SIGN:RFSettings:CHANnel:DL %s' % dl_channel)
-        self._wait_for_operation_done()
-        # 配置带宽
-        bw = {
-            '1.4': 'B014', '3': 'B030', '5': 'B050', '10': 'B100', '15': 'B150', '20': 'B200',
-        }
-        self._inst.write('CONFigure:LTE:SIGN:CELL:BANDwidth:DL %s' % bw[band_width])
-        self._wait_for_operation_done()
+        频段、信道、带宽不合法时抛出bands.ChannelError。
+        '''
+        channel = bands.lte_channel(band, dl_channel, band_width)
+        with self._inst.batch():
+            # 配置频段
+            self._inst.write('CONFigure:LTE:SIGN:BAND %s' % channel.band_code)
+            self._inst.wait_for_operation_done()
+            # 配置信道
+            self._inst.write('CONFigure:LTE:SIGN:RFSettings:CHANnel:DL %s' % dl_channel)
+            self._inst.wait_for_operation_done()
+            # 配置带宽
+            self._inst.write('CONFigure:LTE:SIGN:CELL:BANDwidth:DL %s'
+                             % bands.LTE_BANDWIDTH_CODES[band_width])
+            self._inst.wait_for_operation_done()
 
-        # 从仪器端返回生效的配置值
-        self.ul_channel = self._inst.query('CONFigure:LTE:SIGN:RFSettings:CHANnel:UL?')
+        # 上行信道取频段默认的上下行间隔，verify模式下与仪器生效的配置值比较
+        self.ul_channel = str(channel.ul_channel)
+        if self.verify:
+            ul_channel = self._inst.query_uncached('CONFigure:LTE:SIGN:RFSettings:CHANnel:UL?')
+            if int(ul_channel) != channel.ul_channel:
+                self.logger.warning('ULCH read back %s, expected %s' % (ul_channel, self.ul_channel))
+                self.ul_channel = ul_channel
         self.band = band
         self.dl_channel = dl_channel
         self.band_width = band_width
         self.logger.info('@BAND: OB%s,DLCH: %s,BW: %sMHz'
                          % (self.band, self.dl_channel, self.band_width))
-        self.logger.debug('ULCH: %s' % self.ul_channel)
+        self.logger.debug('ULCH: %s, DL %.1fMHz, UL %.1fMHz'
+                          % (self.ul_channel, channel.dl_frequency, channel.ul_frequency))
 
     def handover(self):
         '''
         该方法用于配置信道参数后的切换。
         由于调用set_downlink_channel方法后，信道直接生效，可不用该方法切换。
         '''
-        bw = {
-            '1.4': 'B014', '3': 'B030', '5': 'B050', '10': 'B100', '15': 'B150', '20': 'B200',
-        }
         self._inst.write('PREPare:LTE:SIGN:HAND OB%s, %s, %s, NS01'
-                         % (self.band, self.dl_channel, bw[self.band_width]))
-        self._wait_for_operation_done()
+                         % (self.band, self.dl_channel, bands.LTE_BANDWIDTH_CODES[self.band_width]))
+        self._inst.wait_for_operation_done()
         self._inst.write('CALL:LTE:SIGN:PSWitched:ACTion HANDover')
-        while True:
-            state = self._inst.query('FETCH:LTE:SIGN:PSWitched:STATe?')
-            if state.startswith('CEST'):
-                self.logger.info('Handover successfully!')
-                self.logger.debug(self._inst.query('CONFigure:LTE:SIGN:RFSettings:CHANnel:DL?'))
-                break
-            time.sleep(0.1)
+        wait.wait_until('LTE handover', self._query_ps_state,
+                        lambda state: state.startswith('CEST'), HANDOVER_TIMEOUT,
+                        logger=self.logger)
+        self.logger.info('Handover successfully!')
+        self.logger.debug(self._inst.query('CONFigure:LTE:SIGN:RFSettings:CHANnel:DL?'))
 
     def set_max_power(self, power='33'):
         '''
@@ -112,10 +117,10 @@ class LTE(object):
         '''
         if self._max_power > power:
             self._inst.write('CONFigure:LTE:SIGN:UL:PMAX %s' % power)
-            self._wait_for_operation_done()
+            self._inst.wait_for_operation_done()
             self._max_power = power
         self._inst.write('CONFigure:LTE:SIGN:UL:PUSCh:TPC:SET MAXPower')
-        self._wait_for_operation_done()
+        self._inst.wait_for_operation_done()
         self.logger.info('Set tx power as MAXPower.')
 
     def set_closeloop_power(self, power):
@@ -123,10 +128,11 @@ class LTE(object):
         该方法用于配置UE闭环功控功率。
         power：目标闭环功率值，单位dbm。
         '''
-        self._inst.write('CONFigure:LTE:SIGN:UL:PUSCh:TPC:SET CLOop')
-        self._wait_for_operation_done()
-        self._inst.write('CONFigure:LTE:SIGN:UL:PUSCh:TPC:CLTPower %s' % power)
-        self._wait_for_operation_done()
+        with self._inst.batch():
+            self._inst.write('CONFigure:LTE:SIGN:UL:PUSCh:TPC:SET CLOop')
+            self._inst.wait_for_operation_done()
+            self._inst.write('CONFigure:LTE:SIGN:UL:PUSCh:TPC:CLTPower %s' % power)
+            self._inst.wait_for_operation_done()
         self.logger.info('Set close loop tx power as %sdbm' % power)
 
     def set_openloop_power(self, power):
@@ -135,7 +141,7 @@ class LTE(object):
         power：目标开环功率值，单位dbm。
         '''
         self._inst.write('CONFigure:LTE:SIGN:UL:OLNPower %s' % power)
-        self._wait_for_operation_done()
+        self._inst.wait_for_operation_done()
         self.logger.info('Set open loop tx power as %sdbm' % power)
 
     def disable_output(self):
@@ -143,13 +149,10 @@ class LTE(object):
         该方法用于关闭LTE信号输出。
         '''
         self._inst.write('SOURce:LTE:SIGN:CELL:STATe OFF')
-        is_output_disable = False
-        while not is_output_disable:
-            state = self._inst.query('SOURce:LTE:SIGN:CELL:STATe:ALL?')
-            if state.startswith('OFF,ADJ'):
-                is_output_disable = True
-                self.logger.info('Output off.')
-            time.sleep(0.1)
+        wait.wait_until('LTE output off', self._query_cell_state,
+                        lambda state: state.startswith('OFF,ADJ'), OUTPUT_TIMEOUT,
+                        logger=self.logger)
+        self.logger.info('Output off.')
 
     def enable_output(self):
         '''
@@ -158,39 +161,51 @@ class LTE(object):
         state = self._inst.query('SOURce:LTE:SIGN:CELL:STATe:ALL?')
         if not state.startswith('ON'):
             self._inst.write('SOURce:LTE:SIGN:CELL:STATe ON')
-            while True:
-                state = self._inst.query('SOURce:LTE:SIGN:CELL:STATe:ALL?')
-                if state.startswith('ON,ADJ'):
-                    self.logger.info('Output on.')
-                    break
-                time.sleep(0.1)
+            wait.wait_until('LTE output on', self._query_cell_state,
+                            lambda state: state.startswith('ON,ADJ'), OUTPUT_TIMEOUT,
+                            logger=self.logger)
+            self.logger.info('Output on.')
 
-    def attach(self):
+    def _restart_cell(self):
         '''
-        该方法用于等待UE附着网络。
+        该方法用于关闭再打开小区，使UE重新附着网络，作为附着超时的恢复操作。
         '''
-        state = self._inst.query('FETCH:LTE:SIGN:PSWitched:STATe?')
-        if not state.startswith('ATT'):
-            while True:
-                state = self._inst.query('FETCH:LTE:SIGN:PSWitched:STATe?')
-                if state.startswith('ATT'):
-                    self.logger.info('UE attach successfully!')
-                    break
-                time.sleep(0.1)
+        self.disable_output()
+        self.enable_output()
 
-    def connect_rrc(self):
+    def _query_cell_state(self):
+        return self._inst.query('SOURce:LTE:SIGN:CELL:STATe:ALL?')
+
+    def _query_ps_state(self):
+        return self._inst.query('FETCH:LTE:SIGN:PSWitched:STATe?')
+
+    def attach(self, timeout=ATTACH_TIMEOUT, retries=1):
+        '''
+        该方法用于等待UE附着网络。
+        timeout：单次等待的超时，单位秒；
+        retries：超时后关闭再打开小区、重新等待的最多次数，仍未附着时抛出wait.WaitTimeout。
+        '''
+        state = self._query_ps_state()
+        if not (state.startswith('ATT') or state.startswith('CEST')):
+            wait.wait_until('LTE attach', self._query_ps_state,
+                            lambda state: state.startswith('ATT'), timeout,
+                            self._restart_cell, retries, self.logger)
+            self.logger.info('UE attach successfully!')
+
+    def connect_rrc(self, timeout=CONNECT_TIMEOUT, retries=1):
         '''
         该方法用于建立网络RRC连接。
+        timeout：单次等待的超时，单位秒；
+        retries：超时后重新发起连接的最多次数，仍未连接时抛出wait.WaitTimeout。
         '''
-        state = self._inst.query('FETCH:LTE:SIGN:PSWitched:STATe?')
+        state = self._query_ps_state()
         if not state.startswith('CEST'):
             self._inst.write('CALL:LTE:SIGN:PSWitched:ACTion CONNect')
-            while True:
-                state = self._inst.query('FETCH:LTE:SIGN:PSWitched:STATe?')
-                if state.startswith('CEST'):
-                    self.logger.info('UE Connect RRC successfully!')
-                    break
-                time.sleep(0.1)
+            wait.wait_until('LTE RRC connection', self._query_ps_state,
+                            lambda state: state.startswith('CEST'), timeout,
+                            lambda: self._inst.write('CALL:LTE:SIGN:PSWitched:ACTion CONNect'),
+                            retries, self.logger)
+            self.logger.info('UE Connect RRC successfully!')
 
     def set_paging_cycle(self, cycle='128'):
         '''
@@ -200,7 +215,7 @@ class LTE(object):
             '32': 'P032', '64': 'P064', '128': 'P128', '256': 'P256'
         }
         self._inst.write('CONFigure:LTE:SIGN:CONNection:DPCYcle %s' % list[cycle])
-        self._wait_for_operation_done()
+        self._inst.wait_for_operation_done()
         self.logger.info('Set paging cycle as %s' % cycle)
 
     def disable_rrc_connection_after_attach(self):
@@ -213,29 +228,32 @@ class LTE(object):
         '''
         该方法用于配置测量相关参数。
         '''
-        # 测量参数关联LTE信号发生器
-        self._inst.write("ROUTe:LTE:MEAS:SCENario:CSPath 'LTE Sig1'")
-        self._inst.write('CONFigure:LTE:MEAS:MEValuation:REPetition SING')
-        # 设置单次测量-默认
-        self._inst.write('CONFigure:LTE:MEAS:MEValuation:MODulation:MSCHeme AUTO')
-        # 调制策略设置-默认
-        self._inst.write('CONFigure:LTE:MEAS:MEValuation:RBALlocation:AUTO ON')
-        self._inst.write("TRIGger:LTE:MEAS:MEValuation:SOURce 'LTE Sig1: FrameTrigger'")
-        self._inst.write('CONFigure:LTE:MEAS:MEValuation:RESult:TXM ON')
+        with self._inst.batch():
+            # 测量参数关联LTE信号发生器
+            self._inst.write("ROUTe:LTE:MEAS:SCENario:CSPath 'LTE Sig1'")
+            self._inst.write('CONFigure:LTE:MEAS:MEValuation:REPetition SING')
+            # 设置单次测量-默认
+            self._inst.write('CONFigure:LTE:MEAS:MEValuation:MODulation:MSCHeme AUTO')
+            # 调制策略设置-默认
+            self._inst.write('CONFigure:LTE:MEAS:MEValuation:RBALlocation:AUTO ON')
+            self._inst.write("TRIGger:LTE:MEAS:MEValuation:SOURce 'LTE Sig1: FrameTrigger'")
+            self._inst.write('CONFigure:LTE:MEAS:MEValuation:RESult:TXM ON')
+
+    def _start_measurement(self):
+        self._inst.write('INIT:LTE:MEAS:MEValuation')
+        self._inst.wait_for_operation_done()
 
     def measure_average_tx_power(self):
         '''
         该方法用于测量UE平均上行功率。
         返回上行平均功率。
         '''
-        self._inst.write('INIT:LTE:MEAS:MEValuation')
-        self._wait_for_operation_done()
-        is_measurement_done = False
-        while not is_measurement_done:
-            temp = self._inst.query('FETCh:LTE:MEAS:MEValuation:STATe:ALL?')
-            if not cmp(temp, 'RDY,ADJ,INV'):
-                is_measurement_done = True
-            time.sleep(0.1)
+        self._start_measurement()
+        # 测量未完成时重新启动一次测量
+        wait.wait_until('LTE measurement',
+                        lambda: self._inst.query('FETCh:LTE:MEAS:MEValuation:STATe:ALL?'),
+                        lambda state: not cmp(state, 'RDY,ADJ,INV'), MEASUREMENT_TIMEOUT,
+                        self._start_measurement, 1, self.logger)
 
         result = self._inst.query('FETCh:LTE:MEAS:MEValuation:MODulation:AVERage?')
         tx_power = round(float(result.split(',')[17]), 2)
@@ -248,10 +266,11 @@ class LTE(object):
         rb_num：RB数量，例如RB数为1，则传入参数为‘1’；
         rb_pos：RB位置，例如RB位置为低，则传入参数为‘LOW’。
         '''
-        self._inst.write('CONFigure:LTE:SIGN:CONNection:STYPe RMC')
-        self._wait_for_operation_done()
-        self._inst.write('CONFigure:LTE:SIGN:CONNection:RMC:UL N%s,KEEP,KEEP' % rb_num)
-        self._inst.write('CONFigure:LTE:SIGN:CONNection:RMC:RBPosition:UL %s' % rb_pos)
+        with self._inst.batch():
+            self._inst.write('CONFigure:LTE:SIGN:CONNection:STYPe RMC')
+            self._inst.wait_for_operation_done()
+            self._inst.write('CONFigure:LTE:SIGN:CONNection:RMC:UL N%s,KEEP,KEEP' % rb_num)
+            self._inst.write('CONFigure:LTE:SIGN:CONNection:RMC:RBPosition:UL %s' % rb_pos)
         self.ul_rb_position = self._inst.query('CONFigure:LTE:SIGN:CONNection:RMC:RBPosition:UL?')
         temp = self._inst.query('CONFigure:LTE:SIGN:CONNection:RMC:UL?')
         self.ul_rb_num = temp.split(',')[0][1:]
@@ -263,5 +282,5 @@ class LTE(object):
         level：上行功率电平，单位为dbm。
         '''
         self._inst.write('CONF:LTE:SIGN:DL:RSEP:LEV %s' % level)
-        self._wait_for_operation_done()
+        self._inst.wait_for_operation_done()
         self.logger.info('RSEP level: %s' % self._inst.query('CONF:LTE:SIGN:DL:RSEP:LEV?'))
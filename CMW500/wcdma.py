@@ -6,10 +6,22 @@
 # 版本：V1.0
 # 变更历史:
 # 1，2018-08-20， 吴扬波——首次创建：WCDMA类，用于WCDMA信号模块配置、测量等
+# 2，2026-10-18， 吴扬波——操作完成等待改用Instrument.wait_for_operation_done
+# 3，2026-10-18， 吴扬波——功控、测量配置改为批量写入
+# 4，2026-10-18， 吴扬波——UE功率轨迹改为二进制块查询
+# 5，2026-10-18， 吴扬波——状态等待改用wait.wait_until，增加超时及恢复操作
+# 6，2026-10-18， 吴扬波——频段、信道由bands本地计算，回读改为verify模式
+# 7，2026-10-18， 吴扬波——register时UE已建立连接（如热启动沿用的连接）视为已驻网
+# 8，2026-10-18， 吴扬波——verify模式的回读绕过影子缓存，直接查询仪器
 # 若引用或修改API，请保留API变更历史。
 ###############################################################################
-from Utility import pylogger
-import time
+from Utility import pylogger, wait, bands
+
+# 状态等待的超时，单位秒
+OUTPUT_TIMEOUT = 30
+REGISTER_TIMEOUT = 120
+CONNECT_TIMEOUT = 60
+MEASUREMENT_TIMEOUT = 30
 
 
 class WCDMA(object):
@@ -17,28 +29,19 @@ class WCDMA(object):
     WCDMA类，用于WCDMA信号模块配置、测量等。
     '''
 
-    def __init__(self, inst, connector, converter):
+    def __init__(self, inst, connector, converter, verify=False):
         '''
         初始化配置参数实例变量、信号路由、测量配置。
+        verify：是否回读仪器生效的配置值，与本地计算的结果比较，不一致时记录警告。
         '''
         self.logger = pylogger.setup_logger(self.__class__.__name__)
         self._inst = inst
+        self.verify = verify
         self.set_signal_routing(connector, converter)
         self.band = ''
         self.dl_channel = ''
         self._config_measurement()
 
-    def _wait_for_operation_done(self):
-        '''
-        该方法用于等待仪器完成操作，用于设置参数的方法后。
-        '''
-        done = False
-        while not done:
-            temp = self._inst.query('*OPC?')
-            if not cmp(temp, '1'):
-                done = True
-            time.sleep(0.1)
-
     def set_signal_routing(self, connector, converter):
         '''
         该方法用于配置WCDMA信号链路。
@@ -56,72 +59,95 @@ class WCDMA(object):
         state = self._inst.query('SOURce:WCDMa:SIGN:CELL:STATe:ALL?')
         if not state.startswith('ON'):
             self._inst.write('SOURce:WCDMa:SIGN:CELL:STATe ON')
-            while True:
-                state = self._inst.query('SOURce:WCDMa:SIGN:CELL:STATe:ALL?')
-                if state.startswith('ON,ADJ'):
-                    self.logger.info('Output on.')
-                    break
-                time.sleep(0.1)
+            wait.wait_until('WCDMA output on', self._query_cell_state,
+                            lambda state: state.startswith('ON,ADJ'), OUTPUT_TIMEOUT,
+                            logger=self.logger)
+            self.logger.info('Output on.')
 
     def disable_output(self):
         '''
         该方法用于关闭WCDMA信号输出。
         '''
         self._inst.write('SOURce:WCDMa:SIGN:CELL:STATe OFF')
-        is_output_disable = False
-        while not is_output_disable:
-            state = self._inst.query('SOURce:WCDMa:SIGN:CELL:STATe:ALL?')
-            if state.startswith('OFF,ADJ'):
-                is_output_disable = True
-                self.logger.info('Output off.')
-            time.sleep(0.1)
+        wait.wait_until('WCDMA output off', self._query_cell_state,
+                        lambda state: state.startswith('OFF,ADJ'), OUTPUT_TIMEOUT,
+                        logger=self.logger)
+        self.logger.info('Output off.')
+
+    def _restart_cell(self):
+        '''
+        该方法用于关闭再打开小区，使UE重新注册网络，作为注册超时的恢复操作。
+        '''
+        self.disable_output()
+        self.enable_output()
 
-    def register(self):
+    def _query_cell_state(self):
+        return self._inst.query('SOURce:WCDMa:SIGN:CELL:STATe:ALL?')
+
+    def _query_cs_state(self):
+        return self._inst.query('FETCh:WCDMa:SIGN:CSWitched:STATe?')
+
+    def register(self, timeout=REGISTER_TIMEOUT, retries=1):
         '''
         该方法用于等待UE驻网。
+        timeout：单次等待的超时，单位秒；
+        retries：超时后关闭再打开小区、重新等待的最多次数，仍未驻网时抛出wait.WaitTimeout。
         '''
-        state = self._inst.query('FETCh:WCDMa:SIGN:CSWitched:STATe?')
-        if not state.startswith('REG'):
-            while True:
-                state = self._inst.query('FETCh:WCDMa:SIGN:CSWitched:STATe?')
-                if state.startswith('REG'):
-                    self.logger.info('UE registers successfully!')
-                    break
-                time.sleep(0.1)
+        state = self._query_cs_state()
+        if not (state.startswith('REG') or state.startswith('CEST')):
+            wait.wait_until('WCDMA register', self._query_cs_state,
+                            lambda state: state.startswith('REG'), timeout,
+                            self._restart_cell, retries, self.logger)
+            self.logger.info('UE registers successfully!')
 
-    def setup_cs_connection(self):
+    def setup_cs_connection(self, timeout=CONNECT_TIMEOUT, retries=1):
         '''
         该方法用于建立UE与WCDMA网络CS域连接。
+        timeout：单次等待的超时，单位秒；
+        retries：超时后重新发起连接的最多次数，仍未连接时抛出wait.WaitTimeout。
         '''
-        state = self._inst.query('FETCh:WCDMa:SIGN:CSWitched:STATe?')
+        state = self._query_cs_state()
         if not state.startswith('CEST'):
             self._inst.write('CALL:WCDMa:SIGN:CSWitched:ACTion CONNect')
-            while True:
-                state = self._inst.query('FETCh:WCDMa:SIGN:CSWitched:STATe?')
-                if state.startswith('CEST'):
-                    self.logger.info('CS domain establishes successfully!')
-                    break
-                time.sleep(0.1)
+            wait.wait_until('WCDMA CS connection', self._query_cs_state,
+                            lambda state: state.startswith('CEST'), timeout,
+                            lambda: self._inst.write('CALL:WCDMa:SIGN:CSWitched:ACTion CONNect'),
+                            retries, self.logger)
+            self.logger.info('CS domain establishes successfully!')
 
     def set_downlink_channel(self, band, dl_channel):
         '''
         该方法用于设置WCDMA下行信道参数。
         band：频段，如使用band1，则传入参数‘1’；
         dl_channel：信道号，如使用信道10562，则传入参数‘10562’。
-        '''
-        self._inst.write('CONFigure:WCDMa:SIGN:RFSettings:CARRier:DL OB%s, %s' % (band, dl_channel))
-        self._wait_for_operation_done()
-
-        self.band = self._inst.query('CONFigure:WCDMa:SIGN:CARRier:BAND?')[2]
-        self.dl_channel = self._inst.query('CONFigure:WCDMa:SIGN:RFSettings:CARRier:CHANnel:DL?')
+        频段、信道不合法时抛出bands.ChannelError。
+        '''
+        channel = bands.wcdma_channel(band, dl_channel)
+        self._inst.write('CONFigure:WCDMa:SIGN:RFSettings:CARRier:DL %s, %s'
+                         % (channel.band_code, dl_channel))
+        self._inst.wait_for_operation_done()
+
+        self.band = band
+        self.dl_channel = dl_channel
+        if self.verify:
+            band_code = self._inst.query_uncached('CONFigure:WCDMa:SIGN:CARRier:BAND?')
+            dl_channel = self._inst.query_uncached(
+                'CONFigure:WCDMa:SIGN:RFSettings:CARRier:CHANnel:DL?')
+            if band_code != channel.band_code or int(dl_channel) != channel.dl_channel:
+                self.logger.warning('Carrier read back %s, %s, expected %s, %s'
+                                    % (band_code, dl_channel, channel.band_code, self.dl_channel))
+                self.band = band_code[2:]
+                self.dl_channel = dl_channel
         self.logger.info('@BAND: OB%s,DLCH: %s' % (self.band, self.dl_channel))
+        self.logger.debug('ULCH: %d, DL %.1fMHz, UL %.1fMHz'
+                          % (channel.ul_channel, channel.dl_frequency, channel.ul_frequency))
 
     def set_downlink_power(self, power='-80'):
         '''
         该方法用于设置下行功率。
         '''
         self._inst.write('CONFigure:WCDMa:SIGN:RFSettings:CARRier:COPower %s' % power)
-        self._wait_for_operation_done()
+        self._inst.wait_for_operation_done()
         self.logger.info('Set downlink power as %sdbm' % power)
 
     def set_voice_connection(self):
@@ -141,10 +167,11 @@ class WCDMA(object):
         该方法用于配置UE闭环功控功率。
         power：目标闭环功率值，单位dbm。
         '''
-        self._inst.write('CONFigure:WCDMa:SIGN:UL:TPC:SET CLOop')
-        self._wait_for_operation_done()
-        self._inst.write('CONFigure:WCDMa:SIGN:UL:TPC:TPOWer %s' % power)
-        self._wait_for_operation_done()
+        with self._inst.batch():
+            self._inst.write('CONFigure:WCDMa:SIGN:UL:TPC:SET CLOop')
+            self._inst.wait_for_operation_done()
+            self._inst.write('CONFigure:WCDMa:SIGN:UL:TPC:TPOWer %s' % power)
+            self._inst.wait_for_operation_done()
         self.logger.info('Set close loop tx power as %sdbm' % power)
 
     def set_max_power(self):
@@ -153,34 +180,40 @@ class WCDMA(object):
         power：最大功率数值，单位dbm。
         '''
         self._inst.write('CONFigure:WCDMa:SIGN:UL:TPC:SET ALL1')
-        self._wait_for_operation_done()
+        self._inst.wait_for_operation_done()
         self.logger.info('Set tx power as max power')
 
     def _config_measurement(self):
         '''
         该方法用于配置测量相关参数。
         '''
-        # 测量参数关联LTE信号发生器
-        self._inst.write("ROUTe:WCDMa:MEAS:SCENario:CSPath 'WCDMA Sig1'")
-        # 设置单次测量-默认
-        self._inst.write('CONFigure:WCDMa:MEAS:MEValuation:REPetition SINGleshot')
-        self._inst.write('CONFigure:WCDMa:MEAS:MEValuation:RESult:UEPower ON')
+        with self._inst.batch():
+            # 测量参数关联LTE信号发生器
+            self._inst.write("ROUTe:WCDMa:MEAS:SCENario:CSPath 'WCDMA Sig1'")
+            # 设置单次测量-默认
+            self._inst.write('CONFigure:WCDMa:MEAS:MEValuation:REPetition SINGleshot')
+            self._inst.write('CONFigure:WCDMa:MEAS:MEValuation:RESult:UEPower ON')
+
+    def _start_measurement(self):
+        self._inst.write('INIT:WCDMa:MEAS:MEValuation')
+        self._inst.wait_for_operation_done()
 
     def measure_average_tx_power(self):
         '''
         该方法用于测量UE平均上行功率。
         返回上行平均功率。
         '''
-        self._inst.write('INIT:WCDMa:MEAS:MEValuation')
-        self._wait_for_operation_done()
-        is_measurement_done = False
-        while not is_measurement_done:
-            temp = self._inst.query('FETCh:WCDMa:MEAS:MEValuation:STATe:ALL?')
-            if not cmp(temp, 'RDY,ADJ,INV'):
-                is_measurement_done = True
-            time.sleep(0.1)
-
-            result = self._inst.query('FETCh:WCDMa:MEAS:MEValuation:TRACe:UEPower:AVERage?')
-        tx_power = round(float(result.split(',')[1]), 2)
+        self._start_measurement()
+        # 测量未完成时重新启动一次测量
+        wait.wait_until('WCDMA measurement',
+                        lambda: self._inst.query('FETCh:WCDMa:MEAS:MEValuation:STATe:ALL?'),
+                        lambda state: not cmp(state, 'RDY,ADJ,INV'), MEASUREMENT_TIMEOUT,
+                        self._start_measurement, 1, self.logger)
+
+        # 轨迹以二进制块返回，查询后恢复ASCII格式，不影响其他查询
+        result = self._inst.query_binary('FORMat:BASE:DATA REAL,32;:FORMat:BASE:BORDer SWAPped;'
+                                         ':FETCh:WCDMa:MEAS:MEValuation:TRACe:UEPower:AVERage?;'
+                                         ':FORMat:BASE:DATA ASCii', '<f4')
+        tx_power = round(float(result[1]), 2)
         self.logger.info('Tx power: %sdbm' % str(tx_power))
         return tx_power
@@ -0,0 +1,210 @@
+# -*- coding:utf-8 -*-
+###############################################################################
+# Copyright (C), 2018, TP-LINK Technologies Co., Ltd.
+#
+# 作者：吴扬波
+# 版本：V1.0
+# 变更历史:
+# 1，2026-10-18， 吴扬波——首次创建：CurrentLogger类，后台连续采集电流并保存，用于事后分段分析
+# 2，2026-10-18， 吴扬波——采集线程的指令计入current logging阶段
+# 3，2026-10-18， 吴扬波——采集线程以低优先级访问仪器，运行期间可以调用DCSource的其他仪器操作方法
+# 若引用或修改API，请保留API变更历史。
+###############################################################################
+from Utility import block, instrument, pylogger
+import bisect
+import collections
+import os
+import threading
+import time
+
+# 采样数据文件：单精度浮点，低字节在前，按采集顺序追加
+SAMPLE_FILE = 'current_samples.f32'
+# 采样索引文件：每次采样一行，起始时刻、数据文件中的起始采样序号、采样值个数、每个值代表的采样点数
+SWEEP_FILE = 'current_sweeps.txt'
+# 标记文件：每个标记一行，时刻、标记名称、配置说明
+MARKER_FILE = 'current_markers.txt'
+# 内存中保留的最近采样次数，供DCSource读取，约64s
+RECENT_SWEEPS = 1000
+
+
+class CurrentLogger(threading.Thread):
+    '''
+    CurrentLogger类，在后台线程中连续采集DC Source的电流，写入磁盘的采样文件，
+    测试过程各阶段以mark方法写入带时刻的标记，事后由SampleStore按标记分段计算平均电流。
+    启动后DCSource的电流测量从本线程的采样流中读取，不再直接访问仪器。
+    采集以PRIORITY_LOW访问仪器，每次采样的收发不会与其他线程交错，
+    运行期间调用DCSource的其他仪器操作方法时优先执行，采样顺延。
+    '''
+
+    def __init__(self, dc_source, folder_name):
+        '''
+        dc_source：DCSource实例；
+        folder_name：采样文件保存的文件夹。
+        '''
+        threading.Thread.__init__(self, name='CurrentLogger')
+        self.daemon = True
+        self.logger = pylogger.setup_logger(self.__class__.__name__)
+        self.dc_source = dc_source
+        self.folder_name = folder_name
+        self._stop_event = threading.Event()
+        self._condition = threading.Condition()
+        # 最近的采样：(序号, 采样值数组, 每个值代表的采样点数)
+        self._recent = collections.deque([], RECENT_SWEEPS)
+        self._sequence = 0
+        self._sample_offset = 0
+        self._exc_info = None
+        self._sample_file = open(os.path.join(folder_name, SAMPLE_FILE), 'ab')
+        self._sweep_file = open(os.path.join(folder_name, SWEEP_FILE), 'a')
+        self._marker_file = open(os.path.join(folder_name, MARKER_FILE), 'a')
+
+    def run(self):
+        inst = self.dc_source._inst
+        try:
+            while not self._stop_event.is_set():
+                t0 = time.time()
+                with inst.priority(instrument.PRIORITY_LOW), inst.phase('current logging'):
+                    samples, weight = self.dc_source._read_instrument_sweep()
+                self._sample_file.write(block.tobytes(samples))
+                self._sweep_file.write('%.6f\t%d\t%d\t%d\n'
+                                       % (t0, self._sample_offset, len(samples), weight))
+                self._sample_offset += len(samples)
+                with self._condition:
+                    self._sequence += 1
+                    self._recent.append((self._sequence, samples, weight))
+                    self._condition.notify_all()
+        except Exception, e:
+            self.logger.error('Current logging stopped: %s' % e)
+            self._exc_info = e
+            with self._condition:
+                self._condition.notify_all()
+        finally:
+            self._sample_file.flush()
+            self._sweep_file.flush()
+
+    def stop(self):
+        '''
+        该方法用于停止采集并关闭文件。
+        '''
+        self._stop_event.set()
+        self.join()
+        self._sample_file.close()
+        self._sweep_file.close()
+        self._marker_file.close()
+
+    def mark(self, label, configuration=''):
+        '''
+        该方法用于在采样时间线上写入标记。
+        label：标记名称，如'configure'、'measure'、'done'；
+        configuration：配置说明，同DataRecorder.record_result的configuration。
+        '''
+        self._marker_file.write('%.6f\t%s\t%s\n' % (time.time(), label, configuration))
+        self._marker_file.flush()
+
+    def latest_sequence(self):
+        '''
+        返回最近一次采样的序号。
+        '''
+        with self._condition:
+            return self._sequence
+
+    def next_sweep(self, sequence):
+        '''
+        该方法用于读取序号sequence之后的下一次采样，尚未采集时等待。
+        返回(序号, 采样值数组, 每个值代表的采样点数)；sequence之后的采样已移出缓存时，返回缓存中最早的采样。
+        '''
+        with self._condition:
+            while self._sequence <= sequence:
+                if self._exc_info is not None:
+                    raise self._exc_info
+                self._condition.wait(1)
+            for item in self._recent:
+                if item[0] > sequence:
+                    return item
+
+
+class SampleStore(object):
+    '''
+    SampleStore类，读取CurrentLogger保存的采样文件、标记，按时间段计算平均电流，
+    只读取所需的采样数据，不将整个采样文件载入内存。
+    '''
+
+    def __init__(self, folder_name, sampling_period=15.6E-6):
+        '''
+        folder_name：采样文件所在的文件夹；
+        sampling_period：采样间隔，单位秒。
+        '''
+        self.folder_name = folder_name
+        self.sampling_period = sampling_period
+        self.sweeps = []
+        with open(os.path.join(folder_name, SWEEP_FILE)) as f:
+            for line in f:
+                t0, offset, count, weight = line.split('\t')
+                self.sweeps.append((float(t0), int(offset), int(count), int(weight)))
+        self._times = [sweep[0] for sweep in self.sweeps]
+        self.markers = []
+        with open(os.path.join(folder_name, MARKER_FILE)) as f:
+            for line in f:
+                t, label, configuration = line.rstrip('\n').split('\t', 2)
+                self.markers.append((float(t), label, configuration))
+
+    def average(self, t0, t1):
+        '''
+        返回[t0, t1)内采样的平均电流（单位mA）及采样点数，没有采样时平均电流为None。
+        '''
+        total = 0.0
+        count = 0
+        with open(os.path.join(self.folder_name, SAMPLE_FILE), 'rb') as f:
+            index = max(bisect.bisect_right(self._times, t0) - 1, 0)
+            for sweep_t0, offset, sample_num, weight in self.sweeps[index:]:
+                if sweep_t0 >= t1:
+                    break
+                # 每个值覆盖的时长，SCALAR模式下一个值代表整个采样
+                period = self.sampling_period * weight
+                first = max(int((t0 - sweep_t0) / period + 0.999999), 0)
+                last = min(int((t1 - sweep_t0) / period + 0.999999), sample_num)
+                if last <= first:
+                    continue
+                f.seek((offset + first) * 4)
+                samples = block.frombuffer(f.read((last - first) * 4))
+                total += block.mean(samples) * len(samples) * weight
+                count += len(samples) * weight
+        if not count:
+            return None, 0
+        return total / count * 1000, count
+
+    def segments(self, start_label, end_label=None):
+        '''
+        返回按标记划分的时间段列表，元素为(配置说明, 起始时刻, 结束时刻)。
+        start_label：时间段起始的标记名称；
+        end_label：时间段结束的标记名称，默认以下一个标记为结束。
+        '''
+        result = []
+        for index, (t, label, configuration) in enumerate(self.markers):
+            if label != start_label:
+                continue
+            end = None
+            for next_t, next_label, next_configuration in self.markers[index + 1:]:
+                if end_label is None or (next_label == end_label and
+                                         next_configuration == configuration):
+                    end = next_t
+                    break
+            if end is None:
+                end = self.sweeps[-1][0] if self.sweeps else t
+            result.append((configuration, t, end))
+        return result
+
+    def analyze(self, start_label='measure', end_label='done', offset=0.0, duration=None):
+        '''
+        该方法用于按标记分段重新计算每个配置项的平均电流。
+        start_label、end_label：时间段起止的标记名称；
+        offset：从时间段起始跳过的稳定时长，单位秒；
+        duration：平均的时长，单位秒，默认到时间段结束；
+        返回列表，元素为(配置说明, 平均电流mA, 采样点数)。
+        '''
+        result = []
+        for configuration, t0, t1 in self.segments(start_label, end_label):
+            start = t0 + offset
+            end = t1 if duration is None else min(start + duration, t1)
+            average_current, count = self.average(start, end)
+            result.append((configuration, average_current, count))
+        return result
@@ -6,13 +6,35 @@
 # 版本：V1.0
 # 变更历史:
 # 1，2018-08-20， 吴扬波——首次创建：DCSource类，用于66319B参数配置、测量等
+# 2，2026-10-18， 吴扬波——仪器引用封装为Instrument，操作完成等待改为阻塞*OPC?
+# 3，2026-10-18， 吴扬波——增加ARRAY采集模式，以二进制块读取整个采样序列并计算平均电流
+# 4，2026-10-18， 吴扬波——二进制块改用Utility.block解析，删除_convert方法
+# 5，2026-10-18， 吴扬波——电流稳定性判断改用StabilityDetector，按采样序列增量计算
+# 6，2026-10-18， 吴扬波——增加settle_and_measure方法，稳定窗内的采样计入平均电流测量
+# 7，2026-10-18， 吴扬波——settle_and_measure增加按置信区间自适应测量时长的模式
+# 8，2026-10-18， 吴扬波——增加start_logging、stop_logging、mark方法，后台连续采集时电流测量读取采集线程的采样
+# 9，2026-10-18， 吴扬波——记录采样序列的起止时刻waveform_times，用于波形存档
+# 10，2026-10-18， 吴扬波——稳定性判断、电流测量的采样分别计入stability、current measurement阶段
+# 11，2026-10-18， 吴扬波——连接改用visa_backend共享会话，链路断开时自动重连，连接失败时抛出异常
+# 12，2026-10-18， 吴扬波——settle_and_measure自适应模式复用稳定观测窗内的采样，测量时长上限包含观测窗
 # 若引用或修改API，请保留API变更历史。
 ###############################################################################
-import visa
-from Utility import pylogger
+from Utility import pylogger, visa_backend, instrument, block
+import stability
+import current_logger
 import time
-import struct
+import array
 import collections
+import math
+
+# 单次采样的点数
+SWEEP_POINTS = 4096
+# 稳定性判断的分块时长，单位秒，与原0.5s平均电流的判断粒度一致，偏差阈值含义不变
+STABILITY_BLOCK_SECONDS = 0.5
+# 稳定观测窗与后续采样的平均电流之差不超过该倍数的标准误差时，观测窗的采样计入测量
+SETTLE_REUSE_SIGMA = 3.0
+# 自适应测量时估计置信区间所需的最少分块数
+MIN_BLOCKS = 5
 
 
 class DCSource(object):
@@ -29,6 +51,18 @@ class DCSource(object):
         self.sampling_period = 15.6E-6
         self.current_range = '3A'
         self.max_voltage = 4.4
+        # 采集模式：SCALAR，每次采样由仪器返回平均电流；ARRAY，以二进制块返回整个采样序列
+        self.acquisition_mode = 'SCALAR'
+        # ARRAY模式下最近一次电流测量的采样序列，单位A
+        self.waveform = array.array('f')
+        # waveform的(开始采样时刻, 结束采样时刻)
+        self.waveform_times = (None, None)
+        # 最近一次settle_and_measure平均电流置信区间的半宽，单位mA
+        self.confidence_interval = None
+        # 后台连续采集线程，未启动时为None
+        self.current_logger = None
+        # 已读取的后台采样序号
+        self._log_sequence = 0
         # 设置输出电压上限
         self._set_protection(self.max_voltage)
         # 配置最初的采样周期和量程
@@ -38,30 +72,18 @@ class DCSource(object):
         '''
         建立PC与DC source连接
         addr: GPIB地址
-        返回仪器引用。
+        返回仪器引用，连接失败时抛出visa_backend.SessionError。
         '''
-        rm = visa.ResourceManager()
         try:
-            inst = rm.open_resource(addr)
-            self.logger.info('Connect DC source successfully!')
-            inst.read_termination = '\n'
-            inst.timeout = 10000
-            return inst
-
-        except Exception, e:
+            inst = visa_backend.open_session(addr, self.__class__.__name__)
+        except visa_backend.SessionError, e:
             self.logger.error('Connect DC source failed!')
             self.logger.error(e)
-
-    def _wait_for_operation_done(self):
-        '''
-        该方法用于等待仪器完成操作，用于设置参数的方法后。
-        '''
-        done = False
-        while not done:
-            temp = self._inst.query('*OPC?')
-            if not cmp(temp.strip(), '+1'):
-                done = True
-            time.sleep(0.1)
+            raise
+        self.logger.info('Connect DC source successfully!')
+        inst.read_termination = '\n'
+        inst.timeout = 10000
+        return instrument.Instrument(inst, self.__class__.__name__)
 
     def reset(self):
         '''
@@ -75,7 +97,7 @@ class DCSource(object):
         max_voltage：输出电压上限值，例如希望电压不超过4.1V，则传入参数4.1
         '''
         self._inst.write('voltage:protection:level %.1f;state on' % max_voltage)
-        self._wait_for_operation_done()
+        self._inst.wait_for_operation_done()
 
     def set_measure_current_range(self, current_range='3A'):
         '''
@@ -83,7 +105,7 @@ class DCSource(object):
         current_range：电流范围，仪器可以选的值为0.02A，1A，3A。
         '''
         self._inst.write('sense:current:detector dc;range %s' % current_range)
-        self._wait_for_operation_done()
+        self._inst.wait_for_operation_done()
         self.current_range = current_range
 
     def _config_measurement(self, sampling_period, current_range):
@@ -92,10 +114,26 @@ class DCSource(object):
         sampling_period：采样频率；
         current_range：电流范围，仪器可以选的值为0.02A，1A，3A。
         '''
-        self._inst.write('sense:sweep:points 4096;tinterval %e' % sampling_period)
-        self._wait_for_operation_done()
+        self._inst.write('sense:sweep:points %d;tinterval %e' % (SWEEP_POINTS, sampling_period))
+        self._inst.wait_for_operation_done()
         self.set_measure_current_range(current_range)
 
+    def set_acquisition_mode(self, mode='SCALAR'):
+        '''
+        该方法用于设置电流测量的采集模式。
+        mode：'SCALAR'，每次采样查询MEAS:CURR?，仪器返回ASCII格式的平均电流；
+        'ARRAY'，每次采样以FETCh:ARRay:CURRent?读取IEEE 488.2二进制块格式的采样序列，
+        由采样值计算平均电流，并保留采样序列。
+        '''
+        if mode == 'ARRAY':
+            # 单精度浮点、低字节在前
+            self._inst.write('format real;:format:border swapped')
+        else:
+            self._inst.write('format ascii')
+        self._inst.wait_for_operation_done()
+        self.acquisition_mode = mode
+        self.logger.info('Set acquisition mode: %s' % mode)
+
     def set_voltage(self, voltage):
         '''
         该方法用于设置输出电压幅值。
@@ -105,7 +143,7 @@ class DCSource(object):
             self.logger.error('ERROR:OVP!')
         else:
             self._inst.write('voltage %.1f' % voltage)
-            self._wait_for_operation_done()
+            self._inst.wait_for_operation_done()
             self.logger.info('Set voltage: %.1fV' % voltage)
 
     def enable_output(self):
@@ -113,7 +151,7 @@ class DCSource(object):
         该方法用于使能电源电压输出。
         '''
         self._inst.write('output1 on')
-        self._wait_for_operation_done()
+        self._inst.wait_for_operation_done()
         self._inst.write('display on')
 
     def measure_current(self, seconds):
@@ -121,7 +159,8 @@ class DCSource(object):
         该方法用于平均电流测量（外部调用）。
         seconds：单次测量时长，例如希望获得30s的电流平均值，则传入参数30。
         '''
-        average_current = self._measure_current(seconds)
+        with self._inst.phase('current measurement'):
+            average_current = self._measure_current(seconds)
         self.logger.info('Average current: %.1fmA' % average_current)
         return average_current
 
@@ -131,7 +170,19 @@ class DCSource(object):
         seconds：单次测量时长，例如希望获得30s的电流平均值，则传入参数30；
         返回平均测量电流。
         '''
-        total_loop = int(round(seconds / (self.sampling_period * 4096)))
+        total_loop = int(round(seconds / (self.sampling_period * SWEEP_POINTS)))
+        if self.current_logger is not None:
+            self._log_sequence = self.current_logger.latest_sequence()
+            sweeps = self._read_sweeps(total_loop * SWEEP_POINTS)
+            total = sum(block.mean(samples) * len(samples) * weight for samples, weight in sweeps)
+            count = sum(len(samples) * weight for samples, weight in sweeps)
+            return round(total / count * 1000, 1)
+        if self.acquisition_mode == 'ARRAY':
+            t0 = time.time()
+            self.waveform = self._acquire_waveform(total_loop)
+            self.waveform_times = (t0, time.time())
+            return round(block.mean(self.waveform) * 1000, 1)
+
         loop_count = 0
         current_list = []
         while loop_count < total_loop:
@@ -140,57 +191,252 @@ class DCSource(object):
         average_current = round(sum(current_list) / (len(current_list) * 1.0) * 1000, 1)
         return average_current
 
-    def _convert(self, raw_data):
+    def _acquire_waveform(self, sweep_count):
+        '''
+        该方法用于连续采集sweep_count次采样序列。
+        每次采样在一条程序消息中触发采集并读取二进制块。
+        返回单精度浮点数组，单位A。
+        '''
+        sweeps = []
+        for _ in range(sweep_count):
+            sweeps.append(self._acquire_sweep())
+        return block.concatenate(sweeps)
+
+    def _acquire_sweep(self):
         '''
-        该方法用于将电源返回的二进制字节流转成浮点列表
-        raw_data：字节流。
-        返回转换后的浮点列表。
+        该方法用于触发一次采样并读取采样序列，单位A。
         '''
-        raw_data_list = raw_data.split('#')
-        current_data = []
-        for index, data in enumerate(raw_data_list):
-            if cmp(index, 0):
-                data = data.strip('\n')
-                digit_num = int(str(data[0]))
-                bytes_num = int(''.join(data[1:1 + digit_num]))
-                data_num = bytes_num / 4
-                raw_current_data = data[1 + digit_num:]
-                current_data.extend(list(struct.unpack('%df' % data_num, raw_current_data)))
-        return current_data
+        return self._inst.query_binary(
+            'initiate:name acquire;:trigger:acquire;:fetch:array:current?', '<f4')
 
-    def check_current_stability(self, timeout=30, window_width=10, max_deviation=50.0):
+    def _read_sweep(self):
+        '''
+        该方法用于读取一次采样，返回值同_read_instrument_sweep。
+        后台连续采集时读取采集线程的下一次采样，否则直接由仪器采样。
+        '''
+        if self.current_logger is not None:
+            self._log_sequence, samples, weight = self.current_logger.next_sweep(self._log_sequence)
+            return samples, weight
+        return self._read_instrument_sweep()
+
+    def _read_instrument_sweep(self):
+        '''
+        该方法用于按采集模式完成一次采样。
+        返回(采样值数组, 每个值代表的采样点数)：ARRAY模式为整个采样序列，
+        SCALAR模式为仪器返回的平均电流，代表一次采样的全部采样点。
+        '''
+        if self.acquisition_mode == 'ARRAY':
+            return self._acquire_sweep(), 1
+        return [float(self._inst.query('MEAS:CURR?'))], SWEEP_POINTS
+
+    def _settle(self, timeout, window_samples, max_deviation, criterion):
+        '''
+        该方法用于等待电流稳定，参数见check_current_stability。
+        返回(电流是否稳定, 观测窗内的采样列表)，采样列表元素为_read_sweep的返回值。
+        '''
+        detector = stability.StabilityDetector(
+            window_samples, int(round(STABILITY_BLOCK_SECONDS / self.sampling_period)))
+        window_length = detector.window_blocks * detector.block_size
+        # 保留覆盖观测窗的最近几次采样
+        sweeps = collections.deque()
+        sample_count = 0
+        # 后台连续采集时从最新的采样开始判断，不使用配置变更之前的采样
+        if self.current_logger is not None:
+            self._log_sequence = self.current_logger.latest_sequence()
+
+        with self._inst.phase('stability'):
+            t0 = time.time()
+            while True:
+                samples, weight = self._read_sweep()
+                detector.add_samples(samples, weight)
+                sweeps.append((samples, weight))
+                sample_count += len(samples) * weight
+                while sample_count - len(sweeps[0][0]) * sweeps[0][1] >= window_length:
+                    oldest, oldest_weight = sweeps.popleft()
+                    sample_count -= len(oldest) * oldest_weight
+                if not detector.is_full():
+                    continue
+                if detector.deviation(criterion) * 1000 < max_deviation:
+                    self.logger.debug('Current is stable.')
+                    return True, list(sweeps)
+                elif (time.time() - t0) > timeout:
+                    self.logger.error('Current is unstable, and time runs out.')
+                    return False, list(sweeps)
+
+    def start_logging(self, folder_name):
+        '''
+        该方法用于启动后台连续采集，整个测试过程的采样保存到folder_name文件夹。
+        启动后电流测量读取采集线程的采样，仪器只由采集线程访问，
+        停止采集前不要调用其他仪器操作方法，如set_voltage、set_acquisition_mode。
         '''
-        该方法利用移动的矩形窗，计算窗内的最大偏差是否符合电流门限，判断电流的稳定性。
+        if self.current_logger is not None:
+            return
+        self.current_logger = current_logger.CurrentLogger(self, folder_name)
+        self._log_sequence = 0
+        self.current_logger.start()
+
+    def stop_logging(self):
+        '''
+        该方法用于停止后台连续采集。
+        '''
+        if self.current_logger is None:
+            return
+        logger, self.current_logger = self.current_logger, None
+        logger.stop()
+
+    def mark(self, label, configuration=''):
+        '''
+        该方法用于在后台采样的时间线上写入标记，未启动后台采集时忽略。
+        label：标记名称；
+        configuration：配置说明。
+        '''
+        if self.current_logger is not None:
+            self.current_logger.mark(label, configuration)
+
+    def _read_sweeps(self, sample_count):
+        '''
+        该方法用于连续采样，直至采样点数不少于sample_count。
+        返回_read_sweep返回值的列表。
+        '''
+        sweeps = []
+        with self._inst.phase('current measurement'):
+            while sample_count > 0:
+                samples, weight = self._read_sweep()
+                sweeps.append((samples, weight))
+                sample_count -= len(samples) * weight
+        return sweeps
+
+    @staticmethod
+    def _is_consistent(settle_sweeps, fresh_sweeps):
+        '''
+        判断稳定观测窗与后续采样的平均电流是否一致。
+        以后续各次采样平均值的标准差估计标准误差，两者之差不超过SETTLE_REUSE_SIGMA倍标准误差时一致。
+        '''
+        settle_means = [block.mean(samples) for samples, _ in settle_sweeps]
+        fresh_means = [block.mean(samples) for samples, _ in fresh_sweeps]
+        if len(fresh_means) < 2:
+            return True
+        settle_mean = sum(settle_means) / len(settle_means)
+        fresh_mean = sum(fresh_means) / len(fresh_means)
+        variance = sum((value - fresh_mean) ** 2 for value in fresh_means) / (len(fresh_means) - 1)
+        standard_error = math.sqrt(variance * (1.0 / len(settle_means) + 1.0 / len(fresh_means)))
+        return abs(settle_mean - fresh_mean) <= SETTLE_REUSE_SIGMA * standard_error
+
+    def check_current_stability(self, timeout=30, window_width=10, max_deviation=50.0,
+                                window_samples=None, criterion='MAD'):
+        '''
+        该方法利用移动的矩形窗，计算窗内的偏差是否符合电流门限，判断电流的稳定性。
+        每次采样后增量更新观测窗，窗口填满后每次采样都进行判断。
         timeout：超时，单位秒；
         window_width：观测窗宽度，单位秒；
-        max_deviation：偏差阈值，如果在观测窗内，离差平均值大于偏差阈值，则认为电流不稳定，单位mA；
+        max_deviation：偏差阈值，如果在观测窗内，0.5s平均电流的偏差大于偏差阈值，则认为电流不稳定，单位mA；
+        window_samples：观测窗宽度，单位采样点，指定时代替window_width；
+        criterion：偏差的计算方式，'MAD'为平均绝对偏差，'STD'为标准差；
         返回电流测量是否超时，布尔值。
         '''
-        sample_interval = 0.5
-        fifo_depth = window_width / sample_interval
-        is_current_stable = True
-
-        filter_fifo = collections.deque([], fifo_depth)
-        filter_fifo.clear()
-        count = 0
-        t0 = time.time()
-        while True:
-            if count < fifo_depth:
-                filter_fifo.append(self._measure_current(sample_interval))
-                count += 1
-            else:
-                filter_fifo.append(self._measure_current(sample_interval))
-                deviation = []
-                average_current = sum(filter_fifo) / len(filter_fifo)
-                for item in filter_fifo:
-                    deviation.append(abs(item - average_current))
-                average_deviation = sum(deviation) / len(deviation)
-                t1 = time.time()
-                if average_deviation < max_deviation:
-                    self.logger.debug('Current is stable.')
-                    break
-                elif (t1 - t0) > timeout:
-                    is_current_stable = False
-                    self.logger.error('Current is unstable, and time runs out.')
-                    break
-        return is_current_stable
+        if window_samples is None:
+            window_samples = int(round(window_width / self.sampling_period))
+        return self._settle(timeout, window_samples, max_deviation, criterion)[0]
+
+    def settle_and_measure(self, seconds, timeout=30, window_width=10, max_deviation=50.0,
+                           window_samples=None, criterion='MAD', tolerance=None,
+                           confidence=0.95, min_seconds=3, block_seconds=None):
+        '''
+        该方法用于等待电流稳定后测量平均电流，稳定观测窗内的采样计入测量时长，
+        只需再采集剩余的时长；观测窗不短于测量时长时，直接以观测窗的平均电流为结果。
+        观测窗内电流仍有漂移（与后续采样的平均值不一致）时，舍弃观测窗，重新采集完整的测量时长。
+        指定tolerance时为自适应模式：先采集不少于MIN_BLOCKS个分块的新采样，与观测窗一致时观测窗同样计入，
+        平均电流的置信区间半宽不大于tolerance时结束，测量时长（含计入的观测窗）在min_seconds与seconds之间，
+        平均电流按完整的分块计算。
+        seconds：测量时长，自适应模式下为最长测量时长，例如希望获得30s的电流平均值，则传入参数30；
+        timeout、window_width、max_deviation、window_samples、criterion：同check_current_stability；
+        tolerance：自适应模式的置信区间半宽，单位mA，如0.5；
+        confidence：置信水平，如0.95；
+        min_seconds：自适应模式的最短测量时长，单位秒；
+        block_seconds：计算置信区间的分块时长，单位秒，待机测试传入DRX周期，使每个分块含有相同数量的paging脉冲；
+        返回(平均电流, 来自稳定观测窗的采样点数)，电流不稳定时平均电流为None。
+        置信区间半宽保存于confidence_interval。
+        '''
+        self.confidence_interval = None
+        if window_samples is None:
+            window_samples = int(round(window_width / self.sampling_period))
+        is_current_stable, sweeps = self._settle(timeout, window_samples, max_deviation,
+                                                 criterion)
+        if not is_current_stable:
+            return None, 0
+        t_stable = time.time()
+
+        block_size = int(round((block_seconds or STABILITY_BLOCK_SECONDS) / self.sampling_period))
+        statistics = stability.SequentialMean(block_size)
+        total_samples = int(round(seconds / (self.sampling_period * SWEEP_POINTS))) * SWEEP_POINTS
+        if tolerance is not None:
+            settle_samples = sum(len(samples) * weight for samples, weight in sweeps)
+            min_samples = int(round(min_seconds / self.sampling_period))
+            fresh_sweeps = self._read_sweeps(max(min_samples - settle_samples,
+                                                 MIN_BLOCKS * block_size))
+            # 观测窗内仍有缓慢漂移时只使用稳定后的采样
+            if not self._is_consistent(sweeps, fresh_sweeps):
+                self.logger.debug('Settle window drifts from the measurement, discarded.')
+                settle_samples = 0
+                sweeps = []
+            sweeps = sweeps + fresh_sweeps
+            for samples, weight in sweeps:
+                statistics.add_samples(samples, weight)
+            sweeps.extend(self._read_sweeps_until(
+                statistics, tolerance, confidence, min_samples, total_samples,
+                sum(len(samples) * weight for samples, weight in sweeps)))
+            average_current = round(statistics.mean() * 1000, 1)
+        else:
+            settle_samples = sum(len(samples) * weight for samples, weight in sweeps)
+            fresh_sweeps = self._read_sweeps(total_samples - settle_samples)
+            # 观测窗内电流仍在缓慢变化时，其平均值与后续采样不一致，舍弃观测窗并补足测量时长
+            if fresh_sweeps and not self._is_consistent(sweeps, fresh_sweeps):
+                self.logger.debug('Settle window drifts from the measurement, discarded.')
+                settle_samples = 0
+                fresh_sweeps.extend(self._read_sweeps(
+                    total_samples - sum(len(samples) * weight for samples, weight in fresh_sweeps)))
+                sweeps = []
+            sweeps = sweeps + fresh_sweeps
+            for samples, weight in sweeps:
+                statistics.add_samples(samples, weight)
+            average_current = round(sum(block.mean(samples) * len(samples) * weight
+                                        for samples, weight in sweeps) /
+                                    sum(len(samples) * weight for samples, weight in sweeps) *
+                                    1000, 1)
+
+        sample_count = sum(len(samples) * weight for samples, weight in sweeps)
+        if self.acquisition_mode == 'ARRAY':
+            self.waveform = block.concatenate([samples for samples, weight in sweeps])
+            # 计入稳定观测窗时，波形从观测窗开始，按观测窗的采样点数推算开始时刻
+            self.waveform_times = (t_stable - settle_samples * self.sampling_period, time.time())
+        half_width = statistics.half_width(confidence)
+        if half_width is not None:
+            self.confidence_interval = round(half_width * 1000, 3)
+        self.logger.info('Average current: %.1fmA +/- %smA (%.0f%%), %d of %d samples from '
+                         'settle window' % (average_current, self.confidence_interval,
+                                            confidence * 100, settle_samples, sample_count))
+        return average_current, settle_samples
+
+    def _read_sweeps_until(self, statistics, tolerance, confidence, min_samples, max_samples,
+                           sample_count=0):
+        '''
+        该方法用于连续采样，直至平均电流置信区间的半宽不大于tolerance（mA），
+        且采样点数不少于min_samples、分块数不少于MIN_BLOCKS；或采样点数达到max_samples。
+        只在完成一个新分块时判断，使测量时长为分块时长的整数倍。
+        sample_count：statistics中已有的采样点数，已满足条件时不再采样；
+        返回_read_sweep返回值的列表。
+        '''
+        sweeps = []
+        block_count = None
+        with self._inst.phase('current measurement'):
+            while sample_count < max_samples:
+                if statistics.count != block_count:
+                    block_count = statistics.count
+                    if sample_count >= min_samples and block_count >= MIN_BLOCKS and \
+                            statistics.half_width(confidence) * 1000 <= tolerance:
+                        break
+                samples, weight = self._read_sweep()
+                statistics.add_samples(samples, weight)
+                sweeps.append((samples, weight))
+                sample_count += len(samples) * weight
+        return sweeps
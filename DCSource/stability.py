@@ -0,0 +1,207 @@
+# -*- coding:utf-8 -*-
+###############################################################################
+# Copyright (C), 2018, TP-LINK Technologies Co., Ltd.
+#
+# 作者：吴扬波
+# 版本：V1.0
+# 变更历史:
+# 1，2026-10-18， 吴扬波——首次创建：StabilityDetector类，用于按采样序列增量判断电流稳定性
+# 2，2026-10-18， 吴扬波——增加SequentialMean类，用于按置信区间判断测量是否可以结束
+# 3，2026-10-18， 吴扬波——_BlockAccumulator改为由调用方传入分块平均值的处理函数，不再由子类覆盖
+# 若引用或修改API，请保留API变更历史。
+###############################################################################
+from Utility import block
+import math
+
+
+def normal_quantile(probability):
+    '''
+    返回标准正态分布的probability分位数。
+    '''
+    low, high = -10.0, 10.0
+    for _ in range(100):
+        middle = (low + high) / 2
+        if 0.5 * (1 + math.erf(middle / math.sqrt(2))) < probability:
+            low = middle
+        else:
+            high = middle
+    return (low + high) / 2
+
+
+def t_quantile(probability, freedom):
+    '''
+    返回自由度为freedom的t分布的probability分位数，按Cornish-Fisher展开近似。
+    '''
+    z = normal_quantile(probability)
+    return (z + (z ** 3 + z) / (4.0 * freedom) +
+            (5 * z ** 5 + 16 * z ** 3 + 3 * z) / (96.0 * freedom ** 2) +
+            (3 * z ** 7 + 19 * z ** 5 + 17 * z ** 3 - 15 * z) / (384.0 * freedom ** 3))
+
+
+class _BlockAccumulator(object):
+    '''
+    将原始采样值按block_size个采样点分块求平均，每得到一个分块平均值调用push函数。
+    '''
+
+    def __init__(self, block_size, push):
+        '''
+        block_size：分块的采样点数；
+        push：分块平均值的处理函数，参数为分块平均值。
+        '''
+        self.block_size = block_size
+        self._push = push
+        # 未满一个分块的采样值之和、采样点数
+        self._partial_sum = 0.0
+        self._partial_count = 0
+
+    def add_samples(self, samples, weight=1):
+        '''
+        该方法用于加入一段采样序列。
+        samples：采样值数组；
+        weight：每个值代表的采样点数，如加入一次采样的平均值时传入该次采样的点数。
+        '''
+        index = 0
+        total = len(samples)
+        while index < total:
+            need = int(math.ceil((self.block_size - self._partial_count) / float(weight)))
+            chunk = samples[index:index + need]
+            self._partial_sum += block.mean(chunk) * len(chunk) * weight
+            self._partial_count += len(chunk) * weight
+            index += len(chunk)
+            if self._partial_count >= self.block_size:
+                self._push(self._partial_sum / self._partial_count)
+                self._partial_sum = 0.0
+                self._partial_count = 0
+
+
+class StabilityDetector(object):
+    '''
+    StabilityDetector类，滑动窗电流稳定性判断。
+    原始采样值按block_size个采样点分块求平均，分块平均值存入环形缓存，
+    窗口由最近window_samples个采样点对应的分块组成。
+    分块平均值的和、平方和随入窗、出窗增量更新，标准差为O(1)计算；
+    平均绝对偏差在窗内分块平均值上计算，分块数量很少，耗时可忽略。
+    '''
+
+    def __init__(self, window_samples, block_size):
+        '''
+        window_samples：观测窗宽度，单位采样点；
+        block_size：分块的采样点数，判断基于分块平均值，偏差阈值与分块时长相关。
+        '''
+        self.block_size = block_size
+        self._blocks = _BlockAccumulator(block_size, self._push)
+        self.window_blocks = max(int(window_samples // block_size), 2)
+        self._ring = [0.0] * self.window_blocks
+        self._index = 0
+        self._count = 0
+        # 分块平均值减去首个分块平均值后累加，避免平方和相减时损失精度
+        self._reference = None
+        self._sum = 0.0
+        self._square_sum = 0.0
+
+    def add_samples(self, samples, weight=1):
+        '''
+        该方法用于加入一段采样序列，参数同_BlockAccumulator.add_samples。
+        '''
+        self._blocks.add_samples(samples, weight)
+
+    def _push(self, value):
+        '''
+        加入一个分块平均值，窗口已满时移出最早的分块。
+        '''
+        if self._reference is None:
+            self._reference = value
+        value -= self._reference
+        if self._count == self.window_blocks:
+            oldest = self._ring[self._index]
+            self._sum -= oldest
+            self._square_sum -= oldest * oldest
+        else:
+            self._count += 1
+        self._ring[self._index] = value
+        self._index = (self._index + 1) % self.window_blocks
+        self._sum += value
+        self._square_sum += value * value
+
+    def is_full(self):
+        '''
+        返回观测窗是否已填满。
+        '''
+        return self._count == self.window_blocks
+
+    def mean(self):
+        '''
+        返回窗内平均值。
+        '''
+        return self._reference + self._sum / self._count
+
+    def std(self):
+        '''
+        返回窗内分块平均值的标准差。
+        '''
+        mean = self._sum / self._count
+        return math.sqrt(max(self._square_sum / self._count - mean * mean, 0.0))
+
+    def mean_absolute_deviation(self):
+        '''
+        返回窗内分块平均值的平均绝对偏差。
+        '''
+        mean = self._sum / self._count
+        return sum(abs(value - mean) for value in self._ring[:self._count]) / self._count
+
+    def deviation(self, criterion='MAD'):
+        '''
+        返回窗内的偏差。
+        criterion：'MAD'，平均绝对偏差；'STD'，标准差。
+        '''
+        if criterion == 'STD':
+            return self.std()
+        return self.mean_absolute_deviation()
+
+
+class SequentialMean(object):
+    '''
+    SequentialMean类，按分块平均值增量计算平均值及其置信区间。
+    分块时长取DRX周期的整数倍时，每个分块包含相同数量的paging脉冲，分块平均值近似独立同分布，
+    置信区间按t分布计算。
+    '''
+
+    def __init__(self, block_size):
+        '''
+        block_size：分块的采样点数。
+        '''
+        self.block_size = block_size
+        self._blocks = _BlockAccumulator(block_size, self._push)
+        self.count = 0
+        self._mean = 0.0
+        self._square_deviation = 0.0
+
+    def add_samples(self, samples, weight=1):
+        '''
+        该方法用于加入一段采样序列，参数同_BlockAccumulator.add_samples。
+        '''
+        self._blocks.add_samples(samples, weight)
+
+    def _push(self, value):
+        # Welford算法更新平均值、离差平方和
+        self.count += 1
+        delta = value - self._mean
+        self._mean += delta / self.count
+        self._square_deviation += delta * (value - self._mean)
+
+    def mean(self):
+        '''
+        返回分块平均值的平均值。
+        '''
+        return self._mean
+
+    def half_width(self, confidence=0.95):
+        '''
+        返回平均值置信区间的半宽，分块数少于2时返回None。
+        confidence：置信水平，如0.95。
+        '''
+        if self.count < 2:
+            return None
+        freedom = self.count - 1
+        standard_error = math.sqrt(self._square_deviation / freedom / self.count)
+        return t_quantile(0.5 + confidence / 2.0, freedom) * standard_error
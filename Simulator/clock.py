@@ -0,0 +1,71 @@
+# -*- coding:utf-8 -*-
+###############################################################################
+# Copyright (C), 2018, TP-LINK Technologies Co., Ltd.
+#
+# 作者：吴扬波
+# 版本：V1.0
+# 变更历史:
+# 1，2026-10-18， 吴扬波——首次创建：SimClock类，用于仿真时的加速时钟
+# 若引用或修改API，请保留API变更历史。
+###############################################################################
+import time as _time
+
+
+class SimClock(object):
+    '''
+    SimClock类，按固定倍率加速的仿真时钟。
+    提供与time模块相同的time、sleep接口，可替换被测模块中的time模块，
+    使30s的电流测量、5s的频段切换等待等在仿真中按倍率缩短，且多线程下依然有效。
+    '''
+
+    def __init__(self, speedup=100.0):
+        '''
+        speedup：加速倍率，仿真时钟走过speedup秒，实际时间走过1秒。
+        '''
+        self.speedup = float(speedup)
+        self._real_start = _time.time()
+        self._sim_start = self._real_start
+
+    def time(self):
+        '''
+        返回仿真时间，单位秒。
+        '''
+        return self._sim_start + (_time.time() - self._real_start) * self.speedup
+
+    def sleep(self, seconds):
+        '''
+        按仿真时间休眠。
+        seconds：仿真时长，单位秒。
+        '''
+        if seconds > 0:
+            _time.sleep(seconds / self.speedup)
+
+    def sleep_until(self, deadline):
+        '''
+        休眠至仿真时间deadline。
+        '''
+        self.sleep(deadline - self.time())
+
+    def __getattr__(self, name):
+        # 其余接口（strftime、localtime等）沿用真实的time模块
+        return getattr(_time, name)
+
+    def patch(self, modules):
+        '''
+        将模块中引用的time模块替换为本时钟。
+        modules：被替换的模块列表；
+        返回替换前的(模块, time模块)列表，用于restore方法恢复。
+        '''
+        patched = []
+        for module in modules:
+            patched.append((module, module.time))
+            module.time = self
+        return patched
+
+    @staticmethod
+    def restore(patched):
+        '''
+        恢复patch方法替换的time模块。
+        '''
+        for module, origin in patched:
+            module.time = origin
@@ -0,0 +1,190 @@
+# -*- coding:utf-8 -*-
+###############################################################################
+# Copyright (C), 2018, TP-LINK Technologies Co., Ltd.
+#
+# 作者：吴扬波
+# 版本：V1.0
+# 变更历史:
+# 1，2026-10-18， 吴扬波——首次创建：DUTModel类，用于仿真被测终端的电流波形
+# 2，2026-10-18， 吴扬波——采样序列改为分段取值、查表噪声，加快生成速度
+# 若引用或修改API，请保留API变更历史。
+###############################################################################
+import math
+import random
+import threading
+
+# 各制式业务态基础电流，单位mA
+CONNECTED_BASE_CURRENT = {'LTE': 180.0, 'WCDMA': 150.0, 'GSM': 110.0}
+# 各制式发射占空比，GSM只在1个时隙发射
+TX_DUTY_CYCLE = {'LTE': 1.0, 'WCDMA': 1.0, 'GSM': 1.0 / 8}
+# 生成采样序列时，稳定过程电流每段取同一值的采样点数
+SEGMENT_SAMPLES = 256
+# 预先生成的高斯噪声表长度
+NOISE_TABLE_SIZE = 65536
+
+
+class DUTModel(object):
+    '''
+    DUTModel类，根据CMW500仿真仪器设置的网络状态，生成被测终端的合成电流波形。
+    状态切换后电流按指数规律稳定，待机态叠加周期性的paging脉冲，并带有高斯噪声。
+    '''
+
+    def __init__(self, clock, seed=0):
+        '''
+        clock：仿真时钟；
+        seed：噪声随机数种子，保证仿真结果可复现。
+        '''
+        self.clock = clock
+        # 网络侧仿真仪器，读取电流前推进其状态机
+        self.network = None
+        self.voltage = 4.0
+        self.settle_tau = 2.0
+        self.search_current = 40.0
+        self.standby_current = 2.0
+        self.paging_current = 25.0
+        self.paging_width = 0.01
+        self.connected_noise = 2.0
+        self.standby_noise = 0.05
+        self.pa_efficiency = 0.4
+
+        self.rat = None
+        self.state = 'OFF'
+        self.tx_power = 0.0
+        self.paging_period = 1.28
+
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+        self._noise_tables = {}
+        self._change_time = clock.time()
+        self._start_level = self.search_current
+        self._target_level = self.search_current
+
+    def update(self, state=None, rat=None, tx_power=None, paging_period=None, when=None):
+        '''
+        更新终端状态，电流从当前值开始向新的稳态值过渡。
+        state：'OFF'（无小区搜网）、'IDLE'（驻网待机）、'CONNECTED'（业务态）；
+        rat：制式，'LTE'、'WCDMA'、'GSM'；
+        tx_power：上行发射功率，单位dbm；
+        paging_period：paging周期，单位秒；
+        when：状态切换的仿真时刻，默认为当前时刻。
+        '''
+        with self._lock:
+            now = self.clock.time() if when is None else max(when, self._change_time)
+            level = self._level(now)
+            if state is not None:
+                self.state = state
+            if rat is not None:
+                self.rat = rat
+            if tx_power is not None:
+                self.tx_power = float(tx_power)
+            if paging_period is not None:
+                self.paging_period = float(paging_period)
+            self._change_time = now
+            self._start_level = level
+            self._target_level = self._steady_level()
+
+    def _steady_level(self):
+        '''
+        返回当前状态下的稳态电流（不含paging脉冲、噪声），单位mA。
+        '''
+        if self.state == 'CONNECTED' and self.rat:
+            pa_power = math.pow(10, self.tx_power / 10.0)
+            pa_current = pa_power / (self.voltage * self.pa_efficiency)
+            return CONNECTED_BASE_CURRENT[self.rat] + pa_current * TX_DUTY_CYCLE[self.rat]
+        elif self.state == 'IDLE':
+            return self.standby_current
+        return self.search_current
+
+    def _level(self, t):
+        '''
+        返回t时刻的稳定过程电流值，单位mA。
+        '''
+        decay = math.exp(-max(t - self._change_time, 0) / self.settle_tau)
+        return self._target_level + (self._start_level - self._target_level) * decay
+
+    def _level_integral(self, t0, t1):
+        '''
+        返回稳定过程电流在[t0, t1]内的积分。
+        '''
+        tc = self._change_time
+        t0 = max(t0, tc)
+        if t1 <= t0:
+            return 0.0
+        delta = self._start_level - self._target_level
+        tau = self.settle_tau
+        return (self._target_level * (t1 - t0) +
+                delta * tau * (math.exp(-(t0 - tc) / tau) - math.exp(-(t1 - tc) / tau)))
+
+    def _paging_time(self, t):
+        '''
+        返回[0, t]内paging脉冲持续的总时长，单位秒。
+        '''
+        cycles = math.floor(t / self.paging_period)
+        return cycles * self.paging_width + min(t - cycles * self.paging_period,
+                                                self.paging_width)
+
+    def _noise(self):
+        if self.state == 'CONNECTED':
+            return self.connected_noise
+        return self.standby_noise
+
+    def average(self, t0, t1, sampling_period):
+        '''
+        返回[t0, t1]内按sampling_period采样的平均电流，单位A。
+        '''
+        with self._lock:
+            duration = max(t1 - t0, sampling_period)
+            # 状态切换前的部分按切换时刻的初值计
+            before = max(min(t1, self._change_time) - t0, 0)
+            total = self._start_level * before + self._level_integral(t0, t0 + duration)
+            if self.state == 'IDLE':
+                total += self.paging_current * (self._paging_time(t0 + duration) -
+                                                self._paging_time(t0))
+            average = total / duration
+            count = max(duration / sampling_period, 1)
+            average += self._random.gauss(0, self._noise() / math.sqrt(count))
+        return average / 1000.0
+
+    def samples(self, t0, count, sampling_period):
+        '''
+        返回从t0开始、按sampling_period采样的count个电流采样值列表，单位A。
+        稳定过程电流按SEGMENT_SAMPLES个采样点分段取值，噪声取自预先生成的噪声表，
+        使生成4096点的采样序列耗时远小于采样时长。
+        '''
+        with self._lock:
+            noise_table = self._get_noise_table(self._noise())
+            result = []
+            for start in range(0, count, SEGMENT_SAMPLES):
+                size = min(SEGMENT_SAMPLES, count - start)
+                t = t0 + (start + size / 2.0) * sampling_period
+                level = (self._level(t) if t >= self._change_time else self._start_level) / 1000.0
+                offset = self._random.randrange(NOISE_TABLE_SIZE - size)
+                result.extend([level + value for value in noise_table[offset:offset + size]])
+            if self.state == 'IDLE':
+                self._add_paging(result, t0, sampling_period)
+        return result
+
+    def _get_noise_table(self, noise):
+        '''
+        返回标准差为noise（mA）的高斯噪声表，单位A，按标准差缓存。
+        '''
+        table = self._noise_tables.get(noise)
+        if table is None:
+            table = [self._random.gauss(0, noise) / 1000.0 for _ in range(NOISE_TABLE_SIZE)]
+            self._noise_tables[noise] = table
+        return table
+
+    def _add_paging(self, result, t0, sampling_period):
+        '''
+        在采样序列中叠加落在采样区间内的paging脉冲。
+        '''
+        paging_current = self.paging_current / 1000.0
+        t1 = t0 + len(result) * sampling_period
+        burst = math.floor(t0 / self.paging_period) * self.paging_period
+        while burst < t1:
+            first = max(int(math.ceil((burst - t0) / sampling_period)), 0)
+            last = min(int(math.ceil((burst + self.paging_width - t0) / sampling_period)),
+                       len(result))
+            for index in range(first, last):
+                result[index] += paging_current
+            burst += self.paging_period
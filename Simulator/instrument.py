@@ -0,0 +1,616 @@
+# -*- coding:utf-8 -*-
+###############################################################################
+# Copyright (C), 2018, TP-LINK Technologies Co., Ltd.
+#
+# 作者：吴扬波
+# 版本：V1.0
+# 变更历史:
+# 1，2026-10-18， 吴扬波——首次创建：CMW500、66319B仿真仪器，用于离线测试、性能基准测试
+# 2，2026-10-18， 吴扬波——66319B增加采集触发、FETCh:ARRay:CURRent?二进制块返回
+# 3，2026-10-18， 吴扬波——CMW500测量结果支持FORMat:BASE:DATA REAL二进制块返回
+# 4，2026-10-18， 吴扬波——CMW500线损表支持多点CREate、ADD、DETails?，不随*RST清除
+# 5，2026-10-18， 吴扬波——增加drop_link方法，模拟链路断开，用于验证会话重连
+# 6，2026-10-18， 吴扬波——CMW500线损表支持EXISt?
+# 7，2026-10-18， 吴扬波——支持*ESR?、SYSTem:ERRor?，增加rejected_headers模拟仪器拒绝设置
+# 8，2026-10-18， 吴扬波——设置read_termination时read_raw读到终止符字节即返回，同visa资源的TERMCHAR_EN
+# 9，2026-10-18， 吴扬波——设置项指令头随scpi.normalize_node修正，BASE、DATA不再截取
+# 10，2026-10-18， 吴扬波——SimulatedTimeoutError增加visa错误码VI_ERROR_TMO
+# 若引用或修改API，请保留API变更历史。
+###############################################################################
+from Utility import scpi
+import collections
+import threading
+import random
+import struct
+
+
+class SimulatedTimeoutError(Exception):
+    '''
+    仿真仪器等待返回值超时，对应visa的VI_ERROR_TMO。
+    '''
+    error_code = -1073807339
+
+
+class SimulatedConnectionLost(IOError):
+    '''
+    仿真仪器链路断开，对应visa的VI_ERROR_CONN_LOST。
+    '''
+    error_code = -1073807194
+
+
+class SimulatedInstrument(object):
+    '''
+    仿真仪器基类，提供与visa资源相同的write、query、read、read_raw接口。
+    每条指令按传输时延计时，设置类指令按操作时延推迟*OPC?的返回，
+    并统计指令收发次数。
+    '''
+    # 单次写入、查询的传输时延，单位秒
+    write_latency = 0.001
+    query_latency = 0.002
+    # 设置类指令的默认操作时延，单位秒
+    default_operation_delay = 0.005
+    # 指令头前缀对应的操作时延，单位秒
+    operation_delay = {}
+    # *OPC?的返回值
+    opc_response = '1'
+    # 设置项的默认值
+    default_settings = {}
+
+    def __init__(self, clock, address):
+        self.clock = clock
+        self.address = address
+        self.timeout = 2000
+        self.read_termination = None
+        self.write_termination = '\n'
+        self.counters = collections.Counter()
+        self.settings = dict(self.default_settings)
+        self._output = collections.deque()
+        # read_raw未读完的返回值
+        self._raw_pending = ''
+        self._busy_until = 0.0
+        self._lock = threading.RLock()
+        # 模拟链路断开：之后的若干次收发抛出SimulatedConnectionLost
+        self._dropped_calls = 0
+        # 模拟仪器拒绝的设置项指令头（规范化短格式），写入时不生效，置位执行错误并记入错误队列
+        self.rejected_headers = set()
+        self._esr = 0
+        self._errors = collections.deque()
+
+    def drop_link(self, calls=1):
+        '''
+        该方法用于模拟链路断开，之后calls次收发失败，重新打开资源后恢复。
+        '''
+        self._dropped_calls = calls
+
+    def _check_link(self):
+        if self._dropped_calls:
+            self._dropped_calls -= 1
+            self.counters['link_error'] += 1
+            raise SimulatedConnectionLost('%s: connection lost' % self.address)
+
+    def write(self, message):
+        '''
+        写入程序消息。
+        '''
+        with self._lock:
+            self._check_link()
+            self.counters['write'] += 1
+            self.counters['round_trip'] += 1
+            self.clock.sleep(self.write_latency)
+            self._handle(message)
+            return len(message), 0
+
+    def read(self):
+        '''
+        读取一条返回值，去除终止符。
+        '''
+        with self._lock:
+            self._check_link()
+            self.counters['read'] += 1
+            self.counters['round_trip'] += 1
+            return self._pop_response()
+
+    def read_raw(self):
+        '''
+        读取一条返回值的原始字节流，含终止符。
+        同visa资源的TERMCHAR_EN，设置了read_termination时读到终止符字节即返回，
+        二进制块数据中含有该字节时只返回到该字节为止，其余部分由之后的read_raw返回。
+        '''
+        with self._lock:
+            self._check_link()
+            self.counters['read_raw'] += 1
+            self.counters['round_trip'] += 1
+            if not self._raw_pending:
+                self._raw_pending = self._pop_response() + '\n'
+            size = len(self._raw_pending)
+            if self.read_termination:
+                size = self._raw_pending.find(self.read_termination[-1]) + 1 or size
+            data, self._raw_pending = self._raw_pending[:size], self._raw_pending[size:]
+            return data
+
+    def query(self, message):
+        '''
+        写入查询指令并读取返回值。
+        '''
+        with self._lock:
+            self._check_link()
+            self.counters['query'] += 1
+            self.counters['round_trip'] += 1
+            self.clock.sleep(self.query_latency)
+            self._handle(message)
+            return self._pop_response()
+
+    def close(self):
+        pass
+
+    def _pop_response(self):
+        if not self._output:
+            self.clock.sleep(self.timeout / 1000.0)
+            raise SimulatedTimeoutError('%s: no response, timeout expired' % self.address)
+        return self._output.popleft()
+
+    def _handle(self, message):
+        '''
+        逐条处理程序消息中的指令，查询指令的返回值放入输出队列。
+        '''
+        self.advance()
+        responses = []
+        for header, args in scpi.parse_message(message):
+            if header.endswith('?'):
+                responses.append(self._query(header[:-1], args))
+            elif header in self.rejected_headers:
+                self._esr |= 0x10
+                self._errors.append('-222,"Data out of range;%s %s"' % (header, args))
+            else:
+                self._set(header, args)
+                self._busy_until = max(self._busy_until, self.clock.time()) + \
+                    self._get_operation_delay(header)
+        if responses:
+            self._output.append(';'.join(responses))
+
+    @staticmethod
+    def _format_block(values, swapped):
+        '''
+        将数值序列格式化为IEEE 488.2定长二进制块，单精度浮点。
+        swapped：为True时低字节在前，否则高字节在前。
+        '''
+        data = struct.pack('%s%df' % ('<' if swapped else '>', len(values)), *values)
+        length = str(len(data))
+        return '#%d%s%s' % (len(length), length, data)
+
+    def _get_operation_delay(self, header):
+        for prefix, delay in self.operation_delay.items():
+            if header.startswith(prefix):
+                return delay
+        return self.default_operation_delay
+
+    def _wait_until_idle(self):
+        '''
+        *OPC?阻塞至所有挂起的操作完成，超过超时时间则抛出超时异常。
+        '''
+        deadline = self.clock.time() + self.timeout / 1000.0
+        if self._busy_until > deadline:
+            self.clock.sleep_until(deadline)
+            raise SimulatedTimeoutError('%s: *OPC? timeout expired' % self.address)
+        self.clock.sleep_until(self._busy_until)
+
+    def advance(self):
+        '''
+        推进仪器内部状态机，由子类实现。
+        '''
+        pass
+
+    def reset(self):
+        self.settings = dict(self.default_settings)
+
+    def _set(self, header, args):
+        if header == '*RST':
+            self.reset()
+        self.settings[header] = args
+
+    def _query(self, header, args):
+        if header == '*OPC':
+            self._wait_until_idle()
+            return self.opc_response
+        if header == '*IDN':
+            return self.idn
+        if header == '*ESR':
+            esr, self._esr = self._esr, 0
+            return str(esr)
+        if header == 'SYST:ERR':
+            return self._errors.popleft() if self._errors else '0,"No error"'
+        if args:
+            return self.settings.get(header + ' ' + args, '')
+        return self.settings.get(header, '0')
+
+
+class _SignallingCell(object):
+    '''
+    单个制式信令小区的状态机：小区开关、终端注册、连接建立、切换。
+    '''
+
+    def __init__(self, rat, registered_state, on_delay, register_delay, connect_delay):
+        self.rat = rat
+        self.registered_state = registered_state
+        self.on_delay = on_delay
+        self.off_delay = 0.5
+        self.register_delay = register_delay
+        self.connect_delay = connect_delay
+        self.handover_delay = 1.0
+        self.cell_state = 'OFF,ADJ'
+        self.ue_state = 'OFF'
+        self.events = []
+
+    def schedule(self, when, callback):
+        self.events.append((when, callback))
+        self.events.sort(key=lambda event: event[0])
+
+
+class SimulatedCMW500(SimulatedInstrument):
+    '''
+    CMW500仿真仪器，模拟LTE、WCDMA、GSM信令小区的状态机、功率测量，
+    并将网络状态同步给终端电流模型。
+    '''
+    write_latency = 0.0008
+    query_latency = 0.0015
+    operation_delay = {
+        '*RST': 3.0,
+        'CONF:LTE:SIGN:BAND': 0.3,
+        'CONF:LTE:SIGN:RFS:CHAN:DL': 0.15,
+        'CONF:LTE:SIGN:CELL:BAND:DL': 0.2,
+        'CONF:WCDM:SIGN:RFS:CARR:DL': 0.2,
+        'CONF:GSM:SIGN:BAND:BCCH': 0.2,
+        'CONF:GSM:SIGN:RFS:CHAN': 0.1,
+        'CONF:GSM:SIGN:CELL:BIND': 1.0,
+        'CONF:BASE:FDC:CTAB:CRE': 0.1,
+        'CONF:BASE:FDC:CTAB:ADD': 0.1,
+        'CONF:FDC:ACT': 0.1,
+    }
+    default_settings = {
+        'CONF:LTE:SIGN:BAND': 'OB1',
+        'CONF:LTE:SIGN:RFS:CHAN:DL': '300',
+        'CONF:LTE:SIGN:CELL:BAND:DL': 'B100',
+        'CONF:LTE:SIGN:UL:PUSC:TPC:SET': 'CLO',
+        'CONF:LTE:SIGN:UL:PUSC:TPC:CLTP': '0',
+        'CONF:LTE:SIGN:UL:PMAX': '23',
+        'CONF:LTE:SIGN:DL:RSEP:LEV': '-57',
+        'CONF:LTE:SIGN:CONN:DPCY': 'P128',
+        'CONF:LTE:SIGN:CONN:RMC:UL': 'N1,QPSK,KEEP',
+        'CONF:LTE:SIGN:CONN:RMC:RBP:UL': 'LOW',
+        'CONF:WCDM:SIGN:RFS:CARR:DL': 'OB1,10700',
+        'CONF:WCDM:SIGN:UL:TPC:SET': 'CLO',
+        'CONF:WCDM:SIGN:UL:TPC:TPOW': '0',
+        'CONF:WCDM:SIGN:UL:PRAC:DRXC': '7',
+        'CONF:GSM:SIGN:BAND:BCCH': 'G09',
+        'CONF:GSM:SIGN:RFS:CHAN:BCCH': '37',
+        'CONF:GSM:SIGN:RFS:CHAN:TCH': '37',
+        'CONF:GSM:SIGN:RFS:PCL:TCH:CSW': '5',
+        'CONF:GSM:SIGN:CELL:BIND': 'G18',
+        'CONF:GSM:SIGN:CELL:BSP': '5',
+        'FORM:BASE:DATA': 'ASC',
+        'FORM:BASE:BORD': 'SWAP',
+    }
+    # 各制式信令指令头中的名称
+    rat_names = {'LTE': 'LTE', 'WCDM': 'WCDMA', 'GSM': 'GSM'}
+    # 各制式测量结果中功率所在位置及结果字段总数
+    result_layout = {
+        'LTE': ('MOD:AVER', 17, 30),
+        'WCDMA': ('TRAC:UEP:AVER', 1, 2),
+        'GSM': ('PVT', 5, 8),
+    }
+    idn = 'Rohde&Schwarz,CMW,1201.0002k50/000000,3.7.20'
+
+    def __init__(self, clock, address, dut):
+        SimulatedInstrument.__init__(self, clock, address)
+        self.dut = dut
+        dut.network = self
+        self.measure_delay = 0.2
+        self.power_error = 0.1
+        self._random = random.Random(1)
+        # 线损表：名称 -> [(频率(Hz), 线损(dB)), ...]，保存在仪器中，不随*RST清除
+        self.correction_tables = {}
+        self._init_cells()
+
+    def _init_cells(self):
+        self.cells = {
+            'LTE': _SignallingCell('LTE', 'ATT', 2.0, 8.0, 0.5),
+            'WCDMA': _SignallingCell('WCDMA', 'REG', 2.0, 10.0, 3.0),
+            'GSM': _SignallingCell('GSM', 'SYNC', 1.5, 5.0, 3.0),
+        }
+        self.active_rat = None
+        self.measurements = {}
+
+    def reset(self):
+        SimulatedInstrument.reset(self)
+        self._init_cells()
+        self.dut.update(state='OFF')
+
+    def advance(self):
+        '''
+        按仿真时间依次执行到期的状态切换。
+        '''
+        with self._lock:
+            now = self.clock.time()
+            for cell in self.cells.values():
+                while cell.events and cell.events[0][0] <= now:
+                    when, callback = cell.events.pop(0)
+                    callback(when)
+
+    def _rat_of(self, header):
+        return self.rat_names.get(header.split(':')[1])
+
+    def _set(self, header, args):
+        SimulatedInstrument._set(self, header, args)
+        nodes = header.split(':')
+        rat = self._rat_of(header) if len(nodes) > 1 else None
+        now = self.clock.time()
+        if header.startswith('SOUR:') and header.endswith(':SIGN:CELL:STAT'):
+            self._switch_cell(rat, args.upper().startswith('ON'), now)
+        elif header.startswith('CALL:') and ':HAND' in header:
+            self._handover(rat, now)
+        elif header.startswith('CALL:') and args.upper().startswith('CONN'):
+            self._connect(rat, now)
+        elif header.startswith('CALL:') and args.upper().startswith('HAND'):
+            self._handover(rat, now)
+        elif header.startswith('INIT:') and ':MEAS:MEV' in header:
+            self.measurements[rat] = now + self.measure_delay
+        elif header in ('CONF:BASE:FDC:CTAB:CRE', 'CONF:BASE:FDC:CTAB:ADD'):
+            fields = [field.strip() for field in args.split(',')]
+            points = self.correction_tables.setdefault(fields[0].strip("'\""), [])
+            if header.endswith(':CRE'):
+                del points[:]
+            for frequency, correction in zip(fields[1::2], fields[2::2]):
+                scale = 1e6 if frequency.upper().endswith('MHZ') else 1.0
+                points.append((float(frequency.upper().rstrip('MHZ')) * scale, float(correction)))
+            points.sort()
+        elif header == 'CONF:BASE:FDC:CTAB:DEL':
+            self.correction_tables.pop(args.strip().strip("'\""), None)
+        elif header == 'CONF:GSM:SIGN:BAND:BCCH':
+            self.settings['SENS:GSM:SIGN:BAND:TCH'] = args
+        elif ':TPC:' in header or ':PCL:' in header or header.endswith(':PMAX'):
+            self._update_dut(rat)
+        elif header in ('CONF:LTE:SIGN:CONN:DPCY', 'CONF:WCDM:SIGN:UL:PRAC:DRXC',
+                        'CONF:GSM:SIGN:CELL:BSP'):
+            self._update_dut(rat)
+
+    def _switch_cell(self, rat, on, now):
+        cell = self.cells[rat]
+        cell.events = []
+        if on:
+            cell.cell_state = 'ON,PEND'
+            self.active_rat = rat
+
+            def cell_on(when):
+                cell.cell_state = 'ON,ADJ'
+                cell.ue_state = 'ON'
+
+            def registered(when):
+                cell.ue_state = cell.registered_state
+                self._update_dut(rat, when)
+
+            cell.schedule(now + cell.on_delay, cell_on)
+            cell.schedule(now + cell.on_delay + cell.register_delay, registered)
+        else:
+            cell.cell_state = 'OFF,PEND'
+
+            def cell_off(when):
+                cell.cell_state = 'OFF,ADJ'
+                cell.ue_state = 'OFF'
+                self._update_dut(rat, when)
+
+            cell.schedule(now + cell.off_delay, cell_off)
+
+    def _connect(self, rat, now):
+        cell = self.cells[rat]
+        if cell.ue_state != cell.registered_state:
+            return
+        cell.ue_state = 'SIGN'
+
+        def connected(when):
+            cell.ue_state = 'CEST'
+            self._update_dut(rat, when)
+
+        cell.schedule(now + cell.connect_delay, connected)
+
+    def _handover(self, rat, now):
+        cell = self.cells[rat]
+        if cell.ue_state != 'CEST':
+            return
+        cell.ue_state = 'HAND'
+
+        def handover_done(when):
+            cell.ue_state = 'CEST'
+            if rat == 'GSM':
+                self.settings['SENS:GSM:SIGN:BAND:TCH'] = \
+                    self.settings.get('PREP:GSM:SIGN:HAND:TARG', '')
+                self.settings['CONF:GSM:SIGN:RFS:CHAN:TCH'] = \
+                    self.settings.get('PREP:GSM:SIGN:HAND:CHAN:TCH', '')
+            self._update_dut(rat, when)
+
+        cell.schedule(now + cell.handover_delay, handover_done)
+
+    def _tx_power(self, rat):
+        '''
+        根据功控设置计算终端的上行发射功率，单位dbm。
+        '''
+        settings = self.settings
+        if rat == 'LTE':
+            pmax = float(settings['CONF:LTE:SIGN:UL:PMAX'])
+            if settings['CONF:LTE:SIGN:UL:PUSC:TPC:SET'].upper().startswith('MAXP'):
+                return pmax
+            return min(float(settings['CONF:LTE:SIGN:UL:PUSC:TPC:CLTP']), pmax)
+        elif rat == 'WCDMA':
+            if settings['CONF:WCDM:SIGN:UL:TPC:SET'].upper().startswith('ALL1'):
+                return 24.0
+            return min(float(settings['CONF:WCDM:SIGN:UL:TPC:TPOW']), 24.0)
+        elif rat == 'GSM':
+            pcl = int(settings['CONF:GSM:SIGN:RFS:PCL:TCH:CSW'])
+            band = settings.get('SENS:GSM:SIGN:BAND:TCH',
+                                settings['CONF:GSM:SIGN:BAND:BCCH'])
+            if band in ('G18', 'G19'):
+                return 30.0 - 2 * pcl
+            return min(43.0 - 2 * pcl, 33.0)
+        return 0.0
+
+    def _paging_period(self, rat):
+        '''
+        根据各制式的DRX配置计算paging周期，单位秒。
+        '''
+        settings = self.settings
+        if rat == 'LTE':
+            return int(settings['CONF:LTE:SIGN:CONN:DPCY'].upper().lstrip('P')) / 100.0
+        elif rat == 'WCDMA':
+            return (2 ** int(settings['CONF:WCDM:SIGN:UL:PRAC:DRXC'])) / 100.0
+        return int(settings['CONF:GSM:SIGN:CELL:BSP']) * 0.2354
+
+    def _update_dut(self, rat, when=None):
+        '''
+        将当前激活制式的网络状态同步给终端电流模型。
+        '''
+        if rat is None or rat != self.active_rat:
+            return
+        ue_state = self.cells[rat].ue_state
+        if ue_state in ('CEST', 'HAND'):
+            state = 'CONNECTED'
+        elif ue_state in (self.cells[rat].registered_state, 'SIGN'):
+            state = 'IDLE'
+        else:
+            state = 'OFF'
+        self.dut.update(state=state, rat=rat, tx_power=self._tx_power(rat),
+                        paging_period=self._paging_period(rat), when=when)
+
+    def _query(self, header, args):
+        nodes = header.split(':')
+        rat = self._rat_of(header) if len(nodes) > 1 else None
+        if header.startswith('SOUR:') and header.endswith(':SIGN:CELL:STAT:ALL'):
+            return self.cells[rat].cell_state
+        elif header.startswith('FETC:') and header.endswith('SW:STAT'):
+            return self.cells[rat].ue_state
+        elif header.startswith('FETC:') and header.endswith(':MEAS:MEV:STAT:ALL'):
+            if self.clock.time() < self.measurements.get(rat, 0):
+                return 'RUN,PEND,ACT'
+            return 'RDY,ADJ,INV'
+        elif header.startswith('FETC:') and ':MEAS:MEV:' in header:
+            return self._measurement_result(rat, header)
+        elif header == 'CONF:BASE:FDC:CTAB:EXIS':
+            return '1' if args.strip().strip("'\"") in self.correction_tables else '0'
+        elif header == 'CONF:BASE:FDC:CTAB:DET':
+            points = self.correction_tables.get(args.strip().strip("'\""), [])
+            return ','.join('%E,%E' % point for point in points)
+        elif header == 'CONF:LTE:SIGN:RFS:CHAN:UL':
+            return str(int(self.settings['CONF:LTE:SIGN:RFS:CHAN:DL']) + 18000)
+        elif header == 'CONF:WCDM:SIGN:CARR:BAND':
+            return self.settings['CONF:WCDM:SIGN:RFS:CARR:DL'].split(',')[0].strip()
+        elif header == 'CONF:WCDM:SIGN:RFS:CARR:CHAN:DL':
+            return self.settings['CONF:WCDM:SIGN:RFS:CARR:DL'].split(',')[1].strip()
+        elif header == 'SENS:GSM:SIGN:BAND:TCH':
+            return self.settings.get('SENS:GSM:SIGN:BAND:TCH',
+                                     self.settings['CONF:GSM:SIGN:BAND:BCCH'])
+        elif header == 'ROUT:GSM:SIGN:SCEN:SCEL' or header.endswith(':SIGN:SCEN:SCEL'):
+            return self.settings.get(header, 'RF1C,RX1,RF1C,TX1').replace(' ', '')
+        return SimulatedInstrument._query(self, header, args)
+
+    def _measurement_result(self, rat, header):
+        name, index, total = self.result_layout[rat]
+        if not header.endswith(name):
+            return ','.join(['0'] * total)
+        power = self._tx_power(rat) + self._random.uniform(-self.power_error, self.power_error)
+        values = [0.0] + [self._random.uniform(-1, 1) for _ in range(total - 1)]
+        values[index] = power
+        if self.settings['FORM:BASE:DATA'].upper().startswith('REAL'):
+            return self._format_block(values,
+                                      self.settings['FORM:BASE:BORD'].upper().startswith('SWAP'))
+        return ','.join('%.3f' % value for value in values)
+
+
+class SimulatedDCSource(SimulatedInstrument):
+    '''
+    Agilent 66319B仿真仪器，按采样点数、采样间隔计时，返回终端电流模型的平均电流；
+    FETCh:ARRay:CURRent?按FORMat设置以ASCII或IEEE 488.2二进制块返回整个采样序列。
+    '''
+    # GPIB传输的指令时延较LAN大
+    write_latency = 0.002
+    query_latency = 0.004
+    operation_delay = {
+        '*RST': 0.5,
+        'VOLT': 0.02,
+        'OUTP': 0.05,
+    }
+    opc_response = '+1'
+    default_settings = {
+        'SENS:SWE:POIN': '2048',
+        'SENS:SWE:TINT': '1.56e-05',
+        'SENS:CURR:RANG': '3A',
+        'VOLT': '0',
+        'OUTP1': 'OFF',
+        'FORM': 'ASC',
+        'FORM:BORD': 'NORM',
+    }
+    idn = 'Agilent Technologies,66319B,0,A.03.01'
+
+    def __init__(self, clock, address, dut):
+        SimulatedInstrument.__init__(self, clock, address)
+        self.dut = dut
+        # 触发采集的时刻，未触发时为None
+        self._acquisition_time = None
+
+    def reset(self):
+        SimulatedInstrument.reset(self)
+        self._acquisition_time = None
+
+    def _sweep(self):
+        '''
+        按当前采样配置完成一次采样，返回(起始时刻, 采样点数, 采样间隔)。
+        '''
+        points = int(float(self.settings['SENS:SWE:POIN']))
+        interval = float(self.settings['SENS:SWE:TINT'])
+        t0 = self.clock.time()
+        self.clock.sleep(points * interval)
+        return t0, points, interval
+
+    def _fetch_sweep(self):
+        '''
+        等待已触发的采集完成，未触发时立即触发，返回(起始时刻, 采样点数, 采样间隔)。
+        '''
+        points = int(float(self.settings['SENS:SWE:POIN']))
+        interval = float(self.settings['SENS:SWE:TINT'])
+        t0 = self._acquisition_time
+        if t0 is None:
+            t0 = self.clock.time()
+        self._acquisition_time = None
+        self.clock.sleep_until(t0 + points * interval)
+        return t0, points, interval
+
+    def _is_output_on(self):
+        return self.settings['OUTP1'].upper() in ('ON', '1')
+
+    def _set(self, header, args):
+        if header == 'TRIG:ACQ':
+            self._acquisition_time = self.clock.time()
+        SimulatedInstrument._set(self, header, args)
+
+    def _format_array(self, samples):
+        '''
+        按FORMat设置格式化采样序列：ASCii为逗号分隔的文本，REAL为IEEE 488.2二进制块，
+        BORDer为NORMal时高字节在前，SWAPped时低字节在前。
+        '''
+        if not self.settings['FORM'].upper().startswith('REAL'):
+            return ','.join('%+.5E' % value for value in samples)
+        return self._format_block(samples, self.settings['FORM:BORD'].upper().startswith('SWAP'))
+
+    def _query(self, header, args):
+        if header == 'MEAS:CURR':
+            t0, points, interval = self._sweep()
+            if not self._is_output_on():
+                return '%+.5E' % 0.0
+            if self.dut.network is not None:
+                self.dut.network.advance()
+            return '%+.5E' % self.dut.average(t0, t0 + points * interval, interval)
+        if header in ('FETC:ARR:CURR', 'MEAS:ARR:CURR'):
+            t0, points, interval = self._fetch_sweep()
+            if not self._is_output_on():
+                return self._format_array([0.0] * points)
+            if self.dut.network is not None:
+                self.dut.network.advance()
+            return self._format_array(self.dut.samples(t0, points, interval))
+        return SimulatedInstrument._query(self, header, args)
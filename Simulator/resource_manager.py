@@ -0,0 +1,59 @@
+# -*- coding:utf-8 -*-
+###############################################################################
+# Copyright (C), 2018, TP-LINK Technologies Co., Ltd.
+#
+# 作者：吴扬波
+# 版本：V1.0
+# 变更历史:
+# 1，2026-10-18， 吴扬波——首次创建：SimulatedResourceManager类，用于替换visa.ResourceManager
+# 2，2026-10-18， 吴扬波——仿真仪器链路断开期间打开资源失败
+# 若引用或修改API，请保留API变更历史。
+###############################################################################
+from Simulator import instrument, dut
+import collections
+
+
+class SimulatedResourceManager(object):
+    '''
+    SimulatedResourceManager类，按地址返回仿真仪器，接口与visa.ResourceManager相同。
+    TCPIP地址返回CMW500仿真仪器，GPIB地址返回66319B仿真仪器，两者共享同一个终端电流模型。
+    '''
+
+    def __init__(self, clock, seed=0):
+        '''
+        clock：仿真时钟；
+        seed：终端电流噪声的随机数种子。
+        '''
+        self.clock = clock
+        self.dut = dut.DUTModel(clock, seed)
+        self.instruments = collections.OrderedDict()
+
+    def open_resource(self, addr):
+        '''
+        打开仿真仪器，同一地址多次打开返回同一台仪器；仿真仪器链路断开期间（见drop_link）打开失败。
+        addr：仪器地址；
+        返回仿真仪器引用。
+        '''
+        if addr not in self.instruments:
+            if addr.upper().startswith('TCPIP'):
+                inst = instrument.SimulatedCMW500(self.clock, addr, self.dut)
+            elif addr.upper().startswith('GPIB'):
+                inst = instrument.SimulatedDCSource(self.clock, addr, self.dut)
+            else:
+                raise ValueError('Unsupported simulated resource: %s' % addr)
+            self.instruments[addr] = inst
+        self.instruments[addr]._check_link()
+        return self.instruments[addr]
+
+    def list_resources(self):
+        return tuple(self.instruments.keys())
+
+    def get_counters(self):
+        '''
+        返回各仿真仪器的指令收发计数，{地址: Counter}。
+        '''
+        return dict((addr, collections.Counter(inst.counters))
+                    for addr, inst in self.instruments.items())
+
+    def close(self):
+        pass
@@ -0,0 +1,219 @@
+# -*- coding:utf-8 -*-
+###############################################################################
+# Copyright (C), 2018, TP-LINK Technologies Co., Ltd.
+#
+# 作者：吴扬波
+# 版本：V1.0
+# 变更历史:
+# 1，2026-10-18， 吴扬波——首次创建：LTE、WCDMA、GSM频段及信道号表，本地计算上行信道、频率、频段代码
+# 若引用或修改API，请保留API变更历史。
+###############################################################################
+import bisect
+import collections
+
+# LTE FDD频段（3GPP TS 36.101 表5.7.3-1）：
+# 频段 -> (下行起始频率F_DL_low(MHz), 下行信道号偏移N_Offs-DL, 下行最大信道号, 上行起始频率F_UL_low(MHz), 上行信道号偏移N_Offs-UL)
+LTE_BANDS = {
+    '1': (2110.0, 0, 599, 1920.0, 18000),
+    '2': (1930.0, 600, 1199, 1850.0, 18600),
+    '3': (1805.0, 1200, 1949, 1710.0, 19200),
+    '4': (2110.0, 1950, 2399, 1710.0, 19950),
+    '5': (869.0, 2400, 2649, 824.0, 20400),
+    '6': (875.0, 2650, 2749, 830.0, 20650),
+    '7': (2620.0, 2750, 3449, 2500.0, 20750),
+    '8': (925.0, 3450, 3799, 880.0, 21450),
+    '9': (1844.9, 3800, 4149, 1749.9, 21800),
+    '10': (2110.0, 4150, 4749, 1710.0, 22150),
+    '11': (1475.9, 4750, 4949, 1427.9, 22750),
+    '12': (729.0, 5010, 5179, 699.0, 23010),
+    '13': (746.0, 5180, 5279, 777.0, 23180),
+    '14': (758.0, 5280, 5379, 788.0, 23280),
+    '17': (734.0, 5730, 5849, 704.0, 23730),
+    '18': (860.0, 5850, 5999, 815.0, 23850),
+    '19': (875.0, 6000, 6149, 830.0, 24000),
+    '20': (791.0, 6150, 6449, 832.0, 24150),
+    '21': (1495.9, 6450, 6599, 1447.9, 24450),
+    '22': (3510.0, 6600, 7399, 3410.0, 24600),
+    '23': (2180.0, 7500, 7699, 2000.0, 25500),
+    '24': (1525.0, 7700, 8039, 1626.5, 25700),
+    '25': (1930.0, 8040, 8689, 1850.0, 26040),
+    '26': (859.0, 8690, 9039, 814.0, 26690),
+    '27': (852.0, 9040, 9209, 807.0, 27040),
+    '28': (758.0, 9210, 9659, 703.0, 27210),
+    '30': (2350.0, 9770, 9869, 2305.0, 27660),
+    '31': (462.5, 9870, 9919, 452.5, 27760),
+}
+# LTE信道带宽(MHz) -> CMW500带宽代码
+LTE_BANDWIDTH_CODES = {
+    '1.4': 'B014', '3': 'B030', '5': 'B050', '10': 'B100', '15': 'B150', '20': 'B200',
+}
+
+# WCDMA频段（3GPP TS 25.101 表5.2、5.3）：
+# 频段 -> (下行频率偏移(MHz), 上下行UARFCN之差, 上下行频率间隔(MHz), 下行UARFCN范围)
+# 附加信道 -> (下行频率偏移(MHz), 下行UARFCN列表)，上行UARFCN同样相差上下行UARFCN之差
+WCDMA_BANDS = {
+    '1': (0.0, 950, 190.0, (10562, 10838)),
+    '2': (0.0, 400, 80.0, (9662, 9938)),
+    '3': (1575.0, 225, 95.0, (1162, 1513)),
+    '4': (1805.0, 225, 400.0, (1537, 1738)),
+    '5': (0.0, 225, 45.0, (4357, 4458)),
+    '6': (0.0, 225, 45.0, (4387, 4413)),
+    '7': (2175.0, 225, 120.0, (2237, 2563)),
+    '8': (340.0, 225, 45.0, (2937, 3088)),
+    '9': (0.0, 475, 95.0, (9237, 9387)),
+    '19': (735.0, 400, 45.0, (712, 763)),
+}
+WCDMA_ADDITIONAL_CHANNELS = {
+    '2': (1850.1, range(412, 688, 25)),
+    '4': (1735.1, range(1887, 2088, 25)),
+    '5': (670.1, [1007, 1012, 1032, 1037, 1062, 1087]),
+    '6': (670.1, [1037, 1062]),
+    '7': (2105.1, range(2587, 2913, 25)),
+    '19': (720.1, [787, 812, 837]),
+}
+
+# GSM频段（3GPP TS 45.005 2节）：频段 -> (ARFCN范围列表, 上行频率计算的(ARFCN起点, 频率起点(MHz)), 上下行频率间隔(MHz))
+GSM_BANDS = {
+    'GSM850': ([(128, 251)], [(128, 824.2)], 45.0),
+    'GSM900': ([(0, 124), (975, 1023)], [(0, 890.0), (975, 880.2)], 45.0),
+    'DCS1800': ([(512, 885)], [(512, 1710.2)], 95.0),
+    'PCS1900': ([(512, 810)], [(512, 1850.2)], 80.0),
+}
+# GSM频段 -> CMW500频段代码
+GSM_BAND_CODES = {'GSM850': 'G085', 'GSM900': 'G09', 'DCS1800': 'G18', 'PCS1900': 'G19'}
+# GSM频段 -> band indicator，1800、1900频段共用ARFCN 512~810，需设置band indicator区分
+GSM_BAND_INDICATORS = {'GSM850': None, 'GSM900': None, 'DCS1800': 'G18', 'PCS1900': 'G19'}
+# CMW500频段代码 -> GSM频段
+GSM_BANDS_BY_CODE = dict((code, band) for band, code in GSM_BAND_CODES.items())
+
+# 信道计算结果：制式、频段、下行信道号、上行信道号、下行频率(MHz)、上行频率(MHz)、CMW500频段代码
+Channel = collections.namedtuple(
+    'Channel', ['rat', 'band', 'dl_channel', 'ul_channel', 'dl_frequency', 'ul_frequency',
+                'band_code'])
+
+
+class ChannelError(ValueError):
+    '''
+    频段、信道号或带宽不合法。
+    '''
+    pass
+
+
+def _to_int(value, name):
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        raise ChannelError('invalid %s: %r' % (name, value))
+
+
+def _build_lte_index():
+    '''
+    按下行信道号起点排序的(起点, 终点, 频段)列表，用于由EARFCN查找频段。
+    '''
+    return sorted((offset, last, band) for band, (_, offset, last, _, _) in LTE_BANDS.items())
+
+
+_LTE_INDEX = _build_lte_index()
+_LTE_INDEX_STARTS = [start for start, _, _ in _LTE_INDEX]
+
+
+def find_lte_band(dl_channel):
+    '''
+    返回下行EARFCN所属的LTE频段，不属于任何频段时返回None。
+    '''
+    dl_channel = _to_int(dl_channel, 'EARFCN')
+    index = bisect.bisect_right(_LTE_INDEX_STARTS, dl_channel) - 1
+    if index >= 0 and dl_channel <= _LTE_INDEX[index][1]:
+        return _LTE_INDEX[index][2]
+    return None
+
+
+def lte_channel(band, dl_channel, bandwidth=None):
+    '''
+    该方法用于计算LTE FDD信道，上行信道取频段的默认上下行间隔。
+    band：频段，如'1'；
+    dl_channel：下行EARFCN，如'25'；
+    bandwidth：信道带宽(MHz)，如'5'，指定时检查信道是否完整落在频段内；
+    返回Channel，band_code为'OB1'形式；参数不合法时抛出ChannelError。
+    '''
+    band = str(band)
+    if band not in LTE_BANDS:
+        raise ChannelError('unsupported LTE band: %s' % band)
+    dl_low, dl_offset, dl_last, ul_low, ul_offset = LTE_BANDS[band]
+    dl_channel = _to_int(dl_channel, 'EARFCN')
+    # 信道带宽的一半对应的信道号个数（信道栅格100kHz）
+    margin = 0
+    if bandwidth is not None:
+        if str(bandwidth) not in LTE_BANDWIDTH_CODES:
+            raise ChannelError('unsupported LTE bandwidth: %sMHz' % bandwidth)
+        margin = int(round(float(bandwidth) * 5))
+    # 最大信道号对应频段上边沿之下100kHz，信道上边沿不超过频段上边沿即dl_last + 1 - margin
+    if not dl_offset + margin <= dl_channel <= dl_last + 1 - margin:
+        raise ChannelError('EARFCN %d out of band %s (%d~%d) for %sMHz'
+                           % (dl_channel, band, dl_offset + margin, dl_last + 1 - margin,
+                              bandwidth if bandwidth is not None else '-'))
+    ul_channel = dl_channel - dl_offset + ul_offset
+    return Channel('LTE', band, dl_channel, ul_channel,
+                   round(dl_low + 0.1 * (dl_channel - dl_offset), 1),
+                   round(ul_low + 0.1 * (ul_channel - ul_offset), 1), 'OB%s' % band)
+
+
+def wcdma_channel(band, dl_channel):
+    '''
+    该方法用于计算WCDMA信道。
+    band：频段，如'1'；
+    dl_channel：下行UARFCN，如'10562'，可以是附加信道；
+    返回Channel，band_code为'OB1'形式；参数不合法时抛出ChannelError。
+    '''
+    band = str(band)
+    if band not in WCDMA_BANDS:
+        raise ChannelError('unsupported WCDMA band: %s' % band)
+    dl_offset, separation, duplex, (first, last) = WCDMA_BANDS[band]
+    dl_channel = _to_int(dl_channel, 'UARFCN')
+    if first <= dl_channel <= last:
+        dl_frequency = dl_offset + dl_channel / 5.0
+    elif dl_channel in WCDMA_ADDITIONAL_CHANNELS.get(band, (0.0, ()))[1]:
+        dl_frequency = WCDMA_ADDITIONAL_CHANNELS[band][0] + dl_channel / 5.0
+    else:
+        raise ChannelError('UARFCN %d out of band %s (%d~%d)' % (dl_channel, band, first, last))
+    return Channel('WCDMA', band, dl_channel, dl_channel - separation, round(dl_frequency, 1),
+                   round(dl_frequency - duplex, 1), 'OB%s' % band)
+
+
+def gsm_channel(band, channel):
+    '''
+    该方法用于计算GSM信道，上下行ARFCN相同。
+    band：频段，如'GSM850'；
+    channel：ARFCN，如'128'；
+    返回Channel，band_code为CMW500频段代码，如'G085'；参数不合法时抛出ChannelError。
+    '''
+    if band not in GSM_BANDS:
+        raise ChannelError('unsupported GSM band: %s' % band)
+    ranges, origins, duplex = GSM_BANDS[band]
+    channel = _to_int(channel, 'ARFCN')
+    for (first, last), (origin, frequency) in zip(ranges, origins):
+        if first <= channel <= last:
+            ul_frequency = round(frequency + 0.2 * (channel - origin), 1)
+            return Channel('GSM', band, channel, channel, round(ul_frequency + duplex, 1),
+                           ul_frequency, GSM_BAND_CODES[band])
+    raise ChannelError('ARFCN %d out of band %s (%s)'
+                       % (channel, band, ', '.join('%d~%d' % item for item in ranges)))
+
+
+def check_configuration(task_format, item):
+    '''
+    该方法用于检查测试计划中的配置项。
+    task_format：制式，'LTE_FDD'、'WCDMA'或'GSM'；
+    item：配置项字典，键同Power.xml中Task的属性；
+    返回错误说明，配置项合法或制式不在本表中时返回None。
+    '''
+    try:
+        if task_format == 'LTE_FDD':
+            lte_channel(item.get('Band'), item.get('DlChannel'), item.get('Bandwidth'))
+        elif task_format == 'WCDMA':
+            wcdma_channel(item.get('Band'), item.get('DlChannel'))
+        elif task_format == 'GSM':
+            gsm_channel(item.get('Band'), item.get('DlChannel'))
+    except ChannelError, e:
+        return str(e)
+    return None
@@ -0,0 +1,227 @@
+# -*- coding:utf-8 -*-
+###############################################################################
+# Copyright (C), 2018, TP-LINK Technologies Co., Ltd.
+#
+# 作者：吴扬波
+# 版本：V1.0
+# 变更历史:
+# 1，2026-10-18， 吴扬波——首次创建：IEEE 488.2定长二进制块解析，CMW500、DCSource共用
+# 2，2026-10-18， 吴扬波——增加frombuffer、tobytes方法，用于采样数据的文件读写
+# 3，2026-10-18， 吴扬波——frombuffer支持指定起始位置、字节数，用于读取mmap的部分数据
+# 4，2026-10-18， 吴扬波——增加read_message，按块头声明的长度读取，数据中含有终止符字节时不截断
+# 若引用或修改API，请保留API变更历史。
+###############################################################################
+import array
+import sys
+
+try:
+    import numpy
+except ImportError:
+    # 未安装numpy时以array.array返回数据，需复制一次
+    numpy = None
+
+# 数据类型对应的array类型码、字节数，数据类型格式同numpy，如'<f4'为低字节在前的单精度浮点
+_TYPECODES = {'f4': ('f', 4), 'f8': ('d', 8), 'i2': ('h', 2), 'i4': ('i', 4), 'u1': ('B', 1)}
+# 相邻数据块之间允许出现的分隔符
+_SEPARATORS = ' \t\r\n,;'
+
+
+class BlockFormatError(ValueError):
+    '''
+    二进制块格式错误，如块头缺失、长度与数据不符、不定长块等。
+    '''
+    pass
+
+
+def parse_header(buffer, offset=0):
+    '''
+    解析offset处的定长块头'#<n><len>'。
+    buffer：仪器返回的字节流；
+    offset：块头'#'所在位置；
+    返回(数据起始位置, 数据字节数)。
+    '''
+    if buffer[offset:offset + 1] != '#':
+        raise BlockFormatError('block header expected at offset %d' % offset)
+    digit = buffer[offset + 1:offset + 2]
+    if not digit.isdigit():
+        raise BlockFormatError('invalid block header at offset %d' % offset)
+    digit_num = int(digit)
+    if digit_num == 0:
+        raise BlockFormatError('indefinite length block is not supported')
+    length = buffer[offset + 2:offset + 2 + digit_num]
+    if len(length) != digit_num or not length.isdigit():
+        raise BlockFormatError('invalid block length at offset %d' % offset)
+    start = offset + 2 + digit_num
+    bytes_num = int(length)
+    if start + bytes_num > len(buffer):
+        raise BlockFormatError('block truncated, %d bytes expected, %d received'
+                               % (bytes_num, len(buffer) - start))
+    return start, bytes_num
+
+
+def iter_blocks(buffer):
+    '''
+    依次返回字节流中每个数据块的(数据起始位置, 数据字节数)。
+    第一个块之前的内容（如指令回显）被忽略，块之间只允许出现分隔符、终止符，
+    块数据内部不作任何查找，数据中含有'#'、'\\n'字节时同样可以正确解析。
+    '''
+    position = buffer.find('#')
+    if position < 0:
+        raise BlockFormatError('no block found')
+    while True:
+        start, bytes_num = parse_header(buffer, position)
+        yield start, bytes_num
+        position = start + bytes_num
+        while position < len(buffer) and buffer[position] in _SEPARATORS:
+            position += 1
+        if position >= len(buffer):
+            return
+        if buffer[position] != '#':
+            raise BlockFormatError('unexpected data after block at offset %d' % position)
+
+
+def _message_length(buffer):
+    '''
+    返回buffer中完整返回值（所有定长块及其后的终止符）的字节数，尚未读完时返回None。
+    只按块头声明的长度跳过块数据，块之后的第一个'\\n'为终止符；
+    格式错误时读到'\\n'即视为读完，由read_blocks报告错误。
+    '''
+    is_ended = buffer.endswith('\n')
+    position = buffer.find('#')
+    if position < 0:
+        return len(buffer) if is_ended else None
+    while True:
+        digit = buffer[position + 1:position + 2]
+        if not digit:
+            return None
+        if not digit.isdigit() or digit == '0':
+            return len(buffer) if is_ended else None
+        start = position + 2 + int(digit)
+        if start > len(buffer):
+            return None
+        length = buffer[position + 2:start]
+        if not length.isdigit():
+            return len(buffer) if is_ended else None
+        position = start + int(length)
+        while position < len(buffer) and buffer[position] in _SEPARATORS:
+            if buffer[position] == '\n':
+                return position + 1
+            position += 1
+        if position >= len(buffer):
+            return None
+        if buffer[position] != '#':
+            return len(buffer) if is_ended else None
+
+
+def read_message(read_raw):
+    '''
+    该方法用于读取含有定长块的完整返回值。
+    visa资源设置了read_termination时，read_raw读到数据中的'\\n'字节即返回，只得到块的一部分，
+    因此按块头声明的长度反复读取，直至所有块及其后的终止符读完。
+    read_raw：读取函数，如visa资源的read_raw，每次返回下一段字节流；
+    返回完整的字节流，供read_blocks解析。
+    '''
+    buffer = read_raw()
+    while _message_length(buffer) is None:
+        buffer += read_raw()
+    return buffer
+
+
+def _split_dtype(dtype):
+    if dtype[:1] in '<>=|':
+        byte_order, name = dtype[0], dtype[1:]
+    else:
+        byte_order, name = '=', dtype
+    if name not in _TYPECODES:
+        raise BlockFormatError('unsupported data type %s' % dtype)
+    return byte_order, name
+
+
+def _to_array(buffer, start, bytes_num, dtype):
+    '''
+    将buffer[start:start + bytes_num]转为数组。
+    有numpy时返回只读的numpy视图，与buffer共用内存，不复制数据。
+    '''
+    byte_order, name = _split_dtype(dtype)
+    typecode, size = _TYPECODES[name]
+    if bytes_num % size:
+        raise BlockFormatError('block length %d is not a multiple of %d' % (bytes_num, size))
+    if numpy is not None:
+        return numpy.frombuffer(buffer, numpy.dtype(dtype), bytes_num / size, start)
+    data = array.array(typecode)
+    data.fromstring(buffer[start:start + bytes_num])
+    native = '<' if sys.byteorder == 'little' else '>'
+    if byte_order in '<>' and byte_order != native:
+        data.byteswap()
+    return data
+
+
+def frombuffer(buffer, dtype='<f4', offset=0, bytes_num=None):
+    '''
+    该方法用于将不含块头的字节流转为数组，如从文件读取的采样数据。
+    buffer：字节流，可以是mmap对象；
+    offset、bytes_num：数据的起始位置、字节数，默认到buffer结尾；
+    有numpy时返回不复制数据的numpy视图。
+    '''
+    if bytes_num is None:
+        bytes_num = len(buffer) - offset
+    return _to_array(buffer, offset, bytes_num, dtype)
+
+
+def tobytes(data, dtype='<f4'):
+    '''
+    该方法用于将数组按dtype转为字节流，如写入文件的采样数据。
+    '''
+    if numpy is not None:
+        return numpy.asarray(data, numpy.dtype(dtype)).tostring()
+    byte_order, name = _split_dtype(dtype)
+    data = array.array(_TYPECODES[name][0], data)
+    native = '<' if sys.byteorder == 'little' else '>'
+    if byte_order in '<>' and byte_order != native:
+        data.byteswap()
+    return data.tostring()
+
+
+def read_blocks(buffer, dtype='<f4'):
+    '''
+    该方法用于解析含有一个或多个定长块的返回值。
+    buffer：仪器返回的字节流，如visa资源read_raw的返回值；
+    dtype：数据类型，格式同numpy，如'<f4'为低字节在前的单精度浮点，'>f4'为高字节在前；
+    返回每个块的数组列表。
+    '''
+    return [_to_array(buffer, start, bytes_num, dtype)
+            for start, bytes_num in iter_blocks(buffer)]
+
+
+def read_block_array(buffer, dtype='<f4'):
+    '''
+    该方法用于将一个或多个定长块的数据解析为一个数组。
+    只有一个块时返回该块的视图，不复制数据；多个块时拼接为一个数组。
+    参数同read_blocks。
+    '''
+    return concatenate(read_blocks(buffer, dtype))
+
+
+def concatenate(arrays):
+    '''
+    将read_blocks返回的多个数组拼接为一个数组，只有一个数组时直接返回。
+    '''
+    if not arrays:
+        return array.array('f')
+    if len(arrays) == 1:
+        return arrays[0]
+    if numpy is not None:
+        return numpy.concatenate(arrays)
+    result = array.array(arrays[0].typecode)
+    for data in arrays:
+        result.extend(data)
+    return result
+
+
+def mean(data):
+    '''
+    返回数组的平均值。
+    '''
+    if numpy is not None and isinstance(data, numpy.ndarray):
+        return float(data.mean(dtype=numpy.float64))
+    return sum(data) / (len(data) * 1.0)
@@ -0,0 +1,147 @@
+# -*- coding:utf-8 -*-
+###############################################################################
+# Copyright (C), 2018, TP-LINK Technologies Co., Ltd.
+#
+# 作者：吴扬波
+# 版本：V1.0
+# 变更历史:
+# 1，2026-10-18， 吴扬波——首次创建：线损文件解析，编译为CMW500 FDCorrection线损表，线损表内容校验
+# 若引用或修改API，请保留API变更历史。
+###############################################################################
+import hashlib
+import re
+
+# CMW500单个线损表的最大点数
+MAX_POINTS = 1000
+# 单条CREate、ADD指令携带的最大点数，避免单条程序消息过长
+POINTS_PER_COMMAND = 100
+# 线损表内容比较的分辨率：频率1kHz，线损0.01dB
+FREQUENCY_RESOLUTION = 1000
+CORRECTION_RESOLUTION = 0.01
+# 频率单位
+_UNITS = {'HZ': 1.0, 'KHZ': 1e3, 'MHZ': 1e6, 'GHZ': 1e9}
+_FREQUENCY_PATTERN = re.compile(r'^\s*([-+0-9.eE]+)\s*([a-zA-Z]*)\s*$')
+_SEPARATOR_PATTERN = re.compile(r'[,;\t ]+')
+
+
+class CableLossError(ValueError):
+    '''
+    线损文件格式错误。
+    '''
+    pass
+
+
+def load(file_name):
+    '''
+    该方法用于解析线损文件。
+    文件每行一个测量点，以','、制表符或空格分隔，'#'之后为注释：
+    连接器, 变换器, 频率(MHz), 线损(dB)，如'1, 1, 1747.5, 0.52'；
+    或只有频率(MHz), 线损(dB)两列，用于没有单独测量点的信号链路。
+    返回{(连接器, 变换器): [(频率(MHz), 线损(dB)), ...]}，两列的测量点以(None, None)为键，
+    各链路的测量点按频率排序；格式错误、频率重复时抛出CableLossError。
+    '''
+    tables = {}
+    with open(file_name) as f:
+        for line_number, line in enumerate(f, 1):
+            line = line.split('#', 1)[0].strip()
+            if not line:
+                continue
+            fields = _SEPARATOR_PATTERN.split(line)
+            if len(fields) == 2:
+                key = (None, None)
+            elif len(fields) == 4:
+                key = (fields[0], fields[1])
+                fields = fields[2:]
+            else:
+                raise CableLossError('%s:%d: expected 2 or 4 fields, got %r'
+                                     % (file_name, line_number, line))
+            try:
+                point = (float(fields[0]), float(fields[1]))
+            except ValueError:
+                raise CableLossError('%s:%d: invalid number in %r' % (file_name, line_number, line))
+            tables.setdefault(key, []).append(point)
+    for key, points in tables.items():
+        points.sort()
+        for (f1, _), (f2, _) in zip(points, points[1:]):
+            if f1 == f2:
+                raise CableLossError('%s: duplicate frequency %sMHz for path %s'
+                                     % (file_name, f1, key))
+        if len(points) > MAX_POINTS:
+            raise CableLossError('%s: %d points for path %s, at most %d'
+                                 % (file_name, len(points), key, MAX_POINTS))
+    return tables
+
+
+def get_points(tables, connector, converter):
+    '''
+    返回信号链路的测量点，没有单独的测量点时返回两列的测量点，都没有时返回None。
+    '''
+    return tables.get((str(connector), str(converter)), tables.get((None, None)))
+
+
+def table_name(connector, converter):
+    '''
+    返回信号链路对应的线损表名称，如'RF1C_RX1'。
+    '''
+    return 'RF%sC_RX%s' % (connector, converter)
+
+
+def _normalize(points):
+    '''
+    将测量点转换为(频率(Hz)/FREQUENCY_RESOLUTION, 线损/CORRECTION_RESOLUTION)的整数对，
+    仪器回读的浮点误差、格式差异不影响比较。
+    '''
+    return [(int(round(frequency / FREQUENCY_RESOLUTION)),
+             int(round(correction / CORRECTION_RESOLUTION))) for frequency, correction in points]
+
+
+def table_hash(points_hz):
+    '''
+    返回线损表内容的摘要。
+    points_hz：[(频率(Hz), 线损(dB)), ...]。
+    '''
+    text = ';'.join('%d,%d' % point for point in _normalize(points_hz))
+    return hashlib.md5(text).hexdigest()
+
+
+def to_hz(points):
+    '''
+    将[(频率(MHz), 线损(dB)), ...]转换为[(频率(Hz), 线损(dB)), ...]。
+    '''
+    return [(frequency * 1e6, correction) for frequency, correction in points]
+
+
+def parse_details(response):
+    '''
+    该方法用于解析CTABle:DETails?的返回值：以','分隔的频率、线损，频率默认单位Hz。
+    返回[(频率(Hz), 线损(dB)), ...]；线损表不存在（返回值为空）或格式无法解析时返回None。
+    '''
+    fields = [field.strip() for field in response.split(',')] if response else []
+    if not fields or len(fields) % 2:
+        return None
+    points = []
+    try:
+        for frequency, correction in zip(fields[::2], fields[1::2]):
+            match = _FREQUENCY_PATTERN.match(frequency)
+            if match is None or (match.group(2) and match.group(2).upper() not in _UNITS):
+                return None
+            points.append((float(match.group(1)) * _UNITS.get(match.group(2).upper(), 1.0),
+                           float(correction)))
+    except ValueError:
+        return None
+    return points
+
+
+def format_commands(name, points_hz):
+    '''
+    将线损表编译为程序消息列表：首条为CREate，超过POINTS_PER_COMMAND个点时其余以ADD追加。
+    name：线损表名称；
+    points_hz：[(频率(Hz), 线损(dB)), ...]。
+    '''
+    messages = []
+    for start in range(0, len(points_hz), POINTS_PER_COMMAND):
+        chunk = ', '.join('%d, %.2f' % (round(frequency), correction)
+                          for frequency, correction in points_hz[start:start + POINTS_PER_COMMAND])
+        command = 'CREate' if start == 0 else 'ADD'
+        messages.append("CONFigure:BASE:FDCorrection:CTABle:%s '%s', %s" % (command, name, chunk))
+    return messages
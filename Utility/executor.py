@@ -0,0 +1,133 @@
+# -*- coding:utf-8 -*-
+###############################################################################
+# Copyright (C), 2018, TP-LINK Technologies Co., Ltd.
+#
+# 作者：吴扬波
+# 版本：V1.0
+# 变更历史:
+# 1，2026-10-18， 吴扬波——首次创建：多工位并行执行，用于将任务列表分片到多个工位进程
+# 2，2026-10-18， 吴扬波——工位进程按log_levels设置日志级别，退出前写出剩余日志
+# 3，2026-10-18， 吴扬波——增加warm_start参数，各工位热启动CMW500
+# 4，2026-10-18， 吴扬波——增加case_folder_name参数续测：主进程记录进度日志，工位进程跳过已完成的测量点
+# 5，2026-10-18， 吴扬波——增加case_options参数，用例的其他选项（如并行测量模式）传给各工位进程
+# 若引用或修改API，请保留API变更历史。
+###############################################################################
+import global_variable
+import journal
+import pylogger
+import record
+from datetime import datetime
+import importlib
+import multiprocessing
+import Queue
+import os
+import sys
+
+
+def shard_tasklist(task_list, count):
+    '''
+    将任务列表按配置项分成count片，每个制式的配置列表按顺序切成连续的片段，
+    保留测试计划优化后相邻配置项的顺序。
+    返回count个任务列表。
+    '''
+    shards = [[] for _ in range(count)]
+    for task in task_list:
+        configuration = task['configuration']
+        size, extra = divmod(len(configuration), count)
+        start = 0
+        for index in range(count):
+            end = start + size + (1 if index < extra else 0)
+            if end > start:
+                shard_task = dict(task)
+                shard_task['configuration'] = configuration[start:end]
+                shards[index].append(shard_task)
+            start = end
+    return shards
+
+
+def _run_station(case_name, station, task_list, case_folder_name, result_queue, log_levels,
+                 warm_start, progress_folder, case_options):
+    '''
+    工位进程入口：建立本工位的仪器连接，执行分到的任务，测量结果经队列交给主进程记录。
+    进度由主进程记录，工位进程只读progress_folder中的进度日志，跳过已完成的测量点。
+    '''
+    if log_levels:
+        pylogger.set_levels(log_levels)
+    try:
+        case_module = importlib.import_module(case_name)
+        testcase = case_module.TestCase(station, case_folder_name, warm_start=warm_start,
+                                        **case_options)
+        testcase.data_recorder = record.QueueDataRecorder(result_queue)
+        testcase.journal.close()
+        testcase.journal = journal.ProgressJournal(progress_folder, read_only=True)
+        testcase.run(task_list)
+    finally:
+        # 子进程退出时不执行atexit，显式写出队列中剩余的日志
+        pylogger.shutdown()
+
+
+def run_parallel(case_name, stations, task_list, log_levels=None, warm_start=False,
+                 case_folder_name=None, case_options=None):
+    '''
+    该方法用于在多个工位上并行执行用例，每个工位一个进程，各自持有仪器连接。
+    所有工位的测量结果合并记录到同一个DataRecorder，各工位日志保存在以工位名命名的子文件夹。
+    case_name：用例脚本模块名，如'testcase_conduct_connect'；
+    stations：xml_parser.get_stationlist返回的工位列表；
+    task_list：待执行的任务列表；
+    log_levels：各工位进程的日志级别，格式见pylogger.set_levels；
+    warm_start：各工位是否热启动CMW500，见CMW500.__init__；
+    case_folder_name：用例执行文件夹，默认按当前时间创建，传入中断的用例执行文件夹时续测，
+    主进程在其中记录所有工位的进度，已完成的测量点不论分到哪个工位都被跳过；
+    case_options：传给各工位TestCase的其他关键字参数，如{'concurrent_measurement': False}。
+    '''
+    if case_folder_name is None:
+        case_folder_name = sys.path[0] + '.\\' + datetime.now().strftime("%Y%m%d_%H%M%S")
+    global_variable.file_folder = case_folder_name
+    try:
+        os.makedirs(case_folder_name)
+    except Exception as e:
+        print 'folder:%s existed!' % e
+    logger = pylogger.setup_logger('Executor')
+    data_recorder = record.DataRecorder()
+    progress = journal.ProgressJournal(case_folder_name)
+    if len(progress):
+        logger.info('Resume with %d completed points.' % len(progress))
+
+    result_queue = multiprocessing.Queue()
+    workers = []
+    for station, shard in zip(stations, shard_tasklist(task_list, len(stations))):
+        if not shard:
+            continue
+        worker = multiprocessing.Process(
+            target=_run_station, name=station['Name'],
+            args=(case_name, station, shard, case_folder_name + '.\\' + station['Name'],
+                  result_queue, log_levels, warm_start, case_folder_name, case_options or {}))
+        worker.start()
+        workers.append(worker)
+        logger.info('Station %s started with %d configurations.'
+                    % (station['Name'], sum(len(task['configuration']) for task in shard)))
+
+    def commit(result):
+        # 测量结果提交后再记录进度，中断后续测不会丢失结果
+        data_recorder.record_result(*result)
+        data_recorder.flush()
+        progress.mark_done(result[0], result[1])
+
+    # 先取完队列中的结果再等待进程退出，避免子进程阻塞在队列写入上
+    while any(worker.is_alive() for worker in workers):
+        try:
+            commit(result_queue.get(timeout=1))
+        except Queue.Empty:
+            pass
+    while True:
+        try:
+            commit(result_queue.get(timeout=1))
+        except Queue.Empty:
+            break
+    progress.close()
+    for worker in workers:
+        worker.join()
+        if worker.exitcode:
+            logger.error('Station %s exited with code %s.' % (worker.name, worker.exitcode))
+
+    data_recorder.save_xlsx()
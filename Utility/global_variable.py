@@ -1,3 +1,5 @@
 # -*- coding:utf-8 -*-
 
 file_folder = ''
+# 仪器资源管理器，为None时使用visa.ResourceManager()，离线仿真时替换为仿真资源管理器
+resource_manager = None
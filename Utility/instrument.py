@@ -0,0 +1,710 @@
+# -*- coding:utf-8 -*-
+###############################################################################
+# Copyright (C), 2018, TP-LINK Technologies Co., Ltd.
+#
+# 作者：吴扬波
+# 版本：V1.0
+# 变更历史:
+# 1，2026-10-18， 吴扬波——首次创建：Instrument类，封装visa仪器资源，提供统一的操作完成等待
+# 2，2026-10-18， 吴扬波——增加batch方法，合并批量写入的指令
+# 3，2026-10-18， 吴扬波——增加设置项影子缓存，跳过重复写入、从缓存返回回读查询
+# 4，2026-10-18， 吴扬波——增加query_binary方法，查询IEEE 488.2定长二进制块
+# 5，2026-10-18， 吴扬波——增加profiler属性，记录各指令的耗时、字节数、调用方法，增加phase方法
+# 6，2026-10-18， 吴扬波——增加设置项快照，热启动时校验后恢复影子缓存；只有切换类信令动作清除写入的设置项
+# 7，2026-10-18， 吴扬波——visa会话重连后清除影子缓存
+# 8，2026-10-18， 吴扬波——各接口由优先级锁保护，支持多线程共用，批量写入状态按线程分别记录
+# 9，2026-10-18， 吴扬波——增加query_uncached，绕过影子缓存回读设置项
+# 10，2026-10-18， 吴扬波——快照只在调用save_snapshot时保存，启用时删除已读取的快照文件，保存时原子替换
+# 11，2026-10-18， 吴扬波——等待操作完成时以*ESR?确认写入的设置项，仪器报告错误时从影子缓存中清除
+# 12，2026-10-18， 吴扬波——query_binary优先使用会话的query_raw，链路断开时重发整个查询
+# 13，2026-10-18， 吴扬波——query_binary直接读取visa资源时同样按块头声明的长度读取，块数据中含有终止符字节时不截断
+# 14，2026-10-18， 吴扬波——写入的设置项首次回读时发往仪器，缓存仪器实际生效的值，之后的回读再由缓存返回
+# 15，2026-10-18， 吴扬波——仪器报告错误时读空错误队列，SYSTem:ERRor?同样经_call收发
+# 16，2026-10-18， 吴扬波——*OPC?;*ESR?经_call收发，只有visa超时转为OperationTimeoutError，其他错误原样抛出；
+#                          增加get_opc_saved_seconds
+# 17，2026-10-18， 吴扬波——批量写入块抛出异常时丢弃未发送的指令；节省时长按实际执行的等待统计，合并的等待只计一次
+# 若引用或修改API，请保留API变更历史。
+###############################################################################
+import block
+import profiler as profiler_module
+import pylogger
+import scpi
+import visa_backend
+import contextlib
+import functools
+import itertools
+import json
+import os
+import threading
+import time
+
+# 原轮询方式每次*OPC?返回后固定休眠的时长，单位秒，用于统计节省的时间
+LEGACY_POLL_INTERVAL = 0.1
+# 合并指令时单条程序消息的最大长度，单位字节，不超过仪器输入缓存
+MAX_MESSAGE_LENGTH = 1024
+# 可缓存的设置项指令头前缀（规范化短格式），测量、状态查询等动态值不缓存
+CACHEABLE_PREFIXES = ('CONF:', 'ROUT:', 'SENS:', 'VOLT')
+# 信令动作指令头前缀，执行后清除同一制式的回读缓存
+ACTION_PREFIXES = ('CALL:',)
+# 会改变仪器配置（频段、信道）的信令动作，指令头或参数中含有该字符串时同时清除写入的设置项
+CONFIG_CHANGING_ACTIONS = ('HAND',)
+# 访问仪器的优先级，数值越小越优先：前台配置、测量默认PRIORITY_NORMAL，后台监测、连续采集用PRIORITY_LOW
+PRIORITY_HIGH = 0
+PRIORITY_NORMAL = 1
+PRIORITY_LOW = 2
+# 标准事件状态寄存器（*ESR?）中表示错误的位：查询错误、设备错误、执行错误、指令错误
+ESR_ERROR_BITS = 0x04 | 0x08 | 0x10 | 0x20
+# 仪器报告错误时最多读取的错误条数，防止错误队列读取异常时无限循环
+MAX_ERROR_QUEUE_LENGTH = 32
+# 等待仪器的线程每等待该时长优先级提高一级，低优先级的线程不会一直等不到仪器，单位秒
+PRIORITY_AGING_SECONDS = 1.0
+
+
+def get_opc_saved_seconds(*instruments):
+    '''
+    返回各仪器操作完成等待相对原100ms轮询方式累计节省的时长，单位秒。
+    instruments：Instrument实例。
+    '''
+    return sum(inst.opc_stats['saved_seconds'] for inst in instruments)
+
+
+class OperationTimeoutError(Exception):
+    '''
+    等待仪器完成操作超时。
+    '''
+    pass
+
+
+def _normalize_value(value):
+    return ''.join(value.split()).upper()
+
+
+def _replace_file(source, target):
+    '''
+    以source原子替换target。POSIX下os.rename覆盖已存在的文件；
+    Windows下os.rename不能覆盖，改用MoveFileExW(MOVEFILE_REPLACE_EXISTING | MOVEFILE_WRITE_THROUGH)。
+    '''
+    if os.name != 'nt':
+        os.rename(source, target)
+        return
+    import ctypes
+    if not ctypes.windll.kernel32.MoveFileExW(unicode(source), unicode(target), 0x1 | 0x8):
+        raise ctypes.WinError()
+
+
+class PriorityLock(object):
+    '''
+    PriorityLock类，可重入的优先级锁。释放时由释放的线程选出下一个持有者并直接移交：
+    优先级高的先得，同一优先级按到达顺序，等待时长每满PRIORITY_AGING_SECONDS优先级提高一级。
+    '''
+
+    def __init__(self):
+        self._condition = threading.Condition(threading.Lock())
+        self._owner = None
+        self._count = 0
+        # 等待的线程：[(优先级, 到达序号, 到达时刻, 线程)]
+        self._waiters = []
+        self._sequence = itertools.count()
+        # 统计：获取次数、需要等待的次数、累计等待时长
+        self.stats = {'acquires': 0, 'waits': 0, 'wait_seconds': 0.0}
+
+    def acquire(self, priority=PRIORITY_NORMAL):
+        me = threading.current_thread()
+        with self._condition:
+            if self._owner is me:
+                self._count += 1
+                return
+            self.stats['acquires'] += 1
+            if self._owner is None:
+                self._owner, self._count = me, 1
+                return
+            start = time.time()
+            waiter = (priority, next(self._sequence), start, me)
+            self._waiters.append(waiter)
+            try:
+                while self._owner is not me:
+                    self._condition.wait()
+            except BaseException:
+                # 等待中被中断，已移交给本线程时转交下一个等待的线程
+                if self._owner is me:
+                    self._count = 1
+                    self._handoff()
+                else:
+                    self._waiters.remove(waiter)
+                raise
+            self._count = 1
+            self.stats['waits'] += 1
+            self.stats['wait_seconds'] += time.time() - start
+
+    def release(self):
+        with self._condition:
+            if self._owner is not threading.current_thread():
+                raise RuntimeError('cannot release un-acquired lock')
+            self._count -= 1
+            if not self._count:
+                self._handoff()
+
+    def _handoff(self):
+        '''
+        选出下一个持有者：按(优先级 - 等待时长折算的级数, 到达序号)最小的等待线程。
+        '''
+        self._owner = None
+        if not self._waiters:
+            return
+        now = time.time()
+        waiter = min(self._waiters,
+                     key=lambda item: (item[0] - int((now - item[2]) / PRIORITY_AGING_SECONDS),
+                                       item[1]))
+        self._waiters.remove(waiter)
+        self._owner = waiter[3]
+        self._condition.notify_all()
+
+
+class _BatchState(object):
+    '''
+    单个线程的批量写入状态：嵌套层数、缓存的指令、是否需要在结束时等待操作完成。
+    '''
+
+    def __init__(self):
+        self.depth = 0
+        self.commands = []
+        self.wait = False
+
+
+def _synchronized(method):
+    '''
+    以调用线程的优先级持有仪器锁执行方法。
+    '''
+    @functools.wraps(method)
+    def wrapper(self, *args, **kwargs):
+        self._lock.acquire(self.get_priority())
+        try:
+            return method(self, *args, **kwargs)
+        finally:
+            self._lock.release()
+    return wrapper
+
+
+class Instrument(object):
+    '''
+    Instrument类，封装visa仪器资源，CMW500及各制式模块、DCSource共用。
+    write、query、read、read_raw等接口转发给visa资源，并维护设置项的影子缓存：
+    与缓存值相同的设置不再写入，设置项的回读查询直接由缓存返回。
+    写入的设置项即刻进入缓存，用于跳过重复写入；其回读查询首次仍发往仪器，缓存仪器实际生效的值，
+    之后的回读由缓存返回，需要每次都由仪器确认时使用query_uncached；
+    等待操作完成时以*ESR?确认，仪器报告错误（如参数超出范围被拒绝）时清除上次确认后写入的设置项。
+    各接口持有优先级锁，多个线程共用时每次查询的收发不会交错；后台线程以with inst.priority(...)
+    设置优先级，需要连续多次收发不被打断时使用with inst.locked(): ...。批量写入按线程分别缓存。
+    '''
+
+    def __init__(self, resource, name='', dependent_settings=None):
+        '''
+        resource：visa仪器资源或visa_backend.Session；
+        name：仪器名称，用于日志、异常信息；
+        dependent_settings：设置项联动关系，{指令头: (受影响的指令头前缀, ...)}，
+        设置项改变时仪器可能自动修改的其他设置项，需同时清除其缓存。
+        '''
+        self.logger = pylogger.setup_logger(self.__class__.__name__)
+        self._resource = resource
+        self.name = name
+        # 操作完成等待的统计：等待次数、等待总时长、相对原轮询方式节省的时长
+        self.opc_stats = {'count': 0, 'seconds': 0.0, 'saved_seconds': 0.0}
+        # 批量写入的状态按线程保存在_local中，见_get_batch；线程的优先级见priority
+        self.max_message_length = MAX_MESSAGE_LENGTH
+        self._local = threading.local()
+        self._lock = PriorityLock()
+        # 批量写入的统计：合并的指令条数、实际发送的程序消息条数
+        self.batch_stats = {'commands': 0, 'messages': 0}
+        # 影子缓存：{规范化指令头: (值, 是否由写入得到)}，及命中、未命中次数
+        self.cache_enabled = True
+        self.dependent_settings = dependent_settings or {}
+        self.cache_stats = {'hits': 0, 'misses': 0}
+        self._cache = {}
+        # 写入后已由仪器回读的设置项指令头，缓存值为仪器实际生效的值，可以直接返回
+        self._read_back = set()
+        # 上次确认后写入、尚未由*ESR?确认被仪器接受的设置项指令头
+        self._unconfirmed = set()
+        # 上次等待操作完成后是否写入过指令
+        self._has_pending_operation = False
+        # 指令耗时统计，设为profiler.Profiler实例时记录每次指令收发
+        self.profiler = None
+        # 设置项快照文件，未启用时为None；快照中的仪器标识；影子缓存是否有未保存的修改
+        self.snapshot_file = None
+        self._snapshot_idn = ''
+        self._snapshot_dirty = False
+        # 链路断开期间的指令是否生效未知，会话重连后清除影子缓存
+        if hasattr(resource, 'add_reconnect_callback'):
+            resource.add_reconnect_callback(self.invalidate)
+
+    @property
+    def timeout(self):
+        return self._resource.timeout
+
+    @timeout.setter
+    def timeout(self, value):
+        self._resource.timeout = value
+
+    @property
+    def read_termination(self):
+        return self._resource.read_termination
+
+    @read_termination.setter
+    def read_termination(self, value):
+        self._resource.read_termination = value
+
+    def get_priority(self):
+        '''
+        返回调用线程访问仪器的优先级。
+        '''
+        return getattr(self._local, 'priority', PRIORITY_NORMAL)
+
+    @contextlib.contextmanager
+    def priority(self, priority):
+        '''
+        该方法用于设置调用线程在块内访问仪器的优先级，使用方式为with inst.priority(PRIORITY_LOW): ...
+        '''
+        origin = self.get_priority()
+        self._local.priority = priority
+        try:
+            yield self
+        finally:
+            self._local.priority = origin
+
+    @contextlib.contextmanager
+    def locked(self, priority=None):
+        '''
+        该方法用于独占仪器，块内调用线程的连续收发不会被其他线程打断。
+        priority：获取锁的优先级，默认为调用线程的优先级。
+        '''
+        self._lock.acquire(self.get_priority() if priority is None else priority)
+        try:
+            yield self
+        finally:
+            self._lock.release()
+
+    @property
+    def lock_stats(self):
+        '''
+        仪器锁的统计：获取次数、需要等待的次数、累计等待时长。
+        '''
+        return self._lock.stats
+
+    def _get_batch(self):
+        batch = getattr(self._local, 'batch', None)
+        if batch is None:
+            batch = self._local.batch = _BatchState()
+        return batch
+
+    @_synchronized
+    def write(self, message):
+        if self.cache_enabled and not self._update_cache(message):
+            return
+        batch = self._get_batch()
+        if batch.depth:
+            batch.commands.append(message)
+            return
+        self._has_pending_operation = True
+        return self._call(self._resource.write, message)
+
+    @_synchronized
+    def query(self, message):
+        header = self._get_cacheable_query(message)
+        if header in self._cache:
+            # 写入的设置项缓存的是写入的字符串，未经仪器回读时由query_uncached查询仪器实际生效的值
+            if not self._cache[header][1] or header in self._read_back:
+                self.cache_stats['hits'] += 1
+                return self._cache[header][0]
+            self.cache_stats['misses'] += 1
+            return self.query_uncached(message)
+        self._flush()
+        result = self._call(self._resource.query, message)
+        if header:
+            self.cache_stats['misses'] += 1
+            self._cache[header] = (result, False)
+        return result
+
+    @_synchronized
+    def query_uncached(self, message):
+        '''
+        该方法用于绕过影子缓存向仪器查询，用于回读校验写入的设置项。
+        设置项的回读值更新到影子缓存中，之后与回读值相同的设置不再写入。
+        '''
+        self._flush()
+        result = self._call(self._resource.query, message)
+        header = self._get_cacheable_query(message)
+        if header:
+            is_written = self._cache.get(header, (None, False))[1]
+            self._cache[header] = (result, is_written)
+            if is_written:
+                self._read_back.add(header)
+            self._snapshot_dirty = True
+        return result
+
+    @_synchronized
+    def query_binary(self, message, dtype='<f4'):
+        '''
+        该方法用于查询以IEEE 488.2定长二进制块返回的数据，如电流采样序列、测量轨迹。
+        message：含查询指令的程序消息；
+        dtype：数据类型，见block.read_blocks；
+        返回数组，安装numpy时为不复制数据的numpy视图。
+        '''
+        self._flush()
+        if self.cache_enabled:
+            self._update_cache(message)
+        self._has_pending_operation = True
+        # 会话重连时需重发整个查询，visa资源没有query_raw时分别写入、读取，
+        # 两者都由visa_backend.read_block_message按块头声明的长度读取
+        query_raw = getattr(self._resource, 'query_raw', None)
+        if query_raw is not None:
+            data = self._call(query_raw, message)
+        else:
+            def read_raw():
+                return visa_backend.read_block_message(self._resource)
+            self._call(self._resource.write, message)
+            data = self._call(read_raw)
+        return block.read_block_array(data, dtype)
+
+    @_synchronized
+    def read(self):
+        self._flush()
+        return self._call(self._resource.read)
+
+    @_synchronized
+    def read_raw(self):
+        self._flush()
+        return self._call(self._resource.read_raw)
+
+    @_synchronized
+    def close(self):
+        self._resource.close()
+
+    @_synchronized
+    def invalidate(self, prefix=''):
+        '''
+        该方法用于清除影子缓存。
+        prefix：规范化短格式的指令头前缀，如'CONF:LTE'，默认清除全部缓存。
+        '''
+        self._snapshot_dirty = True
+        if not prefix:
+            self._cache.clear()
+            return
+        for header in list(self._cache.keys()):
+            if header.startswith(prefix):
+                del self._cache[header]
+
+    @_synchronized
+    def enable_snapshot(self, file_name, fingerprint=(), restore=False):
+        '''
+        该方法用于启用设置项快照，之后由save_snapshot保存影子缓存中写入的设置项，一般在运行结束时调用。
+        restore为True时先读取快照，以一条程序消息查询*IDN?及fingerprint中快照已有的设置项，
+        均与快照一致时以快照填充影子缓存，与快照相同的设置不再写入，从而可以跳过*RST。
+        已有的快照文件随即删除，运行中断、未保存快照时下次不会沿用与仪器不符的快照。
+        file_name：快照文件名；
+        fingerprint：用于校验快照的设置项指令头（规范化短格式），如('CONF:LTE:SIGN:BAND',)；
+        restore：是否由快照恢复；
+        返回是否已由快照恢复影子缓存。
+        '''
+        is_restored = restore and self._restore_snapshot(file_name, fingerprint)
+        if not is_restored:
+            self._snapshot_idn = self._call(self._resource.query, '*IDN?')
+            self._snapshot_dirty = True
+        if os.path.exists(file_name):
+            os.remove(file_name)
+            self._snapshot_dirty = True
+        self.snapshot_file = file_name
+        return is_restored
+
+    def _restore_snapshot(self, file_name, fingerprint):
+        '''
+        读取快照并与仪器当前的标识、设置项比较，一致时填充影子缓存并返回True。
+        '''
+        try:
+            with open(file_name) as f:
+                snapshot = json.load(f)
+            settings = snapshot['settings']
+        except (IOError, ValueError, KeyError, TypeError):
+            return False
+        headers = [header for header in fingerprint if header in settings]
+        self._flush()
+        responses = self._call(self._resource.query,
+                               ';'.join(['*IDN?'] + [':%s?' % header for header in headers]))
+        responses = responses.split(';')
+        if len(responses) != len(headers) + 1 or responses[0] != snapshot.get('idn'):
+            return False
+        for header, value in zip(headers, responses[1:]):
+            if _normalize_value(value) != _normalize_value(settings[header]):
+                return False
+        self._cache = dict((str(header), (str(value), True)) for header, value in settings.items())
+        self._read_back.clear()
+        self._snapshot_idn = responses[0]
+        self._snapshot_dirty = False
+        return True
+
+    @_synchronized
+    def save_snapshot(self):
+        '''
+        该方法用于将影子缓存中写入的设置项保存到快照文件，未启用快照或没有修改时直接返回。
+        先写入临时文件再原子替换，保存过程中中断时保留原有的快照文件。
+        '''
+        if self.snapshot_file is None or not self._snapshot_dirty:
+            return
+        folder = os.path.dirname(self.snapshot_file)
+        if folder and not os.path.isdir(folder):
+            os.makedirs(folder)
+        settings = dict((header, value) for header, (value, is_written) in self._cache.items()
+                        if is_written)
+        temp_file = self.snapshot_file + '.tmp'
+        with open(temp_file, 'w') as f:
+            json.dump({'idn': self._snapshot_idn, 'settings': settings}, f, indent=0,
+                      sort_keys=True)
+        _replace_file(temp_file, self.snapshot_file)
+        self._snapshot_dirty = False
+
+    def phase(self, name):
+        '''
+        返回测试阶段的上下文管理器，见Profiler.phase，未启用指令耗时统计时不做任何操作。
+        '''
+        if self.profiler is None:
+            return profiler_module.NULL_PHASE
+        return self.profiler.phase(name)
+
+    def _call(self, func, *args):
+        '''
+        调用visa资源接口，出错时仪器状态未知，清除影子缓存。
+        启用指令耗时统计时记录程序消息、耗时、收发字节数，读取操作以'<read>'、'<read_raw>'标识。
+        '''
+        if self.profiler is None:
+            try:
+                return func(*args)
+            except Exception:
+                self.invalidate()
+                raise
+        t0 = time.time()
+        result = None
+        try:
+            result = func(*args)
+            return result
+        except Exception:
+            self.invalidate()
+            raise
+        finally:
+            message = args[0] if args else '<%s>' % func.__name__
+            nbytes = (len(args[0]) if args else 0) + \
+                (len(result) if isinstance(result, basestring) else 0)
+            self.profiler.record(self.name, message, time.time() - t0, nbytes)
+
+    @staticmethod
+    def _is_cacheable(header):
+        return header.startswith(CACHEABLE_PREFIXES)
+
+    def _get_cacheable_query(self, message):
+        '''
+        返回可由缓存应答的查询指令头，不可缓存时返回None。
+        '''
+        if not self.cache_enabled:
+            return None
+        commands = scpi.parse_message(message)
+        if len(commands) != 1:
+            return None
+        header, args = commands[0]
+        header = header.rstrip('?')
+        if args or not self._is_cacheable(header):
+            return None
+        return header
+
+    def _update_cache(self, message):
+        '''
+        按写入的设置项更新影子缓存。
+        返回是否需要写入仪器，所有设置项均与缓存相同时返回False。
+        '''
+        is_changed = False
+        for header, args in scpi.parse_message(message):
+            if header == '*RST':
+                self.invalidate()
+                is_changed = True
+            elif header.endswith('?') or not self._is_cacheable(header):
+                if header.startswith(ACTION_PREFIXES):
+                    self._invalidate_rat(header, only_read_back=not any(
+                        action in header or args.upper().startswith(action)
+                        for action in CONFIG_CHANGING_ACTIONS))
+                is_changed = True
+            else:
+                cached = self._cache.get(header)
+                if cached is not None and \
+                        _normalize_value(cached[0]) == _normalize_value(args):
+                    self.cache_stats['hits'] += 1
+                    continue
+                self.cache_stats['misses'] += 1
+                is_changed = True
+                self._snapshot_dirty = True
+                self._invalidate_rat(header, only_read_back=True)
+                for prefix in self.dependent_settings.get(header, ()):
+                    self.invalidate(prefix)
+                self._cache[header] = (args, True)
+                self._read_back.discard(header)
+                self._unconfirmed.add(header)
+        return is_changed
+
+    def _check_errors(self, esr):
+        '''
+        根据*ESR?的返回值确认上次确认后写入的设置项：没有错误时全部确认，
+        有错误时无法区分被拒绝的设置项，全部从影子缓存中清除，之后的写入、回读重新发往仪器。
+        '''
+        try:
+            has_error = int(esr.strip().lstrip('+')) & ESR_ERROR_BITS
+        except ValueError:
+            has_error = True
+        if has_error:
+            self.logger.warning('%s: error reported, %s; drop %d unconfirmed settings from cache.'
+                                % (self.name, '; '.join(self._read_errors()),
+                                   len(self._unconfirmed)))
+            for header in self._unconfirmed:
+                if self._cache.pop(header, None) is not None:
+                    self._snapshot_dirty = True
+        self._unconfirmed.clear()
+
+    def _read_errors(self):
+        '''
+        读空仪器的错误队列，直至返回'0,"No error"'，最多读取MAX_ERROR_QUEUE_LENGTH条。
+        返回错误信息列表。
+        '''
+        errors = []
+        for _ in range(MAX_ERROR_QUEUE_LENGTH):
+            error = self._call(self._resource.query, 'SYSTem:ERRor?').strip()
+            try:
+                code = int(error.split(',', 1)[0].lstrip('+'))
+            except ValueError:
+                code = None
+            if code == 0:
+                break
+            errors.append(error)
+            if code is None:
+                break
+        return errors
+
+    def _invalidate_rat(self, header, only_read_back=False):
+        '''
+        清除与header同一制式（指令头第2个节点）的缓存。
+        only_read_back：为True时只清除由查询得到的回读值，写入的设置项保留。
+        '''
+        nodes = header.split(':')
+        if len(nodes) < 2:
+            return
+        for key, (value, is_written) in list(self._cache.items()):
+            key_nodes = key.split(':')
+            if len(key_nodes) > 1 and key_nodes[1] == nodes[1]:
+                if not (only_read_back and is_written):
+                    del self._cache[key]
+                    self._snapshot_dirty = self._snapshot_dirty or is_written
+
+    @contextlib.contextmanager
+    def batch(self, wait=None):
+        '''
+        该方法用于批量写入指令，使用方式为with inst.batch(): ...
+        块内的write指令先缓存，结束时以';'合并为尽量少的程序消息发送；
+        块内的wait_for_operation_done调用合并为结束时的一次等待。
+        块内的查询会先发送已缓存的指令，保证指令顺序不变。
+        块内抛出异常时丢弃尚未发送的指令，并从影子缓存中清除这些设置项。
+        各线程的批量写入分别缓存，互不影响。
+        wait：结束时是否等待操作完成，默认在块内调用过wait_for_operation_done时等待。
+        '''
+        batch = self._get_batch()
+        batch.depth += 1
+        is_completed = False
+        try:
+            yield self
+            is_completed = True
+        finally:
+            batch.depth -= 1
+            if not batch.depth:
+                need_wait = batch.wait if wait is None else wait
+                batch.wait = False
+                with self.locked():
+                    if not is_completed:
+                        self._discard(batch)
+                    else:
+                        self._flush()
+                        if need_wait:
+                            self.wait_for_operation_done()
+
+    def _discard(self, batch):
+        '''
+        丢弃批量写入中尚未发送的指令，写入时已更新的影子缓存随之清除。
+        '''
+        for command in batch.commands:
+            for header, args in scpi.parse_message(command):
+                if self._cache.pop(header, None) is not None:
+                    self._snapshot_dirty = True
+                self._unconfirmed.discard(header)
+                self._read_back.discard(header)
+        batch.commands = []
+
+    def _flush(self):
+        '''
+        将调用线程缓存的指令合并发送。指令头前补':'，使合并后的每条指令都从根路径解析。
+        '''
+        batch = self._get_batch()
+        if not batch.commands:
+            return
+        commands = batch.commands
+        batch.commands = []
+        message = ''
+        for command in commands:
+            if not command.startswith(('*', ':')):
+                command = ':' + command
+            if message and len(message) + len(command) + 1 > self.max_message_length:
+                self._send_batch(message)
+                message = ''
+            message = message + ';' + command if message else command
+        self._send_batch(message)
+        self.batch_stats['commands'] += len(commands)
+
+    def _send_batch(self, message):
+        self._has_pending_operation = True
+        self._call(self._resource.write, message)
+        self.batch_stats['messages'] += 1
+
+    @_synchronized
+    def wait_for_operation_done(self, timeout=None):
+        '''
+        该方法用于等待仪器完成操作，用于设置参数的方法后。
+        *OPC?在仪器完成所有挂起操作后才返回，单次阻塞查询即可在操作完成时立即返回，
+        无需轮询、休眠。上次等待后没有写入过指令（如写入均被缓存跳过）时直接返回。
+        相对原轮询方式节省的时长按实际执行的等待统计，批量写入中合并的多次等待只计一次。
+        同一条程序消息查询*ESR?，仪器报告错误时记录SYSTem:ERRor?，并从影子缓存中清除未确认的设置项。
+        timeout：等待超时，单位秒，默认沿用仪器的visa超时；
+        返回等待时长，单位秒。
+        '''
+        batch = self._get_batch()
+        if batch.depth:
+            # 批量写入中的等待推迟到批量结束时执行一次
+            batch.wait = True
+            return 0.0
+        self._flush()
+        if not self._has_pending_operation:
+            return 0.0
+        origin_timeout = self._resource.timeout
+        if timeout is not None:
+            self._resource.timeout = int(timeout * 1000)
+        t0 = time.time()
+        try:
+            result = self._call(self._resource.query, '*OPC?;*ESR?')
+        except Exception, e:
+            # 只有超时表示操作未完成，链路断开等其他错误原样抛出；_call已清除影子缓存
+            if not visa_backend.is_timeout_error(e):
+                raise
+            raise OperationTimeoutError('%s: wait for operation done timeout, %s' % (self.name, e))
+        finally:
+            self._resource.timeout = origin_timeout
+        elapsed = time.time() - t0
+        responses = result.split(';')
+        if responses[0].strip().lstrip('+') != '1':
+            self.invalidate()
+            raise OperationTimeoutError('%s: unexpected *OPC? response %r' % (self.name, result))
+        self._check_errors(responses[1] if len(responses) > 1 else '0')
+
+        self._has_pending_operation = False
+        self.opc_stats['count'] += 1
+        self.opc_stats['seconds'] += elapsed
+        self.opc_stats['saved_seconds'] += LEGACY_POLL_INTERVAL
+        return elapsed
@@ -0,0 +1,63 @@
+# -*- coding:utf-8 -*-
+###############################################################################
+# Copyright (C), 2018, TP-LINK Technologies Co., Ltd.
+#
+# 作者：吴扬波
+# 版本：V1.0
+# 变更历史:
+# 1，2026-10-18， 吴扬波——首次创建：ProgressJournal类，记录已完成的测量点，用于中断后续测
+# 2，2026-10-18， 吴扬波——增加只读模式，多工位执行时工位进程读取主进程的进度日志
+# 若引用或修改API，请保留API变更历史。
+###############################################################################
+import os
+
+# 进度日志文件名，不以.txt结尾，汇总excel时不会被当作结果文件
+JOURNAL_FILE = 'progress.journal'
+
+
+class ProgressJournal(object):
+    '''
+    ProgressJournal类，在用例执行文件夹中逐行追加已完成的测量点（结果文件名、配置说明），
+    每行写入后同步到磁盘。程序中断后以同一文件夹重新执行用例，已完成的测量点被跳过，
+    测量结果继续追加到同一结果数据库。
+    '''
+
+    def __init__(self, folder_name, read_only=False):
+        '''
+        folder_name：用例执行文件夹；
+        read_only：是否只读，只读时mark_done只在内存中记录，不写入文件。
+        '''
+        self.file_name = os.path.join(folder_name, JOURNAL_FILE)
+        self._done = set()
+        if os.path.exists(self.file_name):
+            with open(self.file_name) as f:
+                for line in f:
+                    # 中断时可能残留不完整的最后一行，没有换行符的行忽略
+                    if line.endswith('\n'):
+                        self._done.add(tuple(line[:-1].split('\t', 1)))
+        self._file = None if read_only else open(self.file_name, 'a')
+
+    def __len__(self):
+        return len(self._done)
+
+    def is_done(self, result_file_name, configuration):
+        '''
+        返回测量点是否已完成。
+        result_file_name：结果文件名，如'LTE.txt'；
+        configuration：配置说明，同DataRecorder.record_result的configuration。
+        '''
+        return (result_file_name, configuration) in self._done
+
+    def mark_done(self, result_file_name, configuration):
+        '''
+        该方法用于记录测量点已完成，应在测量结果提交之后调用。
+        '''
+        if self._file is not None:
+            self._file.write('%s\t%s\n' % (result_file_name, configuration))
+            self._file.flush()
+            os.fsync(self._file.fileno())
+        self._done.add((result_file_name, configuration))
+
+    def close(self):
+        if self._file is not None:
+            self._file.close()
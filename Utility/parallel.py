@@ -0,0 +1,48 @@
+# -*- coding:utf-8 -*-
+###############################################################################
+# Copyright (C), 2018, TP-LINK Technologies Co., Ltd.
+#
+# 作者：吴扬波
+# 版本：V1.0
+# 变更历史:
+# 1，2026-10-18， 吴扬波——首次创建：BackgroundCall类，用于在后台线程中执行仪器操作
+# 若引用或修改API，请保留API变更历史。
+###############################################################################
+import sys
+import threading
+
+
+class BackgroundCall(threading.Thread):
+    '''
+    BackgroundCall类，在后台线程中执行一次函数调用，由get方法取回返回值。
+    用于同时操作不同总线上的相互独立的仪器，如CMW500测量功率时DC Source测量电流。
+    '''
+
+    def __init__(self, func, *args, **kwargs):
+        '''
+        func：后台执行的函数，args、kwargs为其参数。
+        '''
+        threading.Thread.__init__(self, name=getattr(func, '__name__', None))
+        self.daemon = True
+        self._func = func
+        self._args = args
+        self._kwargs = kwargs
+        self._result = None
+        self._exc_info = None
+
+    def run(self):
+        try:
+            self._result = self._func(*self._args, **self._kwargs)
+        except Exception:
+            self._exc_info = sys.exc_info()
+
+    def get(self):
+        '''
+        等待后台调用结束，返回函数的返回值；函数抛出异常时，在调用线程中重新抛出。
+        '''
+        self.join()
+        if self._exc_info is not None:
+            exc_type, exc_value, exc_traceback = self._exc_info
+            self._exc_info = None
+            raise exc_type, exc_value, exc_traceback
+        return self._result
@@ -0,0 +1,135 @@
+# -*- coding:utf-8 -*-
+###############################################################################
+# Copyright (C), 2018, TP-LINK Technologies Co., Ltd.
+#
+# 作者：吴扬波
+# 版本：V1.0
+# 变更历史:
+# 1，2026-10-18， 吴扬波——首次创建：测试计划优化，用于配置项去重、按重配置代价排序
+# 2，2026-10-18， 吴扬波——执行前由bands检查频段、信道、带宽，删除不合法的配置项
+# 若引用或修改API，请保留API变更历史。
+###############################################################################
+import pylogger
+import bands
+
+# 各制式相邻配置项间参数变化的代价，单位秒；GSM频段切换含band indicator的5s等待及切换
+TRANSITION_COST = {
+    'LTE_FDD': (('Band', 1.0), ('DlChannel', 0.3), ('Bandwidth', 0.5),
+                ('RbNumber', 0.1), ('RbPosition', 0.1)),
+    'WCDMA': (('Band', 1.0), ('DlChannel', 0.3)),
+    'GSM': (('Band', 7.0), ('DlChannel', 0.5)),
+}
+# 单个配置项的测量耗时估计，单位秒：10s稳定性观测窗 + 30s平均电流测量
+DEFAULT_CONFIGURATION_SECONDS = 40.0
+
+
+def transition_cost(task_format, previous, current):
+    '''
+    返回由配置项previous切换到current的代价，单位秒。
+    task_format：制式，如'LTE_FDD'；
+    previous：上一个配置项，首个配置项传入None；
+    current：当前配置项。
+    '''
+    cost = 0.0
+    for key, weight in TRANSITION_COST.get(task_format, ()):
+        if previous is None or previous.get(key) != current.get(key):
+            cost += weight
+    return cost
+
+
+def sequence_cost(task_format, configuration):
+    '''
+    返回按顺序执行配置列表的重配置总代价，单位秒。
+    '''
+    cost = 0.0
+    previous = None
+    for item in configuration:
+        cost += transition_cost(task_format, previous, item)
+        previous = item
+    return cost
+
+
+def validate(task_format, configuration):
+    '''
+    按3GPP频段表检查配置项的频段、信道、带宽。
+    返回(合法的配置列表, [(不合法的配置项, 错误说明)])。
+    '''
+    result = []
+    invalid = []
+    for item in configuration:
+        error = bands.check_configuration(task_format, item)
+        if error is None:
+            result.append(item)
+        else:
+            invalid.append((item, error))
+    return result, invalid
+
+
+def deduplicate(configuration):
+    '''
+    删除参数完全相同的重复配置项，保留首次出现的顺序。
+    返回(去重后的配置列表, 删除的配置项数量)。
+    '''
+    result = []
+    seen = set()
+    for item in configuration:
+        key = tuple(sorted(item.items()))
+        if key not in seen:
+            seen.add(key)
+            result.append(item)
+    return result, len(configuration) - len(result)
+
+
+def reorder(task_format, configuration):
+    '''
+    按最近邻贪心策略排序配置项，每次选取切换代价最小的配置项，代价相同时保持原顺序。
+    返回排序后的配置列表。
+    '''
+    remaining = list(configuration)
+    result = []
+    previous = None
+    while remaining:
+        index = min(range(len(remaining)),
+                    key=lambda i: (transition_cost(task_format, previous, remaining[i]), i))
+        previous = remaining.pop(index)
+        result.append(previous)
+    return result
+
+
+def optimize_tasklist(task_list, keep_repeats=False, configuration_seconds=None):
+    '''
+    该方法用于在执行前优化测试计划：删除不合法、重复的配置项，并按重配置代价重新排序。
+    TaskList设置KeepRepeats="1"属性时，该制式保留有意重复的配置项。
+    task_list：xml_parser.get_tasklist返回的任务列表；
+    keep_repeats：是否对所有制式保留重复的配置项；
+    configuration_seconds：{制式: 单个配置项的测量耗时}，用于估计去重节省的时间；
+    返回优化后的任务列表。
+    '''
+    logger = pylogger.setup_logger('Planner')
+    configuration_seconds = configuration_seconds or {}
+    total_saved = 0.0
+    result = []
+    for task in task_list:
+        task_format = task['Format']
+        configuration = task['configuration']
+        configuration, invalid = validate(task_format, configuration)
+        for item, error in invalid:
+            logger.error('%s configuration %s dropped: %s'
+                         % (task_format, dict(item), error))
+        origin_cost = sequence_cost(task_format, configuration)
+        dropped = 0
+        if not (keep_repeats or task.get('KeepRepeats', '0') in ('1', 'true', 'True')):
+            configuration, dropped = deduplicate(configuration)
+        configuration = reorder(task_format, configuration)
+
+        saved = (origin_cost - sequence_cost(task_format, configuration) +
+                 dropped * configuration_seconds.get(task_format,
+                                                     DEFAULT_CONFIGURATION_SECONDS))
+        total_saved += saved
+        logger.info('%s plan: %d configurations, %d duplicates dropped, estimated saving %.1fs'
+                    % (task_format, len(configuration), dropped, saved))
+        optimized_task = dict(task)
+        optimized_task['configuration'] = configuration
+        result.append(optimized_task)
+    logger.info('Test plan optimized, estimated time saved: %.1fs' % total_saved)
+    return result
@@ -0,0 +1,258 @@
+# -*- coding:utf-8 -*-
+###############################################################################
+# Copyright (C), 2018, TP-LINK Technologies Co., Ltd.
+#
+# 作者：吴扬波
+# 版本：V1.0
+# 变更历史:
+# 1，2026-10-18， 吴扬波——首次创建：Profiler类，统计各SCPI指令的耗时，并按测试阶段汇总
+# 若引用或修改API，请保留API变更历史。
+###############################################################################
+import scpi
+import os
+import sys
+import threading
+import time
+
+# 报告文件名
+REPORT_FILE = 'profile_report.txt'
+# 测试阶段，报告按此顺序列出，不属于任何阶段的指令计入'other'
+PHASES = ('attach', 'channel set', 'power set', 'tx power measurement', 'stability',
+          'current measurement', 'current logging')
+OTHER_PHASE = 'other'
+# 耗时直方图各区间的上限，单位秒，最后一个区间无上限
+BUCKET_BOUNDS = (0.001, 0.003, 0.01, 0.03, 0.1, 0.3, 1.0, 3.0, 10.0)
+BUCKET_LABELS = ('<1ms', '<3ms', '<10ms', '<30ms', '<100ms', '<300ms', '<1s', '<3s', '<10s',
+                 '>=10s')
+# 报告中列出的指令条数，按累计耗时排序
+MAX_REPORT_COMMANDS = 50
+# 程序消息到指令名称的缓存条数上限
+MAX_COMMAND_NAMES = 4096
+# 查找调用方法时跳过的模块，即Instrument本身及其使用的contextlib
+_SKIP_MODULES = ('instrument', 'contextlib', 'profiler')
+
+
+class Histogram(object):
+    '''
+    Histogram类，按BUCKET_BOUNDS区间统计耗时的次数，并累计总耗时、最长耗时、字节数。
+    只保存各区间的计数，长时间运行内存占用不变。
+    '''
+
+    def __init__(self):
+        self.count = 0
+        self.seconds = 0.0
+        self.max_seconds = 0.0
+        self.bytes = 0
+        self.buckets = [0] * (len(BUCKET_BOUNDS) + 1)
+
+    def add(self, seconds, nbytes=0):
+        self.count += 1
+        self.seconds += seconds
+        self.bytes += nbytes
+        if seconds > self.max_seconds:
+            self.max_seconds = seconds
+        index = 0
+        while index < len(BUCKET_BOUNDS) and seconds >= BUCKET_BOUNDS[index]:
+            index += 1
+        self.buckets[index] += 1
+
+    def mean(self):
+        return self.seconds / self.count if self.count else 0.0
+
+    def percentile(self, ratio):
+        '''
+        返回耗时的百分位数估计，即累计次数达到ratio的区间上限，最后一个区间返回最长耗时。
+        '''
+        target = ratio * self.count
+        total = 0
+        for index, count in enumerate(self.buckets):
+            total += count
+            if count and total >= target:
+                if index < len(BUCKET_BOUNDS):
+                    return min(BUCKET_BOUNDS[index], self.max_seconds)
+                break
+        return self.max_seconds
+
+
+class _NullPhase(object):
+    '''
+    未启用统计时使用的空阶段，进入、退出时不做任何操作。
+    '''
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        return False
+
+
+NULL_PHASE = _NullPhase()
+
+
+class _Phase(object):
+
+    def __init__(self, profiler, name):
+        self._profiler = profiler
+        self._name = name
+        self._start = None
+
+    def __enter__(self):
+        self._profiler._phase_stack().append(self._name)
+        self._start = time.time()
+        return self
+
+    def __exit__(self, *exc_info):
+        seconds = time.time() - self._start
+        self._profiler._phase_stack().pop()
+        with self._profiler._lock:
+            self._profiler._get_phase(self._name)['wall'].add(seconds)
+        return False
+
+
+class Profiler(object):
+    '''
+    Profiler类，记录仪器每次指令收发的指令名称、耗时、字节数、调用方法，
+    并按当前线程所处的测试阶段汇总。Instrument的profiler属性设为Profiler实例后开始记录。
+    测试阶段以with profiler.phase('attach'): ...标记，按线程分别记录，
+    并行测量时后台线程的电流测量与主线程的上行功率测量分别计入各自的阶段。
+    '''
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        # 阶段名称 -> {'wall': 阶段耗时直方图, 'io': 阶段内指令耗时直方图}
+        self._phases = {}
+        # (仪器名称, 指令名称) -> {'histogram': 指令耗时直方图, 'callers': {调用方法: 次数}}
+        self._commands = {}
+        self._command_names = {}
+
+    def _phase_stack(self):
+        stack = getattr(self._local, 'stack', None)
+        if stack is None:
+            stack = self._local.stack = []
+        return stack
+
+    def _get_phase(self, name):
+        phase = self._phases.get(name)
+        if phase is None:
+            phase = self._phases[name] = {'wall': Histogram(), 'io': Histogram()}
+        return phase
+
+    def phase(self, name):
+        '''
+        返回测试阶段的上下文管理器，块内的指令计入该阶段，阶段可以嵌套，指令计入最内层的阶段。
+        name：阶段名称，一般为PHASES之一。
+        '''
+        return _Phase(self, name)
+
+    def _command_name(self, message):
+        '''
+        返回程序消息的指令名称：规范化的指令头，以';'连接；超过3条指令时只列出前3条。
+        '''
+        name = self._command_names.get(message)
+        if name is None:
+            headers = [scpi.normalize_header(unit.split(None, 1)[0])
+                       for unit in scpi.split_message(message)]
+            name = ';'.join(headers[:3]) + (';...' if len(headers) > 3 else '')
+            if len(self._command_names) < MAX_COMMAND_NAMES:
+                self._command_names[message] = name
+        return name
+
+    @staticmethod
+    def _caller():
+        '''
+        返回调用仪器接口的方法名称，如'LTE.attach'。
+        '''
+        frame = sys._getframe(2)
+        while frame is not None:
+            module = os.path.splitext(os.path.basename(frame.f_code.co_filename))[0]
+            if module not in _SKIP_MODULES:
+                break
+            frame = frame.f_back
+        if frame is None:
+            return '?'
+        owner = frame.f_locals.get('self')
+        if owner is not None:
+            return '%s.%s' % (owner.__class__.__name__, frame.f_code.co_name)
+        return '%s.%s' % (module, frame.f_code.co_name)
+
+    def record(self, instrument_name, message, seconds, nbytes=0):
+        '''
+        该方法用于记录一次指令收发。
+        instrument_name：仪器名称；
+        message：程序消息，读取操作传入'<read>'等标识；
+        seconds：耗时，单位秒；
+        nbytes：发送、接收的字节数之和。
+        '''
+        name = self._command_name(message) if not message.startswith('<') else message
+        caller = self._caller()
+        stack = self._phase_stack()
+        phase_name = stack[-1] if stack else OTHER_PHASE
+        with self._lock:
+            self._get_phase(phase_name)['io'].add(seconds, nbytes)
+            command = self._commands.get((instrument_name, name))
+            if command is None:
+                command = self._commands[(instrument_name, name)] = {'histogram': Histogram(),
+                                                                     'callers': {}}
+            command['histogram'].add(seconds, nbytes)
+            command['callers'][caller] = command['callers'].get(caller, 0) + 1
+
+    def get_phase_stats(self):
+        '''
+        返回各阶段的统计列表，元素为(阶段名称, 阶段耗时直方图, 阶段内指令耗时直方图)，按PHASES的顺序。
+        '''
+        with self._lock:
+            names = [name for name in PHASES if name in self._phases]
+            names.extend(sorted(name for name in self._phases if name not in PHASES))
+            return [(name, self._phases[name]['wall'], self._phases[name]['io']) for name in names]
+
+    def format_report(self, max_commands=MAX_REPORT_COMMANDS):
+        '''
+        将统计结果格式化为文本报告：各阶段的耗时及指令耗时，各指令的耗时直方图及主要调用方法。
+        '''
+        lines = ['Phases',
+                 '%-22s%8s%12s%10s%10s%10s%8s%12s' % ('Phase', 'Count', 'Time(s)', 'Mean(s)',
+                                                     'P95(s)', 'Max(s)', 'SCPI', 'SCPI(s)')]
+        for name, wall, io in self.get_phase_stats():
+            lines.append('%-22s%8d%12.1f%10.3f%10.3f%10.3f%8d%12.1f'
+                         % (name, wall.count, wall.seconds, wall.mean(), wall.percentile(0.95),
+                            wall.max_seconds, io.count, io.seconds))
+        lines.append('')
+        lines.append('Phase SCPI latency histogram')
+        lines.append('%-22s' % 'Phase' + ''.join('%8s' % label for label in BUCKET_LABELS))
+        for name, _, io in self.get_phase_stats():
+            lines.append('%-22s' % name + ''.join('%8d' % count for count in io.buckets))
+
+        with self._lock:
+            commands = sorted(self._commands.items(),
+                              key=lambda item: item[1]['histogram'].seconds, reverse=True)
+            commands = [(key, command['histogram'],
+                         max(command['callers'].items(), key=lambda item: item[1])[0])
+                        for key, command in commands[:max_commands]]
+        lines.append('')
+        lines.append('Commands (top %d by time)' % max_commands)
+        lines.append('%-12s%-44s%8s%10s%10s%10s%10s%10s  %s'
+                     % ('Instrument', 'Command', 'Count', 'Time(s)', 'Mean(ms)', 'P95(ms)',
+                        'Max(ms)', 'KB', 'Caller'))
+        for (instrument_name, name), histogram, caller in commands:
+            lines.append('%-12s%-44s%8d%10.1f%10.1f%10.1f%10.1f%10.1f  %s'
+                         % (instrument_name, name[:43], histogram.count, histogram.seconds,
+                            histogram.mean() * 1000, histogram.percentile(0.95) * 1000,
+                            histogram.max_seconds * 1000, histogram.bytes / 1024.0, caller))
+        lines.append('')
+        lines.append('Command latency histogram')
+        lines.append('%-12s%-44s' % ('Instrument', 'Command') +
+                     ''.join('%8s' % label for label in BUCKET_LABELS))
+        for (instrument_name, name), histogram, _ in commands:
+            lines.append('%-12s%-44s' % (instrument_name, name[:43]) +
+                         ''.join('%8d' % count for count in histogram.buckets))
+        return '\n'.join(lines)
+
+    def write_report(self, folder_name):
+        '''
+        该方法用于将报告写入folder_name下的REPORT_FILE，返回文件名。
+        '''
+        file_name = os.path.join(folder_name, REPORT_FILE)
+        with open(file_name, 'w') as f:
+            f.write(self.format_report() + '\n')
+        return file_name
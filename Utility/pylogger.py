@@ -2,21 +2,191 @@
 
 import logging
 import global_variable
+import atexit
+import os
+import Queue
+import threading
+
+LOG_FORMAT = '%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+LOG_FILE = 'log.txt'
+# 未单独设置级别的日志引用的级别
+DEFAULT_LEVEL = logging.DEBUG
+# 各日志引用（调用方类名）的级别，如{'DCSource': logging.INFO}，可由set_level、set_levels修改
+LOGGER_LEVELS = {}
+
+# 本进程的日志配置：队列处理器、后台写入线程、文件处理器及其所在的文件夹、配置时的进程号
+_lock = threading.Lock()
+_queue_handler = None
+_listener = None
+_file_handler = None
+_file_folder = None
+_pid = None
+
+
+class QueueHandler(logging.Handler):
+    '''
+    QueueHandler类，将日志记录放入队列后立即返回，由QueueListener在后台线程中写入控制台、文件，
+    记录日志的线程不会阻塞在磁盘、控制台的输出上。
+    '''
+
+    def __init__(self, queue):
+        logging.Handler.__init__(self)
+        self.queue = queue
+
+    def prepare(self, record):
+        '''
+        在记录日志的线程中生成消息文本，避免后台写入时参数已被修改；异常信息转为文本。
+        '''
+        record.msg = record.getMessage()
+        record.args = None
+        if record.exc_info:
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+            record.exc_info = None
+        return record
+
+    def emit(self, record):
+        try:
+            self.queue.put_nowait(self.prepare(record))
+        except Exception:
+            self.handleError(record)
+
+
+class QueueListener(object):
+    '''
+    QueueListener类，后台线程从队列取出日志记录，交给各处理器输出。
+    '''
+    _sentinel = None
+
+    def __init__(self, queue, *handlers):
+        self.queue = queue
+        self.handlers = list(handlers)
+        self._handlers_lock = threading.Lock()
+        self._thread = None
+
+    def start(self):
+        self._thread = threading.Thread(target=self._monitor, name='LogListener')
+        self._thread.daemon = True
+        self._thread.start()
+
+    def _monitor(self):
+        while True:
+            record = self.queue.get()
+            if record is self._sentinel:
+                break
+            with self._handlers_lock:
+                for handler in self.handlers:
+                    if record.levelno >= handler.level:
+                        handler.handle(record)
+
+    def replace_handler(self, old_handler, new_handler):
+        '''
+        该方法用于替换处理器，队列中尚未写出的记录由新的处理器输出。
+        '''
+        with self._handlers_lock:
+            if old_handler in self.handlers:
+                self.handlers.remove(old_handler)
+                old_handler.close()
+            self.handlers.append(new_handler)
+
+    def stop(self):
+        '''
+        该方法用于写出队列中剩余的记录后停止后台线程。
+        '''
+        if self._thread is None:
+            return
+        self.queue.put_nowait(self._sentinel)
+        self._thread.join()
+        self._thread = None
+
+
+def _create_file_handler(folder):
+    handler = logging.FileHandler(folder + '.\\' + LOG_FILE, 'a')
+    handler.setFormatter(logging.Formatter(LOG_FORMAT))
+    return handler
+
+
+def _configure():
+    '''
+    在本进程中创建一套处理器：队列处理器、后台写入线程及其控制台、文件处理器。
+    进程号改变时（工位子进程由fork创建，后台线程没有被复制）重新创建。
+    用例执行文件夹改变时，文件处理器改为写入新文件夹下的log.txt。
+    '''
+    global _queue_handler, _listener, _file_handler, _file_folder, _pid
+    folder = global_variable.file_folder
+    if _pid == os.getpid():
+        if folder != _file_folder:
+            file_handler = _create_file_handler(folder)
+            _listener.replace_handler(_file_handler, file_handler)
+            _file_handler, _file_folder = file_handler, folder
+        return
+    queue = Queue.Queue()
+    console_handler = logging.StreamHandler()
+    console_handler.setFormatter(logging.Formatter(LOG_FORMAT))
+    _file_handler = _create_file_handler(folder)
+    _file_folder = folder
+    _queue_handler = QueueHandler(queue)
+    _listener = QueueListener(queue, console_handler, _file_handler)
+    _listener.start()
+    _pid = os.getpid()
 
 
 def setup_logger(cls_name):
     '''
     根据调用方的类名实例化日志引用。
+    同一进程内所有日志引用共用一个队列处理器，多次调用不会重复添加处理器。
      cls_name：类名。
     '''
-    logger = logging.getLogger(cls_name)
-    formatter = logging.Formatter(
-        '%(asctime)s - %(name)s - %(levelname)s - %(message)s')
-    console_handler = logging.StreamHandler()
-    console_handler.setFormatter(formatter)
-    file_handler = logging.FileHandler(global_variable.file_folder + '.\\log.txt', 'a')
-    file_handler.setFormatter(formatter)
-    logger.addHandler(console_handler)
-    logger.addHandler(file_handler)
-    logger.setLevel(logging.DEBUG)
+    with _lock:
+        _configure()
+        logger = logging.getLogger(cls_name)
+        for handler in list(logger.handlers):
+            if isinstance(handler, QueueHandler) and handler is not _queue_handler:
+                logger.removeHandler(handler)
+        if _queue_handler not in logger.handlers:
+            logger.addHandler(_queue_handler)
+        logger.propagate = False
+        logger.setLevel(LOGGER_LEVELS.get(cls_name, DEFAULT_LEVEL))
     return logger
+
+
+def set_level(cls_name, level):
+    '''
+    该方法用于设置日志引用的级别，已创建的日志引用立即生效。
+    cls_name：类名，如'DCSource'；
+    level：级别，如logging.INFO或'INFO'。
+    '''
+    if isinstance(level, basestring):
+        level_name, level = level, logging.getLevelName(level.upper())
+        if not isinstance(level, int):
+            raise ValueError('unknown log level: %s' % level_name)
+    LOGGER_LEVELS[cls_name] = level
+    logging.getLogger(cls_name).setLevel(level)
+
+
+def set_levels(spec):
+    '''
+    该方法用于按字符串设置多个日志引用的级别。
+    spec：以','分隔的'类名=级别'，如'DCSource=INFO,LTE=WARNING'。
+    '''
+    for item in spec.split(','):
+        if item.strip():
+            cls_name, level = item.split('=', 1)
+            set_level(cls_name.strip(), level.strip())
+
+
+def shutdown():
+    '''
+    该方法用于写出队列中剩余的日志记录并停止后台写入线程，进程退出前调用。
+    正常退出时已自动调用；multiprocessing子进程退出时不执行atexit，需显式调用。
+    '''
+    global _pid
+    with _lock:
+        if _pid != os.getpid():
+            return
+        _listener.stop()
+        for handler in _listener.handlers:
+            handler.close()
+        _pid = None
+
+
+atexit.register(shutdown)
@@ -6,12 +6,29 @@
 # 版本：V1.0
 # 变更历史:
 # 1，2018-08-20， 吴扬波——首次创建：DataRecorder类，用于数据记录
+# 2，2026-10-18， 吴扬波——增加QueueDataRecorder类，用于多工位进程汇总测量结果
+# 3，2026-10-18， 吴扬波——测量结果增加电流置信区间
+# 4，2026-10-18， 吴扬波——汇总excel时只读取测量结果txt，跳过电流采样、波形存档文件
+# 5，2026-10-18， 吴扬波——测量结果改存ResultStore数据库，txt、excel由数据库导出
+# 6，2026-10-18， 吴扬波——excel改为constant_memory模式逐行写出，结果文件较大时多进程并行解析
+# 7，2026-10-18， 吴扬波——增加flush方法，续测日志记录测量点完成前提交测量结果
+# 8，2026-10-18， 吴扬波——汇总excel时跳过指令耗时报告
 # 若引用或修改API，请保留API变更历史。
 ###############################################################################
 import global_variable
+import result_store
+import itertools
+import multiprocessing
 import os
 import xlsxwriter
 
+# 用例执行文件夹中不属于测量结果的文件前缀：日志、后台电流采样、波形存档、指令耗时报告
+NON_RESULT_PREFIXES = ('log', 'current_', 'waveform', 'profile')
+# excel的表头
+XLSX_HEADER = ['Configuration', 'Actual Power(dbm)', 'Current(mA)', 'Current CI(mA)']
+# 结果文件总大小达到该字节数时，以多个子进程并行解析各sheet
+PARALLEL_MIN_BYTES = 8 * 1024 * 1024
+
 
 class DataRecorder(object):
     '''
@@ -20,59 +37,149 @@ class DataRecorder(object):
 
     def __init__(self):
         self.folder_name = global_variable.file_folder
+        # 结果数据库，首次记录时打开
+        self.result_store = None
 
-    def record_result(self, result_file_name, configuration, power, current):
+    def record_result(self, result_file_name, configuration, power, current, interval=None,
+                      fields=None):
         '''
-        将配置、测量功率、测量电流记录至目标文件。
-        result_file_name：文件名；
+        将配置、测量功率、测量电流记录至结果数据库。
+        result_file_name：文件名，导出txt时使用；
         configuration：配置说明，字符串；
         power: 测量功率；
-        current: 测量电流
+        current: 测量电流；
+        interval：测量电流置信区间的半宽，没有时不记录；
+        fields：配置项字典，键同Power.xml中Task的属性，另有Format、TargetPower，存为类型化的列
         '''
-        result_file_rounine = self.folder_name + '.\\' + result_file_name
-        content = configuration + '\t' + str(power) + '\t' + str(current) + '\n'
-        with open(result_file_rounine, 'a') as f:
-            f.write(content)
+        if self.result_store is None:
+            self.result_store = result_store.ResultStore(self.folder_name)
+        self.result_store.add(result_file_name, configuration, power, current, interval, fields)
+
+    def flush(self):
+        '''
+        该方法用于立即提交已记录的测量结果。
+        '''
+        if self.result_store is not None:
+            self.result_store.flush()
 
     def save_xlsx(self):
         '''
-        该方法用于将过程存储的txt文件汇总到excel文件，用于实例调用。
+        该方法用于由结果数据库导出txt文件并汇总到excel文件，用于实例调用。
         '''
+        if self.result_store is not None:
+            self.result_store.close()
+            self.result_store = None
         self.save_to_xlsx(self.folder_name)
 
     @staticmethod
-    def save_to_xlsx(folder_name=None):
+    def save_to_xlsx(folder_name=None, processes=None):
         '''
-        该方法用于将过程存储的txt文件汇总到excel文件，用于独立调用。
+        该方法用于将txt文件汇总到excel文件，用于独立调用。
+        文件夹中有结果数据库时，先由数据库重新导出txt文件，如程序中断后补生成结果。
+        excel以constant_memory模式逐行写出，在主进程中解析时内存占用与结果行数无关；
+        结果文件较大时，由多个子进程并行解析各sheet的数据，主进程按顺序写出，内存中最多保留进程数个sheet。
+        processes：解析sheet的进程数，默认结果文件总大小不小于PARALLEL_MIN_BYTES时取CPU核数，
+        为1时在主进程中逐行解析、写出。
         '''
-        file_list = os.listdir(folder_name)
-        work_book = xlsxwriter.Workbook(folder_name + '\\result.xlsx', )
-        bold = work_book.add_format({'bold': 1})
+        if os.path.isfile(os.path.join(folder_name, result_store.DB_FILE)):
+            store = result_store.ResultStore(folder_name)
+            store.export_txt()
+            store.close()
+        # 跳过日志、电流采样、波形存档文件以及各工位的子文件夹
+        file_names = [file_name for file_name in sorted(os.listdir(folder_name))
+                      if file_name.endswith('.txt') and
+                      not file_name.startswith(NON_RESULT_PREFIXES) and
+                      os.path.isfile(folder_name + '.\\' + file_name)]
+        file_paths = [folder_name + '.\\' + file_name for file_name in file_names]
+        if processes is None:
+            total_bytes = sum(os.path.getsize(file_path) for file_path in file_paths)
+            processes = multiprocessing.cpu_count() if total_bytes >= PARALLEL_MIN_BYTES else 1
+        processes = min(processes, len(file_paths))
 
-        for file_name in file_list:
-            if not file_name.startswith('log'):
-                # 创建sheet
+        work_book = xlsxwriter.Workbook(folder_name + '\\result.xlsx', {'constant_memory': True})
+        bold = work_book.add_format({'bold': 1})
+        pool = None
+        try:
+            if processes > 1:
+                # 子进程解析完整个sheet后返回，imap按文件顺序取回，主进程写出时其余sheet并行解析
+                pool = multiprocessing.Pool(processes)
+                sheets = pool.imap(_read_result_rows, file_paths)
+            else:
+                sheets = (_iter_result_rows(file_path) for file_path in file_paths)
+            for file_name, rows in itertools.izip(file_names, sheets):
+                # 创建sheet，constant_memory模式下每个sheet须按行顺序写入
                 sheet = work_book.add_worksheet(file_name.split('.')[0])
-                row = 0
-                col = 0
-                # 写表头
-                for item in ['Configuration', 'Actual Power(dbm)', 'Current(mA)']:
-                    sheet.write(row, col, item, bold)
-                    col += 1
-
-                # 按txt的行写入excel
-                row = 1
-                text_file = open(folder_name + '.\\' + file_name)
-                for line in text_file.readlines():
-                    col = 0
-                    for item in line.strip().split('\t'):
-                        try:
-                            temp = float(item)
-                            item = temp
-                        except Exception, e:
-                            str(e)
-                        sheet.write(row, col, item)
-                        col += 1
-                    row += 1
-                text_file.close()
+                sheet.write_row(0, 0, XLSX_HEADER, bold)
+                _write_result_rows(sheet, rows)
+        finally:
+            if pool is not None:
+                pool.terminate()
+                pool.join()
         work_book.close()
+
+
+def _iter_result_rows(file_path):
+    '''
+    逐行读取结果txt，返回行的迭代器。
+    第一列为配置说明，保持字符串；其余列为功率、电流、置信区间，可转为数值的转为浮点数。
+    '''
+    with open(file_path) as f:
+        for line in f:
+            cells = line.rstrip('\r\n').split('\t')
+            row = [cells[0]]
+            for item in cells[1:]:
+                try:
+                    row.append(float(item))
+                except ValueError:
+                    # 'INV'、'Current unstable'等非数值
+                    row.append(item)
+            yield row
+
+
+def _read_result_rows(file_path):
+    '''
+    子进程解析sheet的入口，返回行列表。
+    '''
+    return list(_iter_result_rows(file_path))
+
+
+def _write_result_rows(sheet, rows):
+    '''
+    将解析后的行从第二行开始写入sheet，按解析出的类型直接调用write_number、write_string。
+    '''
+    for row_index, row in enumerate(rows, 1):
+        sheet.write_string(row_index, 0, row[0])
+        for col, item in enumerate(row[1:], 1):
+            if isinstance(item, float):
+                sheet.write_number(row_index, col, item)
+            else:
+                sheet.write_string(row_index, col, item)
+
+
+class QueueDataRecorder(DataRecorder):
+    '''
+    用于工位进程的数据记录，测量结果经队列交给主进程的DataRecorder统一记录。
+    '''
+
+    def __init__(self, result_queue):
+        DataRecorder.__init__(self)
+        self.result_queue = result_queue
+
+    def record_result(self, result_file_name, configuration, power, current, interval=None,
+                      fields=None):
+        '''
+        将配置、测量功率、测量电流、电流置信区间、配置项字典放入结果队列。
+        '''
+        self.result_queue.put((result_file_name, configuration, power, current, interval, fields))
+
+    def flush(self):
+        '''
+        测量结果由主进程提交，工位进程无需提交。
+        '''
+        pass
+
+    def save_xlsx(self):
+        '''
+        由主进程汇总所有工位的结果后生成excel文件，工位进程不生成。
+        '''
+        pass
@@ -0,0 +1,142 @@
+# -*- coding:utf-8 -*-
+###############################################################################
+# Copyright (C), 2018, TP-LINK Technologies Co., Ltd.
+#
+# 作者：吴扬波
+# 版本：V1.0
+# 变更历史:
+# 1，2026-10-18， 吴扬波——首次创建：ResultStore类，以SQLite按列存储测量结果
+# 若引用或修改API，请保留API变更历史。
+###############################################################################
+import os
+import sqlite3
+import time
+
+# 结果数据库文件名
+DB_FILE = 'result.db'
+# 距上次提交超过该时长（秒）或待提交行数达到COMMIT_ROWS时提交，批量记录时减少磁盘同步次数
+COMMIT_SECONDS = 10.0
+COMMIT_ROWS = 1000
+
+# 配置项字典的键与数据库列的对应关系，键同Power.xml中Task的属性，另有Format、TargetPower
+FIELD_COLUMNS = [('Format', 'rat', 'TEXT'),
+                 ('Band', 'band', 'TEXT'),
+                 ('DlChannel', 'channel', 'INTEGER'),
+                 ('Bandwidth', 'bandwidth', 'REAL'),
+                 ('RbNumber', 'rb_number', 'INTEGER'),
+                 ('RbPosition', 'rb_position', 'TEXT'),
+                 ('TargetPower', 'target_power', 'REAL')]
+
+_SCHEMA = '''
+CREATE TABLE IF NOT EXISTS result (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    run TEXT NOT NULL,
+    recorded_at REAL NOT NULL,
+    file_name TEXT NOT NULL,
+    configuration TEXT NOT NULL,
+    %s,
+    power REAL,
+    current REAL,
+    interval REAL,
+    power_text TEXT,
+    current_text TEXT
+)''' % ',\n    '.join('%s %s' % (column, column_type) for _, column, column_type in FIELD_COLUMNS)
+
+
+def _to_number(value):
+    '''
+    将测量值转为浮点数，'INV'、'Current unstable'等非数值返回None。
+    '''
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return None
+
+
+class ResultStore(object):
+    '''
+    ResultStore类，将测量结果按类型化的列存入用例执行文件夹下的SQLite数据库。
+    数据库使用WAL模式，已提交的记录在程序中断后依然完整；记录分批提交，
+    close或flush时提交剩余记录。txt、excel结果文件由export_txt从数据库导出。
+    '''
+
+    def __init__(self, folder_name):
+        '''
+        folder_name：用例执行文件夹，数据库文件为folder_name下的result.db。
+        '''
+        self.folder_name = folder_name
+        self.run = os.path.basename(os.path.normpath(folder_name))
+        self._connection = sqlite3.connect(os.path.join(folder_name, DB_FILE))
+        self._connection.execute('PRAGMA journal_mode=WAL')
+        # WAL模式下NORMAL同步在断电时最多丢失最近的提交，数据库不会损坏
+        self._connection.execute('PRAGMA synchronous=NORMAL')
+        self._connection.execute(_SCHEMA)
+        self._connection.commit()
+        self._pending = 0
+        self._last_commit = time.time()
+
+    def add(self, file_name, configuration, power, current, interval=None, fields=None):
+        '''
+        该方法用于记录一个测量结果，按提交策略分批提交。
+        file_name：结果文件名，如'LTE.txt'，用于导出txt；
+        configuration：配置说明，字符串；
+        power、current：测量功率、测量电流，可以是'INV'、'Current unstable'等非数值；
+        interval：测量电流置信区间的半宽；
+        fields：配置项字典，键见FIELD_COLUMNS，缺少的列为NULL。
+        '''
+        fields = fields or {}
+        values = [self.run, time.time(), file_name, configuration]
+        values.extend(fields.get(key) for key, _, _ in FIELD_COLUMNS)
+        values.extend([_to_number(power), _to_number(current), interval, str(power), str(current)])
+        self._connection.execute(
+            'INSERT INTO result (run, recorded_at, file_name, configuration, %s, power, current, '
+            'interval, power_text, current_text) VALUES (%s)'
+            % (', '.join(column for _, column, _ in FIELD_COLUMNS),
+               ', '.join(['?'] * len(values))), values)
+        self._pending += 1
+        if self._pending >= COMMIT_ROWS or time.time() - self._last_commit >= COMMIT_SECONDS:
+            self.flush()
+
+    def flush(self):
+        '''
+        该方法用于提交尚未提交的记录。
+        '''
+        self._connection.commit()
+        self._pending = 0
+        self._last_commit = time.time()
+
+    def close(self):
+        '''
+        该方法用于提交剩余记录并关闭数据库。
+        '''
+        self.flush()
+        self._connection.close()
+
+    def query(self, sql, parameters=()):
+        '''
+        该方法用于查询结果，返回行列表，如
+        query('SELECT band, AVG(current) FROM result WHERE rat=? GROUP BY band', ('LTE_FDD',))。
+        '''
+        return self._connection.execute(sql, parameters).fetchall()
+
+    def export_txt(self):
+        '''
+        该方法用于按记录顺序将结果导出为各结果txt文件，格式同DataRecorder原有的txt。
+        返回导出的文件名列表。
+        '''
+        self.flush()
+        files = {}
+        try:
+            for file_name, configuration, power, current, interval in self._connection.execute(
+                    'SELECT file_name, configuration, power_text, current_text, interval '
+                    'FROM result ORDER BY id'):
+                if file_name not in files:
+                    files[file_name] = open(self.folder_name + '.\\' + file_name, 'w')
+                content = configuration + '\t' + power + '\t' + current
+                if interval is not None:
+                    content += '\t' + str(interval)
+                files[file_name].write(content.encode('utf-8') + '\n')
+        finally:
+            for f in files.values():
+                f.close()
+        return sorted(files)
@@ -0,0 +1,105 @@
+# -*- coding:utf-8 -*-
+###############################################################################
+# Copyright (C), 2018, TP-LINK Technologies Co., Ltd.
+#
+# 作者：吴扬波
+# 版本：V1.0
+# 变更历史:
+# 1，2026-10-18， 吴扬波——首次创建：SCPI指令解析工具，用于指令头规范化、复合指令拆分
+# 2，2026-10-18， 吴扬波——normalize_node只对长于4个字母的关键字按元音截取，MODE、DATA等保持原样
+# 若引用或修改API，请保留API变更历史。
+###############################################################################
+
+VOWELS = 'AEIOU'
+
+
+def normalize_node(node):
+    '''
+    将SCPI指令头中的单个节点规范化为短格式，使长短格式、大小写不同的写法对应同一个键。
+    node：节点字符串，如'CONFigure'、'CONF'、'voltage'、'output1'；
+    返回规范化后的节点，如'CONF'、'CONF'、'VOLT'、'OUTP1'。
+    '''
+    suffix = ''
+    while node and node[-1].isdigit():
+        suffix = node[-1] + suffix
+        node = node[:-1]
+    if node.upper() != node and node.lower() != node:
+        # 大小写混合的写法，大写字母即为短格式
+        short = ''.join([c for c in node if c.isupper()])
+    else:
+        # 全大写或全小写的写法，按SCPI规则长于4个字母的关键字取前4个字母，第4个字母为元音时取前3个；
+        # 不超过4个字母的关键字本身即为短格式，如MODE、DATA
+        short = node.upper()
+        if len(short) > 4:
+            short = short[:4]
+            if short[3] in VOWELS:
+                short = short[:3]
+    return short + suffix
+
+
+def normalize_header(header):
+    '''
+    将SCPI指令头规范化，如'CONFigure:LTE:SIGN:BAND'规范化为'CONF:LTE:SIGN:BAND'。
+    header：指令头，可以带'?'；
+    返回规范化后的指令头，查询指令保留'?'。
+    '''
+    is_query = header.endswith('?')
+    header = header.rstrip('?').lstrip(':')
+    if header.startswith('*'):
+        result = header.upper()
+    else:
+        result = ':'.join([normalize_node(node) for node in header.split(':')])
+    if is_query:
+        result += '?'
+    return result
+
+
+def split_message(message):
+    '''
+    将以';'连接的复合指令拆分为单条指令，引号内的';'不拆分。
+    message：程序消息字符串；
+    返回单条指令字符串列表。
+    '''
+    units = []
+    current = []
+    quote = None
+    for c in message:
+        if quote:
+            if c == quote:
+                quote = None
+        elif c in '\'"':
+            quote = c
+        elif c == ';':
+            units.append(''.join(current).strip())
+            current = []
+            continue
+        current.append(c)
+    units.append(''.join(current).strip())
+    return [unit for unit in units if unit]
+
+
+def parse_message(message):
+    '''
+    解析程序消息，按SCPI规则补全复合指令中相对路径的指令头。
+    如'voltage:protection:level 4.4;state on'解析为
+    [('VOLT:PROT:LEV', '4.4'), ('VOLT:PROT:STAT', 'on')]。
+    message：程序消息字符串；
+    返回(规范化指令头, 参数字符串)元组列表，查询指令的指令头以'?'结尾。
+    '''
+    commands = []
+    path = []
+    for unit in split_message(message):
+        parts = unit.split(None, 1)
+        header = parts[0]
+        args = parts[1].strip() if len(parts) > 1 else ''
+        if header.startswith('*'):
+            commands.append((normalize_header(header), args))
+            continue
+        normalized = normalize_header(header)
+        nodes = normalized.rstrip('?').split(':')
+        if not header.startswith(':') and path:
+            nodes = path + nodes
+            normalized = ':'.join(nodes) + ('?' if header.endswith('?') else '')
+        path = nodes[:-1]
+        commands.append((normalized, args))
+    return commands
@@ -0,0 +1,274 @@
+# -*- coding:utf-8 -*-
+###############################################################################
+# Copyright (C), 2018, TP-LINK Technologies Co., Ltd.
+#
+# 作者：吴扬波
+# 版本：V1.0
+# 变更历史:
+# 1，2026-10-18， 吴扬波——首次创建：get_resource_manager，离线仿真时返回替换的资源管理器
+# 2，2026-10-18， 吴扬波——进程内共用资源管理器；Session类按仪器地址共享会话，链路断开时自动重连
+# 3，2026-10-18， 吴扬波——增加query_raw，链路断开时重发整个查询而不只重发读取
+# 4，2026-10-18， 吴扬波——增加read_block_message，query_raw读取时关闭终止符并按块头声明的长度读取，
+#                         块数据中含有终止符字节时不截断
+# 5，2026-10-18， 吴扬波——增加is_timeout_error，区分等待超时与链路断开等其他错误
+# 若引用或修改API，请保留API变更历史。
+###############################################################################
+import block
+import global_variable
+import pylogger
+import contextlib
+import os
+import threading
+import time
+
+# 打开仪器、链路断开后重连的等待间隔，单位秒，依次递增，用完后放弃
+RECONNECT_DELAYS = (0.5, 1.0, 2.0, 4.0, 8.0)
+# 表示链路断开、需要重连的visa错误码：VI_ERROR_CONN_LOST、VI_ERROR_IO、VI_ERROR_INV_OBJECT、
+# VI_ERROR_RSRC_NFOUND、VI_ERROR_SYSTEM_ERROR；超时VI_ERROR_TMO不重连，由调用方处理
+LINK_ERROR_CODES = (-1073807194, -1073807298, -1073807346, -1073807343, -1073807360)
+# 超时的visa错误码VI_ERROR_TMO
+TIMEOUT_ERROR_CODE = -1073807339
+
+# 本进程的资源管理器、会话及创建时的进程号，工位子进程由fork创建时重新创建
+_lock = threading.Lock()
+_resource_manager = None
+_sessions = {}
+_pid = None
+
+
+class SessionError(Exception):
+    '''
+    打开仪器或链路断开后重连失败。
+    '''
+    pass
+
+
+def get_resource_manager():
+    '''
+    返回本进程共用的仪器资源管理器。
+    若global_variable.resource_manager已被替换（如离线仿真），则返回替换后的资源管理器，
+    否则返回visa.ResourceManager()，同一进程只创建一次。
+    '''
+    global _resource_manager, _sessions, _pid
+    if global_variable.resource_manager is not None:
+        return global_variable.resource_manager
+    with _lock:
+        if _pid != os.getpid():
+            import visa
+            _resource_manager = visa.ResourceManager()
+            _sessions = {}
+            _pid = os.getpid()
+        return _resource_manager
+
+
+def is_link_error(error):
+    '''
+    返回异常是否表示链路断开：visa错误码属于LINK_ERROR_CODES，或socket等系统I/O错误。
+    '''
+    return getattr(error, 'error_code', None) in LINK_ERROR_CODES or \
+        isinstance(error, EnvironmentError)
+
+
+def is_timeout_error(error):
+    '''
+    返回异常是否表示等待返回值超时：visa错误码为VI_ERROR_TMO。
+    '''
+    return getattr(error, 'error_code', None) == TIMEOUT_ERROR_CODE
+
+
+def read_block_message(resource):
+    '''
+    该方法用于读取含定长块的完整返回值。
+    设置了read_termination的visa资源读到数据中的终止符字节即返回，只得到块的一部分，
+    因此读取期间关闭终止符，由仪器的END结束读取，并按块头声明的长度读到所有块及其后的终止符。
+    resource：visa资源；
+    返回完整的字节流。
+    '''
+    termination = resource.read_termination
+    if termination:
+        resource.read_termination = None
+    try:
+        return block.read_message(resource.read_raw)
+    finally:
+        if termination:
+            resource.read_termination = termination
+
+
+class Session(object):
+    '''
+    Session类，一个仪器地址对应的共享会话，由open_session获取，接口与visa资源相同。
+    每次收发持有会话锁，多个模块、线程共用同一会话时指令不会交错；
+    需要连续多次收发不被打断时使用with session.locked(): ...。
+    链路断开时按RECONNECT_DELAYS重新打开资源，恢复超时、终止符等属性，
+    调用重连回调（如清除影子缓存）后重发当前指令，重连失败时抛出SessionError。
+    '''
+
+    def __init__(self, addr, name='', resource_manager=None):
+        '''
+        addr：仪器地址；
+        name：会话名称，用于日志、异常信息，如'CMW500'；
+        resource_manager：资源管理器，默认为get_resource_manager()。
+        '''
+        self.logger = pylogger.setup_logger(self.__class__.__name__)
+        self.addr = addr
+        self.name = name or addr
+        # 重连次数统计
+        self.reconnects = 0
+        self._lock = threading.RLock()
+        self._attributes = {}
+        self._callbacks = []
+        self._references = 0
+        self._resource = None
+        self.resource_manager = resource_manager or get_resource_manager()
+        self._open()
+
+    def _open(self):
+        '''
+        打开visa资源并恢复已设置的属性，失败时按RECONNECT_DELAYS重试。
+        '''
+        error = None
+        for delay in (0.0,) + RECONNECT_DELAYS:
+            if delay:
+                time.sleep(delay)
+            try:
+                resource = self.resource_manager.open_resource(self.addr)
+                for key, value in self._attributes.items():
+                    setattr(resource, key, value)
+                self._resource = resource
+                return
+            except Exception, e:
+                # 地址错误等非链路问题重试无效
+                if not is_link_error(e):
+                    raise SessionError('%s: open %s failed, %s' % (self.name, self.addr, e))
+                error = e
+        raise SessionError('%s: open %s failed after %d retries, %s'
+                           % (self.name, self.addr, len(RECONNECT_DELAYS), error))
+
+    def _reconnect(self, error):
+        self.logger.warning('%s: link to %s lost, reconnect. %s' % (self.name, self.addr, error))
+        try:
+            self._resource.close()
+        except Exception:
+            pass
+        self._resource = None
+        self._open()
+        self.reconnects += 1
+        self.logger.info('%s: reconnected to %s.' % (self.name, self.addr))
+        for callback in self._callbacks:
+            callback()
+
+    def add_reconnect_callback(self, callback):
+        '''
+        该方法用于注册重连后的回调，无参数，链路断开期间的指令是否生效未知，可用于清除缓存。
+        '''
+        self._callbacks.append(callback)
+
+    @contextlib.contextmanager
+    def locked(self):
+        '''
+        该方法用于独占会话，块内的连续收发不会被其他线程的指令打断。
+        '''
+        with self._lock:
+            yield self
+
+    def _call(self, method, *args):
+        return self._retry(lambda resource: getattr(resource, method)(*args))
+
+    def _retry(self, func):
+        '''
+        持有会话锁以visa资源调用func，链路断开时重连后以新的资源重新调用一次。
+        '''
+        with self._lock:
+            try:
+                return func(self._resource)
+            except Exception, e:
+                if not is_link_error(e):
+                    raise
+                error = e
+            self._reconnect(error)
+            return func(self._resource)
+
+    def write(self, message):
+        return self._call('write', message)
+
+    def query(self, message):
+        return self._call('query', message)
+
+    def read(self):
+        return self._call('read')
+
+    def read_raw(self):
+        return self._call('read_raw')
+
+    def query_raw(self, message):
+        '''
+        该方法用于写入查询指令并读取含定长块的原始字节流，按块头声明的长度读完整个返回值。
+        链路断开时重连后重发整个查询，不会在新链路上只读取而等待从未请求的数据。
+        '''
+        def write_and_read(resource):
+            resource.write(message)
+            return read_block_message(resource)
+        return self._retry(write_and_read)
+
+    def _set_attribute(self, key, value):
+        '''
+        设置visa资源的属性，并记录下来用于重连后恢复。
+        '''
+        with self._lock:
+            self._attributes[key] = value
+            setattr(self._resource, key, value)
+
+    @property
+    def timeout(self):
+        return self._resource.timeout
+
+    @timeout.setter
+    def timeout(self, value):
+        self._set_attribute('timeout', value)
+
+    @property
+    def read_termination(self):
+        return self._resource.read_termination
+
+    @read_termination.setter
+    def read_termination(self, value):
+        self._set_attribute('read_termination', value)
+
+    def close(self):
+        '''
+        该方法用于释放会话的一个引用，最后一个引用释放时关闭visa资源。
+        '''
+        close_session(self)
+
+
+def open_session(addr, name=''):
+    '''
+    该方法用于获取仪器地址对应的共享会话，同一进程内同一地址返回同一会话，引用计数加1。
+    addr：仪器地址；
+    name：会话名称；
+    返回Session，打开失败时抛出SessionError。
+    '''
+    resource_manager = get_resource_manager()
+    with _lock:
+        session = _sessions.get(addr)
+        # 资源管理器被替换（如各仿真用例使用各自的仿真仪器）时重新打开
+        if session is None or session.resource_manager is not resource_manager:
+            session = _sessions[addr] = Session(addr, name, resource_manager)
+        session._references += 1
+        return session
+
+
+def close_session(session):
+    '''
+    该方法用于释放会话的一个引用，引用计数为0时关闭visa资源。
+    '''
+    with _lock:
+        session._references -= 1
+        if session._references > 0:
+            return
+        if _sessions.get(session.addr) is session:
+            del _sessions[session.addr]
+    with session._lock:
+        if session._resource is not None:
+            session._resource.close()
+            session._resource = None
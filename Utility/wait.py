@@ -0,0 +1,104 @@
+# -*- coding:utf-8 -*-
+###############################################################################
+# Copyright (C), 2018, TP-LINK Technologies Co., Ltd.
+#
+# 作者：吴扬波
+# 版本：V1.0
+# 变更历史:
+# 1，2026-10-18， 吴扬波——首次创建：wait_until方法，带超时、自适应轮询间隔、恢复操作的状态等待
+# 若引用或修改API，请保留API变更历史。
+###############################################################################
+import threading
+import time
+
+# 首次轮询间隔、最大轮询间隔，单位秒，及每次未满足条件后间隔的增长倍数
+POLL_INTERVAL = 0.05
+MAX_POLL_INTERVAL = 1.0
+POLL_BACKOFF = 1.5
+
+# 各等待的统计：名称 -> {'count', 'seconds', 'max_seconds', 'recoveries', 'timeouts'}
+_stats = {}
+_stats_lock = threading.Lock()
+
+
+class WaitTimeout(Exception):
+    '''
+    状态等待超时，已执行完全部恢复操作仍未满足条件。
+    '''
+
+    def __init__(self, name, seconds, state):
+        Exception.__init__(self, '%s timed out after %.1fs, last state: %s' % (name, seconds, state))
+        self.name = name
+        self.seconds = seconds
+        self.state = state
+
+
+def wait_until(name, poll, done, timeout, recover=None, retries=0, logger=None,
+               interval=POLL_INTERVAL, max_interval=MAX_POLL_INTERVAL):
+    '''
+    该方法用于轮询仪器状态，直至满足条件或超时。
+    轮询间隔从interval开始，每次未满足条件后乘以POLL_BACKOFF，不超过max_interval，
+    状态很快满足时响应及时，长时间等待（如附着网络）时减少查询次数。
+    超时后执行恢复操作recover（如小区关闭再打开、重新发起连接），并重新计时，最多retries次。
+    name：等待的名称，用于日志和耗时统计，如'LTE attach'；
+    poll：查询状态的函数，返回状态字符串；
+    done：判断状态是否满足条件的函数，参数为poll的返回值；
+    timeout：单次等待的超时，单位秒；
+    recover：超时后的恢复操作，无参数；
+    retries：恢复操作的最多次数；
+    logger：记录超时、恢复的日志引用，一般传入调用方的self.logger；
+    返回满足条件时的状态，超时且恢复无效时抛出WaitTimeout。
+    '''
+    start = time.time()
+    recoveries = 0
+    while True:
+        deadline = time.time() + timeout
+        delay = interval
+        while True:
+            state = poll()
+            if done(state):
+                _record(name, time.time() - start, recoveries, False)
+                return state
+            if time.time() >= deadline:
+                break
+            time.sleep(min(delay, max(deadline - time.time(), 0)))
+            delay = min(delay * POLL_BACKOFF, max_interval)
+        if recover is None or recoveries >= retries:
+            _record(name, time.time() - start, recoveries, True)
+            if logger is not None:
+                logger.error('%s timed out, last state: %s' % (name, state))
+            raise WaitTimeout(name, time.time() - start, state)
+        recoveries += 1
+        if logger is not None:
+            logger.warning('%s timed out, last state: %s, recovery %d of %d'
+                           % (name, state, recoveries, retries))
+        recover()
+
+
+def _record(name, seconds, recoveries, timed_out):
+    with _stats_lock:
+        stats = _stats.setdefault(name, {'count': 0, 'seconds': 0.0, 'max_seconds': 0.0,
+                                         'recoveries': 0, 'timeouts': 0})
+        stats['count'] += 1
+        stats['seconds'] += seconds
+        stats['max_seconds'] = max(stats['max_seconds'], seconds)
+        stats['recoveries'] += recoveries
+        stats['timeouts'] += int(timed_out)
+
+
+def get_stats():
+    '''
+    返回各等待的耗时统计字典的副本，键为等待名称，值包含：
+    count，等待次数；seconds，累计耗时；max_seconds，单次最长耗时；
+    recoveries，恢复操作次数；timeouts，最终超时次数。
+    '''
+    with _stats_lock:
+        return dict((name, dict(stats)) for name, stats in _stats.items())
+
+
+def reset_stats():
+    '''
+    该方法用于清空耗时统计。
+    '''
+    with _stats_lock:
+        _stats.clear()
@@ -0,0 +1,150 @@
+# -*- coding:utf-8 -*-
+###############################################################################
+# Copyright (C), 2018, TP-LINK Technologies Co., Ltd.
+#
+# 作者：吴扬波
+# 版本：V1.0
+# 变更历史:
+# 1，2026-10-18， 吴扬波——首次创建：WaveformArchive类，按配置项存档原始电流波形
+# 若引用或修改API，请保留API变更历史。
+###############################################################################
+import block
+import collections
+import mmap
+import os
+
+# 波形数据的数据类型，单精度浮点，低字节在前，与DC Source返回的二进制块一致
+DTYPE = '<f4'
+ITEM_SIZE = 4
+# 分段读取时每段的采样点数
+CHUNK_SAMPLES = 1048576
+
+# 索引项：配置说明、数据文件中的字节起始位置、采样点数、采样间隔(s)、开始时刻、结束时刻
+IndexEntry = collections.namedtuple(
+    'IndexEntry', ['configuration', 'offset', 'count', 'sample_period', 'start_time', 'end_time'])
+
+
+class WaveformArchive(object):
+    '''
+    WaveformArchive类，将每个测量点的原始电流采样追加到固定数据类型的数据文件，
+    并在索引文件中记录配置说明对应的字节范围、采样间隔、起止时刻。
+    读取时以mmap映射数据文件，只访问所需的字节范围，长时间的待机波形无需整体载入内存。
+    同一配置说明多次存档时，各次均保留，默认读取最近一次。
+    '''
+
+    def __init__(self, folder_name, name='waveform'):
+        '''
+        folder_name：存档所在的文件夹，一般为用例执行文件夹；
+        name：存档名称，数据文件为<name>.f32，索引文件为<name>_index.txt。
+        '''
+        self.data_file_name = os.path.join(folder_name, name + '.f32')
+        self.index_file_name = os.path.join(folder_name, name + '_index.txt')
+        self._entries = collections.OrderedDict()
+        self._map = None
+        self._map_size = 0
+        if os.path.exists(self.index_file_name):
+            with open(self.index_file_name) as f:
+                for line in f:
+                    self._add_entry(self._parse_entry(line))
+
+    @staticmethod
+    def _parse_entry(line):
+        configuration, offset, count, sample_period, start_time, end_time = \
+            line.rstrip('\n').split('\t')
+        return IndexEntry(configuration, int(offset), int(count), float(sample_period),
+                          float(start_time), float(end_time))
+
+    def _add_entry(self, entry):
+        self._entries.setdefault(entry.configuration, []).append(entry)
+
+    def append(self, configuration, data, sample_period, start_time, end_time):
+        '''
+        该方法用于存档一个测量点的波形。
+        configuration：配置说明，同DataRecorder.record_result的configuration；
+        data：采样值数组，单位A，或由多个数组组成的列表，按顺序分段写入；
+        sample_period：采样间隔，单位秒；
+        start_time、end_time：开始、结束采样的时刻；
+        返回索引项。
+        '''
+        chunks = data if isinstance(data, list) else [data]
+        with open(self.data_file_name, 'ab') as f:
+            f.seek(0, os.SEEK_END)
+            offset = f.tell()
+            count = 0
+            for chunk in chunks:
+                f.write(block.tobytes(chunk, DTYPE))
+                count += len(chunk)
+        entry = IndexEntry(configuration, offset, count, sample_period, start_time, end_time)
+        # 数据写入完成后再写索引，中途中断时索引不会指向不完整的数据
+        with open(self.index_file_name, 'a') as f:
+            f.write('%s\t%d\t%d\t%r\t%.6f\t%.6f\n' % entry)
+        self._add_entry(entry)
+        return entry
+
+    def configurations(self):
+        '''
+        返回已存档的配置说明列表，按首次存档的顺序。
+        '''
+        return self._entries.keys()
+
+    def entries(self, configuration):
+        '''
+        返回配置说明的全部索引项。
+        '''
+        return list(self._entries.get(configuration, []))
+
+    def entry(self, configuration, index=-1):
+        '''
+        返回配置说明的索引项，默认最近一次，配置说明未存档时抛出KeyError。
+        '''
+        return self._entries[configuration][index]
+
+    def _mapping(self):
+        '''
+        返回数据文件的只读映射，数据文件增长后重新映射。
+        旧的映射不主动关闭，由引用它的numpy视图释放后回收。
+        '''
+        size = os.path.getsize(self.data_file_name)
+        if self._map is None or size != self._map_size:
+            with open(self.data_file_name, 'rb') as f:
+                self._map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+            self._map_size = size
+        return self._map
+
+    def read(self, configuration, start=0, count=None, index=-1):
+        '''
+        该方法用于读取存档的波形。
+        configuration：配置说明；
+        start、count：读取的起始采样点、采样点数，默认读取到结尾；
+        index：同一配置说明多次存档时的序号，默认最近一次；
+        返回采样值数组，单位A；有numpy时为映射文件的只读视图，不复制数据。
+        '''
+        entry = self.entry(configuration, index)
+        start = min(max(start, 0), entry.count)
+        if count is None or start + count > entry.count:
+            count = entry.count - start
+        if count == 0:
+            return block.frombuffer('', DTYPE)
+        return block.frombuffer(self._mapping(), DTYPE, entry.offset + start * ITEM_SIZE,
+                                count * ITEM_SIZE)
+
+    def iter_chunks(self, configuration, chunk_samples=CHUNK_SAMPLES, index=-1):
+        '''
+        该方法用于分段读取存档的波形，每段最多chunk_samples个采样点。
+        '''
+        count = self.entry(configuration, index).count
+        for start in range(0, count, chunk_samples):
+            yield self.read(configuration, start, chunk_samples, index)
+
+    def mean(self, configuration, index=-1):
+        '''
+        返回存档波形的平均电流，单位mA，分段计算，不整体载入内存。
+        '''
+        total = 0.0
+        count = 0
+        for chunk in self.iter_chunks(configuration, index=index):
+            total += block.mean(chunk) * len(chunk)
+            count += len(chunk)
+        if not count:
+            return None
+        return total / count * 1000
@@ -16,3 +16,12 @@ def get_tasklist():
             task['configuration'].append(configuration.attrib)
         task_list.append(task)
     return task_list
+
+
+def get_stationlist(file_name='Station.xml'):
+    '''
+    用于工位清单xml文件解析，返回各工位的名称、CMW500地址、DC Source地址，及可选的线损文件CableLoss
+    '''
+    station_tree = ET.parse(file_name)
+    root = station_tree.getroot()
+    return [station.attrib for station in root]
@@ -0,0 +1,34 @@
+# -*- coding:utf-8 -*-
+###############################################################################
+# Copyright (C), 2018, TP-LINK Technologies Co., Ltd.
+#
+# 作者：吴扬波
+# 版本：V1.0
+# 变更历史:
+# 1，2026-10-18， 吴扬波——首次创建：按标记分段重新计算后台连续采集的平均电流
+# 若引用或修改API，请保留API变更历史。
+###############################################################################
+from DCSource import current_logger
+import argparse
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Re-analyse a continuous current log.')
+    parser.add_argument('folder', help='case folder containing the current log')
+    parser.add_argument('--start', default='measure', help='marker starting a segment')
+    parser.add_argument('--end', default='done', help='marker ending a segment')
+    parser.add_argument('--offset', type=float, default=0.0,
+                        help='seconds skipped at the start of each segment')
+    parser.add_argument('--duration', type=float, help='seconds averaged, default whole segment')
+    args = parser.parse_args()
+
+    store = current_logger.SampleStore(args.folder)
+    print '%-50s%16s%12s' % ('Configuration', 'Current(mA)', 'Samples')
+    for configuration, average_current, count in store.analyze(args.start, args.end,
+                                                               args.offset, args.duration):
+        current = '%.1f' % average_current if average_current is not None else 'N/A'
+        print '%-50s%16s%12d' % (configuration, current, count)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,84 @@
+# -*- coding:utf-8 -*-
+###############################################################################
+# Copyright (C), 2018, TP-LINK Technologies Co., Ltd.
+#
+# 作者：吴扬波
+# 版本：V1.0
+# 变更历史:
+# 1，2026-10-18， 吴扬波——首次创建：二进制块解析的微基准测试，对比原DCSource._convert
+# 2，2026-10-18， 吴扬波——legacy_convert改为原DCSource._convert的原样实现，采样数据不含'#'、'\n'字节
+# 若引用或修改API，请保留API变更历史。
+###############################################################################
+from Utility import block
+import argparse
+import random
+import struct
+import timeit
+
+# 测试的采样点数：66319B单次采样4096点，以及1M点的长序列
+SIZES = [4096, 1048576]
+
+
+def legacy_convert(raw_data):
+    '''
+    原DCSource._convert的实现，除去self参数外与原代码相同：按'#'分割字节流，
+    去除'\\n'后struct.unpack转为浮点列表。数据中含有'#'、首尾含有'\\n'字节时解析错误。
+    '''
+    raw_data_list = raw_data.split('#')
+    current_data = []
+    for index, data in enumerate(raw_data_list):
+        if cmp(index, 0):
+            data = data.strip('\n')
+            digit_num = int(str(data[0]))
+            bytes_num = int(''.join(data[1:1 + digit_num]))
+            data_num = bytes_num / 4
+            raw_current_data = data[1 + digit_num:]
+            current_data.extend(list(struct.unpack('%df' % data_num, raw_current_data)))
+    return current_data
+
+
+def make_payload(count, seed=0):
+    '''
+    生成count个单精度浮点采样值的定长块，低字节在前，以'\\n'结尾。
+    legacy_convert无法解析含有'#'、'\\n'字节的数据，生成的采样值均不含这两种字节。
+    '''
+    rand = random.Random(seed)
+    samples = []
+    while len(samples) < count:
+        sample = struct.pack('<f', rand.uniform(0.0, 0.5))
+        if '#' not in sample and '\n' not in sample:
+            samples.append(sample)
+    data = ''.join(samples)
+    length = str(len(data))
+    return '#%d%s%s\n' % (len(length), length, data)
+
+
+def best_time(func, payload, repeat, number):
+    '''
+    返回单次调用的最短耗时，单位秒。
+    '''
+    timer = timeit.Timer(lambda: func(payload))
+    return min(timer.repeat(repeat, number)) / number
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark IEEE 488.2 block parsing.')
+    parser.add_argument('--repeat', type=int, default=5, help='timing repeats, best is reported')
+    args = parser.parse_args()
+
+    print 'Block backend: %s' % ('numpy %s' % block.numpy.__version__
+                                 if block.numpy is not None else 'array (numpy not installed)')
+    print '%-10s%12s%14s%14s%10s' % ('Samples', 'Bytes', 'legacy(ms)', 'block(ms)', 'Speedup')
+    for count in SIZES:
+        payload = make_payload(count)
+        if list(block.read_block_array(payload)) != legacy_convert(payload):
+            raise AssertionError('parse result mismatch for %d samples' % count)
+        number = max(1, 1000000 / count)
+        legacy = best_time(legacy_convert, payload, args.repeat, number)
+        shared = best_time(block.read_block_array, payload, args.repeat, number)
+        print '%-10d%12d%14.3f%14.3f%9.1fx' % (count, len(payload), legacy * 1000,
+                                               shared * 1000, legacy / shared)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,172 @@
+# -*- coding:utf-8 -*-
+###############################################################################
+# Copyright (C), 2018, TP-LINK Technologies Co., Ltd.
+#
+# 作者：吴扬波
+# 版本：V1.0
+# 变更历史:
+# 1，2026-10-18， 吴扬波——首次创建：基于仿真仪器的用例耗时基准测试
+# 2，2026-10-18， 吴扬波——报告中增加影子缓存命中统计
+# 3，2026-10-18， 吴扬波——增加--sequential选项，对比并行测量与顺序测量的耗时
+# 4，2026-10-18， 吴扬波——增加--log-current选项，后台连续采集电流
+# 5，2026-10-18， 吴扬波——状态等待改由wait模块计时，报告中增加各等待的耗时统计
+# 6，2026-10-18， 吴扬波——报告中附加用例的指令耗时报告
+# 若引用或修改API，请保留API变更历史。
+###############################################################################
+from CMW500 import gsm
+from DCSource import dcsource, current_logger
+from Simulator import clock as sim_clock, resource_manager
+from Utility import global_variable, instrument, wait, profiler
+import argparse
+import collections
+import importlib
+import logging
+import time
+
+# 参与基准测试的用例脚本
+CASES = ['testcase_conduct_connect', 'testcase_conduct_standby']
+# 用例中的任务方法
+TASKS = ['run_gsm_task', 'run_wcdma_task', 'run_lte_task']
+# 使用time模块计时、休眠的驱动模块，仿真时替换为仿真时钟
+TIMED_MODULES = [gsm, wait, profiler, dcsource, current_logger, instrument]
+
+
+def _total_round_trips(rm):
+    counters = rm.get_counters()
+    return dict((addr, counter['round_trip']) for addr, counter in counters.items())
+
+
+def _wrap_task(testcase, task_name, clock, rm, stats):
+    '''
+    包装用例的任务方法，记录任务耗时、配置项数量、指令收发次数。
+    '''
+    task_func = getattr(testcase, task_name)
+
+    def timed_task(configuration):
+        start = clock.time()
+        round_trips = _total_round_trips(rm)
+        try:
+            return task_func(configuration)
+        finally:
+            end_round_trips = _total_round_trips(rm)
+            stats[task_name] = {
+                'seconds': clock.time() - start,
+                'points': len(configuration),
+                'round_trips': dict((addr, count - round_trips.get(addr, 0))
+                                    for addr, count in end_round_trips.items()),
+            }
+
+    setattr(testcase, task_name, timed_task)
+
+
+def run_case(case_name, speedup, seed, sequential=False, log_current=False):
+    '''
+    在仿真仪器上执行用例的TestCase.run()。
+    case_name：用例脚本模块名；
+    speedup：仿真时钟加速倍率；
+    seed：终端电流噪声的随机数种子；
+    sequential：是否关闭用例的并行测量模式，在上行功率测量结束后再测量电流；
+    log_current：是否在用例执行过程中后台连续采集电流；
+    返回统计结果字典。
+    '''
+    clock = sim_clock.SimClock(speedup)
+    rm = resource_manager.SimulatedResourceManager(clock, seed)
+    global_variable.resource_manager = rm
+    patched = clock.patch(TIMED_MODULES)
+    wait.reset_stats()
+    try:
+        case_module = importlib.import_module(case_name)
+        real_start = time.time()
+        start = clock.time()
+        testcase = case_module.TestCase()
+        if hasattr(testcase, 'concurrent_measurement'):
+            testcase.concurrent_measurement = not sequential
+        if hasattr(testcase, 'log_current'):
+            testcase.log_current = log_current
+        init_seconds = clock.time() - start
+        stats = collections.OrderedDict()
+        for task_name in TASKS:
+            _wrap_task(testcase, task_name, clock, rm, stats)
+        testcase.run()
+        return {
+            'case': case_name,
+            'total_seconds': clock.time() - start,
+            'init_seconds': init_seconds,
+            'real_seconds': time.time() - real_start,
+            'tasks': stats,
+            'round_trips': _total_round_trips(rm),
+            'counters': rm.get_counters(),
+            'cache_stats': {'CMW500': testcase.cmw500._inst.cache_stats,
+                            'DCSource': testcase.dc_source._inst.cache_stats},
+            'wait_stats': wait.get_stats(),
+            'profile': testcase.profiler.format_report(),
+        }
+    finally:
+        sim_clock.SimClock.restore(patched)
+        global_variable.resource_manager = None
+
+
+def format_report(result):
+    '''
+    将统计结果格式化为文本报告。
+    '''
+    lines = ['=' * 78,
+             'Case: %s' % result['case'],
+             'Total time: %.1fs (init %.1fs), real time %.1fs'
+             % (result['total_seconds'], result['init_seconds'], result['real_seconds'])]
+    for addr, count in sorted(result['round_trips'].items()):
+        counter = result['counters'][addr]
+        lines.append('SCPI round trips @%s: %d (write %d, query %d, read %d, read_raw %d)'
+                     % (addr, count, counter['write'], counter['query'],
+                        counter['read'], counter['read_raw']))
+    for name, stats in sorted(result['cache_stats'].items()):
+        lines.append('Shadow cache @%s: %d hits, %d misses' % (name, stats['hits'], stats['misses']))
+    for name, stats in sorted(result['wait_stats'].items()):
+        lines.append('Wait %s: %d times, %.1fs total, %.1fs max, %d recoveries, %d timeouts'
+                     % (name, stats['count'], stats['seconds'], stats['max_seconds'],
+                        stats['recoveries'], stats['timeouts']))
+    lines.append('%-16s%8s%12s%14s%14s' % ('Task', 'Points', 'Time(s)', 'Per point(s)',
+                                             'Round trips'))
+    for task_name, stats in result['tasks'].items():
+        points = stats['points']
+        per_point = stats['seconds'] / points if points else 0.0
+        lines.append('%-16s%8d%12.1f%14.1f%14d'
+                     % (task_name, points, stats['seconds'], per_point,
+                        sum(stats['round_trips'].values())))
+    lines.append('')
+    lines.append(result['profile'])
+    return '\n'.join(lines)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark test cases on simulated instruments.')
+    parser.add_argument('--case', choices=CASES, action='append',
+                        help='test case to run, default all')
+    parser.add_argument('--speedup', type=float, default=100.0,
+                        help='simulated clock speedup factor')
+    parser.add_argument('--seed', type=int, default=0, help='DUT current noise seed')
+    parser.add_argument('--output', help='append the report to this file')
+    parser.add_argument('--sequential', action='store_true',
+                        help='measure current after the tx power instead of concurrently')
+    parser.add_argument('--log-current', action='store_true',
+                        help='log the current continuously in the background')
+    parser.add_argument('--verbose', action='store_true', help='keep test case logging')
+    args = parser.parse_args()
+
+    if not args.verbose:
+        logging.disable(logging.WARNING)
+
+    reports = []
+    for case_name in args.case or CASES:
+        report = format_report(run_case(case_name, args.speedup, args.seed, args.sequential,
+                                        args.log_current))
+        print report
+        reports.append(report)
+
+    if args.output:
+        with open(args.output, 'a') as f:
+            f.write('\n'.join(reports) + '\n')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,136 @@
+# -*- coding:utf-8 -*-
+###############################################################################
+# Copyright (C), 2018, TP-LINK Technologies Co., Ltd.
+#
+# 作者：吴扬波
+# 版本：V1.0
+# 变更历史:
+# 1，2026-10-18， 吴扬波——首次创建：excel汇总的基准测试，对比原save_to_xlsx
+# 若引用或修改API，请保留API变更历史。
+###############################################################################
+from Utility import record
+import argparse
+import multiprocessing
+import os
+import random
+import shutil
+import tempfile
+import time
+import xlsxwriter
+
+try:
+    import resource
+except ImportError:
+    # Windows下没有resource模块，不统计内存峰值
+    resource = None
+
+# 结果文件及各自的行数比例
+RESULT_FILES = [('LTE.txt', 0.4), ('WCDMA.txt', 0.3), ('GSM.txt', 0.2), ('LTE_standby.txt', 0.1)]
+
+
+def legacy_save_to_xlsx(folder_name):
+    '''
+    原DataRecorder.save_to_xlsx的实现：readlines读取整个文件，逐个单元格尝试float，整个工作簿保存在内存中。
+    '''
+    file_list = os.listdir(folder_name)
+    work_book = xlsxwriter.Workbook(folder_name + '\\result.xlsx', )
+    bold = work_book.add_format({'bold': 1})
+
+    for file_name in file_list:
+        if not file_name.startswith('log') and os.path.isfile(folder_name + '.\\' + file_name):
+            sheet = work_book.add_worksheet(file_name.split('.')[0])
+            row = 0
+            col = 0
+            for item in ['Configuration', 'Actual Power(dbm)', 'Current(mA)', 'Current CI(mA)']:
+                sheet.write(row, col, item, bold)
+                col += 1
+
+            row = 1
+            text_file = open(folder_name + '.\\' + file_name)
+            for line in text_file.readlines():
+                col = 0
+                for item in line.strip().split('\t'):
+                    try:
+                        temp = float(item)
+                        item = temp
+                    except Exception, e:
+                        str(e)
+                    sheet.write(row, col, item)
+                    col += 1
+                row += 1
+            text_file.close()
+    work_book.close()
+
+
+def make_results(folder_name, rows, seed=0):
+    '''
+    在folder_name下生成共rows行的结果txt文件，约1%的电流为'Current unstable'。
+    '''
+    rand = random.Random(seed)
+    for file_name, ratio in RESULT_FILES:
+        with open(folder_name + '.\\' + file_name, 'w') as f:
+            for index in range(int(rows * ratio)):
+                current = ('Current unstable' if rand.random() < 0.01
+                           else '%.1f' % rand.uniform(1.0, 400.0))
+                f.write('@Band:%d, DLCH:%d, Power:%d dbm\t%.2f\t%s\t%.3f\n'
+                        % (index % 40, index, index % 26, rand.uniform(-50.0, 24.0), current,
+                           rand.uniform(0.0, 0.5)))
+
+
+def _run(func, folder_name, result_queue):
+    start = time.time()
+    func(folder_name)
+    seconds = time.time() - start
+    peak = None
+    if resource is not None:
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024.0
+    result_queue.put((seconds, peak))
+
+
+def measure(func, folder_name):
+    '''
+    在独立进程中执行func(folder_name)，返回(耗时秒, 内存峰值MB)，使各方法的内存峰值互不影响。
+    '''
+    result_queue = multiprocessing.Queue()
+    worker = multiprocessing.Process(target=_run, args=(func, folder_name, result_queue))
+    worker.start()
+    result = result_queue.get()
+    worker.join()
+    return result
+
+
+def save_sequential(folder_name):
+    record.DataRecorder.save_to_xlsx(folder_name, processes=1)
+
+
+def save_parallel(folder_name):
+    record.DataRecorder.save_to_xlsx(folder_name, processes=multiprocessing.cpu_count())
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark the xlsx result export.')
+    parser.add_argument('--rows', type=int, default=1000000, help='total result rows')
+    parser.add_argument('--skip-legacy', action='store_true',
+                        help='skip the in-memory legacy export')
+    args = parser.parse_args()
+
+    root = tempfile.mkdtemp()
+    try:
+        folder_name = os.path.join(root, 'results')
+        os.makedirs(folder_name)
+        make_results(folder_name, args.rows)
+        print 'Rows: %d in %d sheets, CPUs: %d' % (args.rows, len(RESULT_FILES),
+                                                  multiprocessing.cpu_count())
+        print '%-22s%12s%14s' % ('Export', 'Time(s)', 'Peak RSS(MB)')
+        methods = [('constant_memory', save_sequential), ('constant_memory+pool', save_parallel)]
+        if not args.skip_legacy:
+            methods.insert(0, ('legacy', legacy_save_to_xlsx))
+        for name, func in methods:
+            seconds, peak = measure(func, folder_name)
+            print '%-22s%12.1f%14s' % (name, seconds, '%.0f' % peak if peak is not None else 'N/A')
+    finally:
+        shutil.rmtree(root, ignore_errors=True)
+
+
+if __name__ == '__main__':
+    main()
@@ -6,55 +6,108 @@
 # 版本：V1.0
 # 变更历史:
 # 1，2018-08-20， 吴扬波——首次创建：TestCase类，用于执行传导业务电流测试用例
+# 2，2026-10-18， 吴扬波——支持指定工位、任务列表，增加--stations多工位并行执行
+# 3，2026-10-18， 吴扬波——增加并行测量模式，电流稳定性判断、测量与上行功率测量同时进行
+# 4，2026-10-18， 吴扬波——电流测量改用ARRAY采集模式
+# 5，2026-10-18， 吴扬波——电流测量改用settle_and_measure，复用稳定观测窗内的采样
+# 6，2026-10-18， 吴扬波——电流测量按置信区间自适应结束，并记录置信区间
+# 7，2026-10-18， 吴扬波——增加--log-current后台连续采集电流，各测量阶段写入标记
+# 8，2026-10-18， 吴扬波——各测量点的原始电流波形存档至WaveformArchive
+# 9，2026-10-18， 吴扬波——测量结果附带配置项字典，存入结果数据库的类型化列
+# 10，2026-10-18， 吴扬波——记录测量进度，增加--resume以原用例执行文件夹续测，跳过已完成的测量点
+# 11，2026-10-18， 吴扬波——信令等待超时时跳过该配置项的测量点并记录超时，记录各等待的耗时统计
+# 12，2026-10-18， 吴扬波——记录各指令耗时，按测试阶段汇总，执行结束后生成profile_report.txt
+# 13，2026-10-18， 吴扬波——增加--log-level，按类名设置日志级别
+# 14，2026-10-18， 吴扬波——工位设置CableLoss属性时由线损文件配置多点线损表
+# 15，2026-10-18， 吴扬波——增加--warm-start，CMW500设置项快照一致时跳过*RST，结束时保存快照
+# 16，2026-10-18， 吴扬波——操作完成等待节省的时长改由instrument.get_opc_saved_seconds统计
+# 17，2026-10-18， 吴扬波——只在正常执行结束时保存CMW500快照，异常中断后下次冷启动
 # 若引用或修改API，请保留API变更历史。
 ###############################################################################
 from CMW500 import cmw500 as cmw
 from DCSource import dcsource as dcsrc
-from Utility import xml_parser, record, pylogger, global_variable
+from Utility import xml_parser, record, pylogger, global_variable, planner, executor, parallel
+from Utility import waveform_archive, journal, wait, profiler, instrument
 from datetime import datetime
+import argparse
 import sys
 import os
 
+# 单个配置项的测量耗时估计，单位秒，LTE、WCDMA每个配置项测量3个功率点
+CONFIGURATION_SECONDS = {'LTE_FDD': 120.0, 'WCDMA': 120.0, 'GSM': 40.0}
+# 平均电流置信区间（95%）的目标半宽，单位mA，达到后提前结束电流测量
+CURRENT_TOLERANCE = 0.5
+# 未指定工位时使用的仪器地址
+DEFAULT_STATION = {'Name': 'default', 'Tester': '192.168.2.10', 'DCSource': 'GPIB0::15::INSTR'}
+
 
 class TestCase(object):
     '''
     TestCase类，用于执行传导业务电流测试用例
     '''
 
-    def __init__(self):
-
+    def __init__(self, station=None, case_folder_name=None, concurrent_measurement=True,
+                 log_current=False, warm_start=False):
+        '''
+        station：工位信息，xml_parser.get_stationlist返回的工位，默认使用本工位的仪器地址；
+        case_folder_name：用例执行文件夹，默认按当前时间创建，传入中断的用例执行文件夹时续测；
+        concurrent_measurement：是否在测量上行功率的同时判断电流稳定性、测量电流；
+        log_current：是否在整个测试过程中后台连续采集电流，采样保存到用例执行文件夹；
+        warm_start：是否热启动CMW500，见CMW500.__init__。
+        '''
+        self.concurrent_measurement = concurrent_measurement
+        self.log_current = log_current
+        self.warm_start = warm_start
         # 创建用例执行文件夹
-        case_dir = sys.path[0]
-        case_folder_name = case_dir + '.\\' + datetime.now().strftime("%Y%m%d_%H%M%S")
+        if case_folder_name is None:
+            case_dir = sys.path[0]
+            case_folder_name = case_dir + '.\\' + datetime.now().strftime("%Y%m%d_%H%M%S")
         global_variable.file_folder = case_folder_name
         try:
             os.makedirs(case_folder_name)
         except Exception as e:
             print 'folder:%s existed!' % e
+        self.case_folder_name = case_folder_name
 
         self.logger = pylogger.setup_logger(self.__class__.__name__)
         # 创建数据记录器
         self.data_recorder = record.DataRecorder()
+        # 创建原始电流波形存档
+        self.waveform_archive = waveform_archive.WaveformArchive(case_folder_name)
+        # 测量进度日志，文件夹中已有进度时跳过已完成的测量点
+        self.journal = journal.ProgressJournal(case_folder_name)
+        if len(self.journal):
+            self.logger.info('Resume with %d completed points.' % len(self.journal))
         # 获得仪器控制引用
-        self.cmw500, self.dc_source = self.init_instr()
+        self.cmw500, self.dc_source = self.init_instr(station or DEFAULT_STATION)
+        # 记录初始化之后两台仪器的指令耗时，按测试阶段汇总
+        self.profiler = profiler.Profiler()
+        self.cmw500._inst.profiler = self.profiler
+        self.dc_source._inst.profiler = self.profiler
 
-    def init_instr(self):
+    def init_instr(self, station):
         '''
         根据仪器地址获取仪器控制引用，并进行初步设置
+        station：工位信息，包含CMW500地址Tester、DC Source地址DCSource，可选线损文件CableLoss
         '''
-        # 连接CMW500
-        cmw500 = cmw.CMW500('192.168.2.10')
+        # 连接CMW500，热启动时沿用上次的设置
+        cmw500 = cmw.CMW500(station['Tester'], self.warm_start)
         # 在仪器界面上显示指令流
         cmw500.start_trace()
         # 设置信号路由
         cmw500.set_signal_routing('1', '1')
-        # 配置线损表
-        cmw500.set_correction_table('800', '0.4', '1800', '0.6')
+        # 配置线损表，工位指定线损文件时使用各频点的实测线损
+        if station.get('CableLoss'):
+            cmw500.load_correction_table(station['CableLoss'])
+        else:
+            cmw500.set_correction_table('800', '0.4', '1800', '0.6')
 
         # 连接DC Source
-        dc_source = dcsrc.DCSource('GPIB0::15::INSTR')
+        dc_source = dcsrc.DCSource(station['DCSource'])
         # 配置电源电压
         dc_source.set_voltage(4)
+        # 以二进制块读取采样序列
+        dc_source.set_acquisition_mode('ARRAY')
         # 使能输出
         dc_source.enable_output()
 
@@ -71,35 +124,51 @@ class TestCase(object):
         is_first_loop = True
         # 遍历配置列表中的配置项
         for item in configuration:
-            # 配置频段、信道、带宽
-            self.cmw500.lte.set_downlink_channel(item['Band'], item['DlChannel'], item['Bandwidth'])
-            # 配置RB数量、位置
-            self.cmw500.lte.config_rmc(item['RbNumber'], item['RbPosition'])
-            # 首次运行时设置下行信号强度、UE开环功率
-            if is_first_loop:
-                self.cmw500.lte.set_rsep_level('-85')
-                self.cmw500.lte.set_openloop_power('20')
-                # 使能输出
-                self.cmw500.lte.enable_output()
-                # 等待UE附着网络
-                self.cmw500.lte.attach()
-                is_first_loop = False
-
-            # 建立RRC连接
-            self.cmw500.lte.connect_rrc()
-
-            # 遍历需要测试的上行功率，并测量电流
-            power_list = ['0', '10', '25']
-            for target_power in power_list:
-                self.cmw500.lte.set_closeloop_power(target_power)
-                actual_power = self.cmw500.lte.measure_average_tx_power()
-                if self.dc_source.check_current_stability(60):
-                    current = self.dc_source.measure_current(30)
-                else:
-                    current = 'Current unstable'
-                config_info = '@Band:%s, DLCH:%s, BW:%sMHz, Power:%s dbm' % (
-                    item['Band'], item['DlChannel'], item['Bandwidth'], target_power)
-                self.data_recorder.record_result('LTE.txt', config_info, actual_power, current)
+            # 需要测试的上行功率，续测时跳过已完成的功率点，全部完成的配置项不再配置
+            points = self._pending_points('LTE.txt', [
+                (target_power, '@Band:%s, DLCH:%s, BW:%sMHz, Power:%s dbm' % (
+                    item['Band'], item['DlChannel'], item['Bandwidth'], target_power))
+                for target_power in ['0', '10', '25']])
+            if not points:
+                continue
+            try:
+                with self.profiler.phase('channel set'):
+                    # 配置频段、信道、带宽
+                    self.cmw500.lte.set_downlink_channel(item['Band'], item['DlChannel'],
+                                                         item['Bandwidth'])
+                    # 配置RB数量、位置
+                    self.cmw500.lte.config_rmc(item['RbNumber'], item['RbPosition'])
+                with self.profiler.phase('attach'):
+                    # 首次运行时设置下行信号强度、UE开环功率
+                    if is_first_loop:
+                        self.cmw500.lte.set_rsep_level('-85')
+                        self.cmw500.lte.set_openloop_power('20')
+                        # 使能输出
+                        self.cmw500.lte.enable_output()
+                        # 等待UE附着网络
+                        self.cmw500.lte.attach()
+                        is_first_loop = False
+
+                    # 建立RRC连接
+                    self.cmw500.lte.connect_rrc()
+
+                # 遍历需要测试的上行功率，并测量电流
+                for target_power, config_info in points:
+                    self.dc_source.mark('configure', config_info)
+                    with self.profiler.phase('power set'):
+                        self.cmw500.lte.set_closeloop_power(target_power)
+                    actual_power, current = self._measure_point(
+                        self.cmw500.lte.measure_average_tx_power, config_info)
+                    self.data_recorder.record_result('LTE.txt', config_info, actual_power, current,
+                                                     self.dc_source.confidence_interval,
+                                                     dict(item, Format='LTE_FDD',
+                                                          TargetPower=target_power))
+                    self._archive_waveform(config_info, current)
+                    self._complete_point('LTE.txt', config_info)
+            except wait.WaitTimeout, e:
+                # 信令等待超时且恢复无效，跳过该配置项剩余的测量点，下一配置项重新建立连接
+                self._skip_points('LTE.txt', points, dict(item, Format='LTE_FDD'), e)
+                is_first_loop = True
 
         # 测试结束后关闭输出
         self.cmw500.lte.disable_output()
@@ -115,33 +184,48 @@ class TestCase(object):
         is_first_loop = True
         # 遍历配置列表中的配置项
         for item in configuration:
-            # 配置频段、信道、带宽
-            self.cmw500.wcdma.set_downlink_channel(item['Band'], item['DlChannel'])
-            # 首次运行
-            if is_first_loop:
-                self.cmw500.wcdma.set_downlink_power('-80')
-                self.cmw500.wcdma.set_voice_connection()
-                # 使能输出
-                self.cmw500.wcdma.enable_output()
-                # 等待UE注册网络
-                self.cmw500.wcdma.register()
-                is_first_loop = False
-
-            # 建立CS域通话连接
-            self.cmw500.wcdma.setup_cs_connection()
-
-            # 遍历需要测试的上行功率，并测量电流
-            power_list = ['0', '10', '25']
-            for target_power in power_list:
-                self.cmw500.wcdma.set_closeloop_power(target_power)
-                actual_power = self.cmw500.wcdma.measure_average_tx_power()
-                if self.dc_source.check_current_stability(60):
-                    current = self.dc_source.measure_current(30)
-                else:
-                    current = 'Current unstable'
-                config_info = '@Band:%s, DLCH:%s, Power:%s dbm' % (
-                    item['Band'], item['DlChannel'], target_power)
-                self.data_recorder.record_result('WCDMA.txt', config_info, actual_power, current)
+            # 需要测试的上行功率，续测时跳过已完成的功率点，全部完成的配置项不再配置
+            points = self._pending_points('WCDMA.txt', [
+                (target_power, '@Band:%s, DLCH:%s, Power:%s dbm' % (
+                    item['Band'], item['DlChannel'], target_power))
+                for target_power in ['0', '10', '25']])
+            if not points:
+                continue
+            try:
+                # 配置频段、信道、带宽
+                with self.profiler.phase('channel set'):
+                    self.cmw500.wcdma.set_downlink_channel(item['Band'], item['DlChannel'])
+                with self.profiler.phase('attach'):
+                    # 首次运行
+                    if is_first_loop:
+                        self.cmw500.wcdma.set_downlink_power('-80')
+                        self.cmw500.wcdma.set_voice_connection()
+                        # 使能输出
+                        self.cmw500.wcdma.enable_output()
+                        # 等待UE注册网络
+                        self.cmw500.wcdma.register()
+                        is_first_loop = False
+
+                    # 建立CS域通话连接
+                    self.cmw500.wcdma.setup_cs_connection()
+
+                # 遍历需要测试的上行功率，并测量电流
+                for target_power, config_info in points:
+                    self.dc_source.mark('configure', config_info)
+                    with self.profiler.phase('power set'):
+                        self.cmw500.wcdma.set_closeloop_power(target_power)
+                    actual_power, current = self._measure_point(
+                        self.cmw500.wcdma.measure_average_tx_power, config_info)
+                    self.data_recorder.record_result('WCDMA.txt', config_info, actual_power,
+                                                     current, self.dc_source.confidence_interval,
+                                                     dict(item, Format='WCDMA',
+                                                          TargetPower=target_power))
+                    self._archive_waveform(config_info, current)
+                    self._complete_point('WCDMA.txt', config_info)
+            except wait.WaitTimeout, e:
+                # 信令等待超时且恢复无效，跳过该配置项剩余的测量点，下一配置项重新建立连接
+                self._skip_points('WCDMA.txt', points, dict(item, Format='WCDMA'), e)
+                is_first_loop = True
 
         # 测试结束后关闭输出
         self.cmw500.wcdma.disable_output()
@@ -157,46 +241,160 @@ class TestCase(object):
         is_first_loop = True
         # 遍历配置列表中的配置项
         for item in configuration:
-            # 首次运行配置BCCH的频段、下行功率，并使能输出建立与UE的通话连接
-            if is_first_loop:
-                self.cmw500.gsm.set_bcch_downlink_channel('GSM850', '128')
-                self.cmw500.gsm.set_tch_downlink_channel('128')
-                self.cmw500.gsm.set_bcch_level('-80')
-                self.cmw500.gsm.set_tch_level('-80')
-                self.cmw500.gsm.enable_output()
-                self.cmw500.gsm.synchronize()
-                is_first_loop = False
-
-            # 建立CS域连接，若已连接，则不再建立
-            self.cmw500.gsm.setup_cs_connection()
-            # 切换到不同的信道或频段，若和原来相同，则不切
-            self.cmw500.gsm.handover(item['Band'], item['DlChannel'])
-
-            # 控制UE以最大闭环功率输出，并测量电流
+            # 控制UE以最大闭环功率输出
             if item['Band'] in ['DCS1800', 'PCS1900']:
                 target_power = '0'
             else:
                 target_power = '5'
-            self.cmw500.gsm.set_tch_pcl(target_power)
-            actual_power = self.cmw500.gsm.measure_average_tx_power()
-            if self.dc_source.check_current_stability(60):
-                current = self.dc_source.measure_current(30)
-            else:
-                current = 'Current unstable'
             config_info = '@Band:%s, DLCH:%s, Power:%s dbm' % (
                 item['Band'], item['DlChannel'], target_power)
-            self.data_recorder.record_result('GSM.txt', config_info, actual_power, current)
+            # 续测时跳过已完成的配置项
+            if self.journal.is_done('GSM.txt', config_info):
+                continue
+            try:
+                # 首次运行配置BCCH的频段、下行功率，并使能输出建立与UE的通话连接
+                with self.profiler.phase('attach'):
+                    if is_first_loop:
+                        self.cmw500.gsm.set_bcch_downlink_channel('GSM850', '128')
+                        self.cmw500.gsm.set_tch_downlink_channel('128')
+                        self.cmw500.gsm.set_bcch_level('-80')
+                        self.cmw500.gsm.set_tch_level('-80')
+                        self.cmw500.gsm.enable_output()
+                        self.cmw500.gsm.synchronize()
+                        is_first_loop = False
+
+                    # 建立CS域连接，若已连接，则不再建立
+                    self.cmw500.gsm.setup_cs_connection()
+                # 切换到不同的信道或频段，若和原来相同，则不切
+                with self.profiler.phase('channel set'):
+                    self.cmw500.gsm.handover(item['Band'], item['DlChannel'])
+
+                # 设置功率等级，并测量电流
+                self.dc_source.mark('configure', config_info)
+                with self.profiler.phase('power set'):
+                    self.cmw500.gsm.set_tch_pcl(target_power)
+                actual_power, current = self._measure_point(
+                    self.cmw500.gsm.measure_average_tx_power, config_info)
+                self.data_recorder.record_result('GSM.txt', config_info, actual_power, current,
+                                                 self.dc_source.confidence_interval,
+                                                 dict(item, Format='GSM', TargetPower=target_power))
+                self._archive_waveform(config_info, current)
+                self._complete_point('GSM.txt', config_info)
+            except wait.WaitTimeout, e:
+                # 信令等待超时且恢复无效，跳过该配置项，下一配置项重新建立连接
+                self._skip_points('GSM.txt', [(target_power, config_info)],
+                                  dict(item, Format='GSM'), e)
+                is_first_loop = True
 
         # 测试结束后关闭输出
         self.cmw500.gsm.disable_output()
 
-    def run(self):
+    def _measure_stable_current(self):
+        '''
+        该方法用于等待电流稳定后测量平均电流，置信区间达到CURRENT_TOLERANCE或测量满30s时结束。
+        返回平均电流，电流不稳定时返回'Current unstable'。
+        '''
+        current, _ = self.dc_source.settle_and_measure(30, 60, tolerance=CURRENT_TOLERANCE)
+        if current is None:
+            return 'Current unstable'
+        return current
+
+    def _measure_point(self, measure_tx_power, config_info=''):
+        '''
+        该方法用于在功率设置生效后测量上行功率和电流。
+        并行模式下，电流稳定性判断及电流测量在后台线程中与上行功率测量同时进行，
+        CMW500与DC Source位于不同总线，互不影响。
+        measure_tx_power：当前制式的上行功率测量方法；
+        config_info：配置说明，用于后台连续采集的标记；
+        返回(上行功率, 平均电流)。
+        '''
+        self.dc_source.mark('measure', config_info)
+        if not self.concurrent_measurement:
+            with self.profiler.phase('tx power measurement'):
+                actual_power = measure_tx_power()
+            current = self._measure_stable_current()
+            self.dc_source.mark('done', config_info)
+            return actual_power, current
+
+        current_call = parallel.BackgroundCall(self._measure_stable_current)
+        current_call.start()
+        try:
+            with self.profiler.phase('tx power measurement'):
+                actual_power = measure_tx_power()
+        except Exception:
+            # 等待电流测量结束，避免后续操作与后台线程同时访问DC Source
+            current_call.join()
+            raise
+        current = current_call.get()
+        self.dc_source.mark('done', config_info)
+        return actual_power, current
+
+    def _pending_points(self, result_file_name, points):
+        '''
+        返回尚未完成的测量点。
+        result_file_name：结果文件名；
+        points：(目标功率, 配置说明)列表。
+        '''
+        return [(target_power, config_info) for target_power, config_info in points
+                if not self.journal.is_done(result_file_name, config_info)]
+
+    def _complete_point(self, result_file_name, config_info):
+        '''
+        该方法用于提交测量结果后，在进度日志中记录测量点已完成。
+        '''
+        self.data_recorder.flush()
+        self.journal.mark_done(result_file_name, config_info)
+
+    def _skip_points(self, result_file_name, points, fields, error):
+        '''
+        该方法用于信令等待超时后，将尚未完成的测量点的功率、电流记录为'Timeout'，并记录为已完成，
+        续测时不再重复等待。
+        result_file_name：结果文件名；
+        points：(目标功率, 配置说明)列表；
+        fields：配置项字典；
+        error：wait.WaitTimeout异常。
+        '''
+        self.logger.error('%s, skip %s' % (error, result_file_name))
+        for target_power, config_info in self._pending_points(result_file_name, points):
+            self.data_recorder.record_result(result_file_name, config_info, 'Timeout', 'Timeout',
+                                             fields=dict(fields, TargetPower=target_power))
+            self._complete_point(result_file_name, config_info)
+
+    def _log_wait_stats(self):
+        '''
+        该方法用于记录各信令等待的次数、耗时、恢复及超时次数。
+        '''
+        for name, stats in sorted(wait.get_stats().items()):
+            self.logger.info('Wait %s: %d times, %.1fs total, %.1fs max, %d recoveries, %d timeouts'
+                             % (name, stats['count'], stats['seconds'], stats['max_seconds'],
+                                stats['recoveries'], stats['timeouts']))
+
+    def _archive_waveform(self, config_info, current):
+        '''
+        该方法用于存档测量点的原始电流波形，电流不稳定、未测量时不存档。
+        config_info：配置说明；
+        current：_measure_point返回的平均电流。
+        '''
+        if isinstance(current, str) or not len(self.dc_source.waveform):
+            return
+        start_time, end_time = self.dc_source.waveform_times
+        self.waveform_archive.append(config_info, self.dc_source.waveform,
+                                     self.dc_source.sampling_period, start_time, end_time)
+
+    def run(self, tasklist=None):
         '''
         该方法用于依照GSM、WCDMA、LTE的顺序执行用例。
+        tasklist：待执行的任务列表，默认解析Power.xml并优化测试计划。
         '''
+        if self.log_current:
+            self.dc_source.start_logging(self.case_folder_name)
         try:
             task_func = [self.run_gsm_task, self.run_wcdma_task, self.run_lte_task]
-            tasklist = xml_parser.get_tasklist()
+            instruments = (self.cmw500._inst, self.dc_source._inst)
+            if tasklist is None:
+                # 执行前删除重复配置项，并按重配置代价排序
+                tasklist = planner.optimize_tasklist(xml_parser.get_tasklist(),
+                                                     configuration_seconds=CONFIGURATION_SECONDS)
             seq = [-1, -1, -1]
             for index, task in enumerate(tasklist):
                 if not cmp(task['Format'], 'GSM'):
@@ -207,14 +405,52 @@ class TestCase(object):
                     seq[2] = index
             for index, item in enumerate(seq):
                 if cmp(item, -1):
+                    saved_seconds = instrument.get_opc_saved_seconds(*instruments)
                     task_func[index](tasklist[item]['configuration'])
+                    self.logger.info('%s task: operation completion saved %.1fs'
+                                     % (tasklist[item]['Format'],
+                                        instrument.get_opc_saved_seconds(*instruments) -
+                                        saved_seconds))
+            # 只在正常执行结束时保存快照；异常中断时仪器状态未知，不保存，下次热启动时复位
+            self.cmw500.save_snapshot()
         except Exception, e:
             self.logger.error(e)
             self.cmw500.stop_trace()
+        finally:
+            self.dc_source.stop_logging()
 
+        self._log_wait_stats()
+        self.logger.info('Profile report: %s' % self.profiler.write_report(self.case_folder_name))
         self.data_recorder.save_xlsx()
 
 
 if __name__ == '__main__':
-    testcase = TestCase()
-    testcase.run()
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--stations', help='station inventory xml, shard the tasks across stations')
+    parser.add_argument('--sequential', action='store_true',
+                        help='measure current after the tx power measurement instead of concurrently')
+    parser.add_argument('--resume', metavar='FOLDER',
+                        help='resume an interrupted run in its case folder, skipping completed points')
+    parser.add_argument('--log-current', action='store_true',
+                        help='log the current continuously in the background for post-hoc analysis')
+    parser.add_argument('--log-level', metavar='NAME=LEVEL[,...]',
+                        help='per-class log levels, e.g. DCSource=INFO,LTE=WARNING')
+    parser.add_argument('--warm-start', action='store_true',
+                        help='skip *RST when the tester still holds the settings of the last run')
+    args = parser.parse_args()
+    if args.log_level:
+        pylogger.set_levels(args.log_level)
+    if args.stations:
+        executor.run_parallel(os.path.splitext(os.path.basename(__file__))[0],
+                              xml_parser.get_stationlist(args.stations),
+                              planner.optimize_tasklist(xml_parser.get_tasklist(),
+                                                         configuration_seconds=CONFIGURATION_SECONDS),
+                              args.log_level, args.warm_start, args.resume,
+                              {'concurrent_measurement': not args.sequential,
+                               'log_current': args.log_current})
+    else:
+        testcase = TestCase(case_folder_name=args.resume,
+                            concurrent_measurement=not args.sequential,
+                            log_current=args.log_current,
+                            warm_start=args.warm_start)
+        testcase.run()
@@ -6,56 +6,102 @@
 # 版本：V1.0
 # 变更历史:
 # 1，2018-08-28， 吴扬波——首次创建：TestCase类，用于执行传导待机电流测试用例
+# 2，2026-10-18， 吴扬波——支持指定工位、任务列表，增加--stations多工位并行执行
+# 3，2026-10-18， 吴扬波——电流测量改用ARRAY采集模式
+# 4，2026-10-18， 吴扬波——电流测量改用settle_and_measure，复用稳定观测窗内的采样
+# 5，2026-10-18， 吴扬波——电流测量按DRX周期分块、置信区间自适应结束，并记录置信区间
+# 6，2026-10-18， 吴扬波——各测量点的原始电流波形存档至WaveformArchive
+# 7，2026-10-18， 吴扬波——测量结果附带配置项字典，存入结果数据库的类型化列
+# 8，2026-10-18， 吴扬波——记录测量进度，增加--resume以原用例执行文件夹续测，跳过已完成的测量点
+# 9，2026-10-18， 吴扬波——信令等待超时时跳过该配置项并记录超时，记录各等待的耗时统计
+# 10，2026-10-18， 吴扬波——记录各指令耗时，按测试阶段汇总，执行结束后生成profile_report.txt
+# 11，2026-10-18， 吴扬波——增加--log-level，按类名设置日志级别
+# 12，2026-10-18， 吴扬波——工位设置CableLoss属性时由线损文件配置多点线损表
+# 13，2026-10-18， 吴扬波——增加--warm-start，CMW500设置项快照一致时跳过*RST，结束时保存快照
+# 14，2026-10-18， 吴扬波——置信区间目标半宽改为0.1mA，0.05mA受采样间隙影响难以达到，测量常到30s上限
+# 15，2026-10-18， 吴扬波——操作完成等待节省的时长改由instrument.get_opc_saved_seconds统计
+# 16，2026-10-18， 吴扬波——只在正常执行结束时保存CMW500快照，异常中断后下次冷启动
 # 若引用或修改API，请保留API变更历史。
 ###############################################################################
 from CMW500 import cmw500 as cmw
 from DCSource import dcsource as dcsrc
-from Utility import xml_parser, record, pylogger, global_variable
+from Utility import xml_parser, record, pylogger, global_variable, planner, executor
+from Utility import waveform_archive, journal, wait, profiler, instrument
 from datetime import datetime
+import argparse
 import sys
 import os
 
+# 平均电流置信区间（95%）的目标半宽，单位mA，达到后提前结束电流测量；约为待机电流的5%
+CURRENT_TOLERANCE = 0.1
+# 各制式的DRX周期，单位秒，用于按DRX周期分块计算置信区间：
+# LTE paging周期128帧；WCDMA DRX周期系数7，即2^7帧；GSM BS_PA_MFRMS为5，即5个51复帧
+DRX_CYCLE_SECONDS = {'LTE': 1.28, 'WCDMA': 1.28, 'GSM': 5 * 51 * 0.120 / 26}
+# 未指定工位时使用的仪器地址
+DEFAULT_STATION = {'Name': 'default', 'Tester': '192.168.2.10', 'DCSource': 'GPIB0::2::INSTR'}
+
 
 class TestCase(object):
     '''
     TestCase类，用于执行传导待机电流测试用例
     '''
 
-    def __init__(self):
-
+    def __init__(self, station=None, case_folder_name=None, warm_start=False):
+        '''
+        station：工位信息，xml_parser.get_stationlist返回的工位，默认使用本工位的仪器地址；
+        case_folder_name：用例执行文件夹，默认按当前时间创建，传入中断的用例执行文件夹时续测；
+        warm_start：是否热启动CMW500，见CMW500.__init__。
+        '''
+        self.warm_start = warm_start
         # 创建用例执行文件夹
-        case_dir = sys.path[0]
-        case_folder_name = case_dir + '.\\' + datetime.now().strftime("%Y%m%d_%H%M%S")
+        if case_folder_name is None:
+            case_dir = sys.path[0]
+            case_folder_name = case_dir + '.\\' + datetime.now().strftime("%Y%m%d_%H%M%S")
         global_variable.file_folder = case_folder_name
         try:
             os.makedirs(case_folder_name)
         except Exception as e:
             print 'folder:%s existed!' % e
+        self.case_folder_name = case_folder_name
 
         # 创建数据记录器
         self.data_recorder = record.DataRecorder()
+        # 创建原始电流波形存档，待机波形较长，读取时按需映射
+        self.waveform_archive = waveform_archive.WaveformArchive(case_folder_name)
+        # 测量进度日志，文件夹中已有进度时跳过已完成的测量点
+        self.journal = journal.ProgressJournal(case_folder_name)
         # 创建日志
         self.logger = pylogger.setup_logger(self.__class__.__name__)
         # 获得仪器控制引用
-        self.cmw500, self.dc_source = self.init_instr()
+        self.cmw500, self.dc_source = self.init_instr(station or DEFAULT_STATION)
+        # 记录初始化之后两台仪器的指令耗时，按测试阶段汇总
+        self.profiler = profiler.Profiler()
+        self.cmw500._inst.profiler = self.profiler
+        self.dc_source._inst.profiler = self.profiler
 
-    def init_instr(self):
+    def init_instr(self, station):
         '''
         根据仪器地址获取仪器控制引用，并进行初步设置
+        station：工位信息，包含CMW500地址Tester、DC Source地址DCSource，可选线损文件CableLoss
         '''
-        # 连接CMW500
-        cmw500 = cmw.CMW500('192.168.2.10')
+        # 连接CMW500，热启动时沿用上次的设置
+        cmw500 = cmw.CMW500(station['Tester'], self.warm_start)
         # 在仪器界面上显示指令流
         cmw500.start_trace()
         # 设置信号路由
         cmw500.set_signal_routing('1', '1')
-        # 配置线损表
-        cmw500.set_correction_table('800', '0.4', '1800', '0.6')
+        # 配置线损表，工位指定线损文件时使用各频点的实测线损
+        if station.get('CableLoss'):
+            cmw500.load_correction_table(station['CableLoss'])
+        else:
+            cmw500.set_correction_table('800', '0.4', '1800', '0.6')
 
         # 连接DC Source
-        dc_source = dcsrc.DCSource('GPIB0::2::INSTR')
+        dc_source = dcsrc.DCSource(station['DCSource'])
         # 配置电源电压
         dc_source.set_voltage(4)
+        # 以二进制块读取采样序列
+        dc_source.set_acquisition_mode('ARRAY')
         # 设置量程
         dc_source.set_measure_current_range('1A')
         # 使能输出
@@ -74,33 +120,49 @@ class TestCase(object):
         is_first_loop = True
         # 遍历配置列表中的配置项
         for item in configuration:
-            # 配置频段、信道、带宽
-            self.cmw500.lte.set_downlink_channel(item['Band'], item['DlChannel'], item['Bandwidth'])
-            # 配置RB数量、位置
-            self.cmw500.lte.config_rmc(item['RbNumber'], item['RbPosition'])
-            # 首次运行时设置下行信号强度、UE开环功率
-            if is_first_loop:
-                self.cmw500.lte.set_rsep_level('-85')
-                self.cmw500.lte.set_openloop_power('20')
-                # 设置paging周期
-                self.cmw500.lte.set_paging_cycle()
-                # UE附着网络后，断开RRC连接
-                self.cmw500.lte.disable_rrc_connection_after_attach()
-                # 使能输出
-                self.cmw500.lte.enable_output()
-                # 等待UE附着网络
-                self.cmw500.lte.attach()
-                is_first_loop = False
-
-            # 测量电流
-            if self.dc_source.check_current_stability(60, 10, 0.5):
-                current = self.dc_source.measure_current(30)
-            else:
-                current = 'Current unstable'
             config_info = '@Band:%s, DLCH:%s, BW:%sMHz' % (
                 item['Band'], item['DlChannel'], item['Bandwidth'])
-            actual_power = 'INV'
-            self.data_recorder.record_result('LTE_standby.txt', config_info, actual_power, current)
+            # 续测时跳过已完成的配置项
+            if self.journal.is_done('LTE_standby.txt', config_info):
+                continue
+            try:
+                with self.profiler.phase('channel set'):
+                    # 配置频段、信道、带宽
+                    self.cmw500.lte.set_downlink_channel(item['Band'], item['DlChannel'],
+                                                         item['Bandwidth'])
+                    # 配置RB数量、位置
+                    self.cmw500.lte.config_rmc(item['RbNumber'], item['RbPosition'])
+                # 首次运行时设置下行信号强度、UE开环功率
+                if is_first_loop:
+                    self.cmw500.lte.set_rsep_level('-85')
+                    self.cmw500.lte.set_openloop_power('20')
+                    # 设置paging周期
+                    self.cmw500.lte.set_paging_cycle()
+                    # UE附着网络后，断开RRC连接
+                    self.cmw500.lte.disable_rrc_connection_after_attach()
+                    with self.profiler.phase('attach'):
+                        # 使能输出
+                        self.cmw500.lte.enable_output()
+                        # 等待UE附着网络
+                        self.cmw500.lte.attach()
+                    is_first_loop = False
+
+                # 测量电流
+                current, _ = self.dc_source.settle_and_measure(
+                    30, 60, 10, 0.5, tolerance=CURRENT_TOLERANCE,
+                    block_seconds=DRX_CYCLE_SECONDS['LTE'])
+                if current is None:
+                    current = 'Current unstable'
+                actual_power = 'INV'
+                self.data_recorder.record_result('LTE_standby.txt', config_info, actual_power,
+                                                 current, self.dc_source.confidence_interval,
+                                                 dict(item, Format='LTE_FDD'))
+                self._archive_waveform(config_info, current)
+                self._complete_point('LTE_standby.txt', config_info)
+            except wait.WaitTimeout, e:
+                # 信令等待超时且恢复无效，跳过该配置项，下一配置项重新等待UE驻网
+                self._skip_point('LTE_standby.txt', config_info, dict(item, Format='LTE_FDD'), e)
+                is_first_loop = True
 
         # 测试结束后关闭输出
         self.cmw500.lte.disable_output()
@@ -117,29 +179,43 @@ class TestCase(object):
         is_first_loop = True
         # 遍历配置列表中的配置项
         for item in configuration:
-            # 配置频段、信道、带宽
-            self.cmw500.wcdma.set_downlink_channel(item['Band'], item['DlChannel'])
-            # 首次运行
-            if is_first_loop:
-                # 设置下行功率
-                self.cmw500.wcdma.set_downlink_power('-80')
-                # 配置DRX周期
-                self.cmw500.wcdma.set_prach_drxcycle('7')
-                # 使能输出
-                self.cmw500.wcdma.enable_output()
-                # 等待UE注册网络
-                self.cmw500.wcdma.register()
-                is_first_loop = False
-
-            # 测量电流
-            if self.dc_source.check_current_stability(60, 10, 0.5):
-                current = self.dc_source.measure_current(30)
-            else:
-                current = 'Current unstable'
             config_info = '@Band:%s, DLCH:%s' % (item['Band'], item['DlChannel'])
-            actual_power = 'INV'
-            self.data_recorder.record_result('WCDMA_standby.txt',
-                                             config_info, actual_power, current)
+            # 续测时跳过已完成的配置项
+            if self.journal.is_done('WCDMA_standby.txt', config_info):
+                continue
+            try:
+                # 配置频段、信道、带宽
+                with self.profiler.phase('channel set'):
+                    self.cmw500.wcdma.set_downlink_channel(item['Band'], item['DlChannel'])
+                # 首次运行
+                if is_first_loop:
+                    # 设置下行功率
+                    self.cmw500.wcdma.set_downlink_power('-80')
+                    # 配置DRX周期
+                    self.cmw500.wcdma.set_prach_drxcycle('7')
+                    with self.profiler.phase('attach'):
+                        # 使能输出
+                        self.cmw500.wcdma.enable_output()
+                        # 等待UE注册网络
+                        self.cmw500.wcdma.register()
+                    is_first_loop = False
+
+                # 测量电流
+                current, _ = self.dc_source.settle_and_measure(
+                    30, 60, 10, 0.5, tolerance=CURRENT_TOLERANCE,
+                    block_seconds=DRX_CYCLE_SECONDS['WCDMA'])
+                if current is None:
+                    current = 'Current unstable'
+                actual_power = 'INV'
+                self.data_recorder.record_result('WCDMA_standby.txt', config_info, actual_power,
+                                                 current, self.dc_source.confidence_interval,
+                                                 dict(item, Format='WCDMA'))
+                self._archive_waveform(config_info, current)
+                self._complete_point('WCDMA_standby.txt', config_info)
+            except wait.WaitTimeout, e:
+                # 信令等待超时且恢复无效，跳过该配置项，下一配置项重新等待UE驻网
+                self._skip_point('WCDMA_standby.txt', config_info, dict(item, Format='WCDMA'), e)
+                is_first_loop = True
 
         # 测试结束后关闭输出
         self.cmw500.wcdma.disable_output()
@@ -157,6 +233,10 @@ class TestCase(object):
         is_first_loop = True
         # 遍历配置列表中的配置项
         for item in configuration:
+            config_info = '@Band:%s, DLCH:%s' % (item['Band'], item['DlChannel'])
+            # 续测时跳过已完成的配置项
+            if self.journal.is_done('GSM_standby.txt', config_info):
+                continue
             # 首次运行配置BCCH的频段、下行功率，并使能输出建立与UE的通话连接
             if is_first_loop:
                 self.cmw500.gsm.set_bcch_level('-80')
@@ -165,33 +245,85 @@ class TestCase(object):
                 self.cmw500.gsm.disable_dtx()
                 is_first_loop = False
 
-            if cmp(ex_band, item['Band']):
-                ex_band = item['Band']
-                self.cmw500.gsm.disable_output()
-                self.cmw500.gsm.set_bcch_downlink_channel(item['Band'], item['DlChannel'])
-                self.cmw500.gsm.enable_output()
-                self.cmw500.gsm.synchronize()
-            self.cmw500.gsm.set_tch_downlink_channel(item['DlChannel'])
-
-            # 测量电流
-            actual_power = 'INV'
-            if self.dc_source.check_current_stability(60):
-                current = self.dc_source.measure_current(30)
-            else:
-                current = 'Current unstable'
-            config_info = '@Band:%s, DLCH:%s' % (item['Band'], item['DlChannel'])
-            self.data_recorder.record_result('GSM_standby.txt', config_info, actual_power, current)
+            try:
+                if cmp(ex_band, item['Band']):
+                    ex_band = item['Band']
+                    with self.profiler.phase('attach'):
+                        self.cmw500.gsm.disable_output()
+                        self.cmw500.gsm.set_bcch_downlink_channel(item['Band'], item['DlChannel'])
+                        self.cmw500.gsm.enable_output()
+                        self.cmw500.gsm.synchronize()
+                with self.profiler.phase('channel set'):
+                    self.cmw500.gsm.set_tch_downlink_channel(item['DlChannel'])
+
+                # 测量电流
+                actual_power = 'INV'
+                current, _ = self.dc_source.settle_and_measure(
+                    30, 60, tolerance=CURRENT_TOLERANCE, block_seconds=DRX_CYCLE_SECONDS['GSM'])
+                if current is None:
+                    current = 'Current unstable'
+                self.data_recorder.record_result('GSM_standby.txt', config_info, actual_power,
+                                                 current, self.dc_source.confidence_interval,
+                                                 dict(item, Format='GSM'))
+                self._archive_waveform(config_info, current)
+                self._complete_point('GSM_standby.txt', config_info)
+            except wait.WaitTimeout, e:
+                # 信令等待超时且恢复无效，跳过该配置项，下一配置项重新同步
+                self._skip_point('GSM_standby.txt', config_info, dict(item, Format='GSM'), e)
+                ex_band = ''
 
         # 测试结束后关闭输出
         self.cmw500.gsm.disable_output()
 
-    def run(self):
+    def _complete_point(self, result_file_name, config_info):
+        '''
+        该方法用于提交测量结果后，在进度日志中记录测量点已完成。
+        '''
+        self.data_recorder.flush()
+        self.journal.mark_done(result_file_name, config_info)
+
+    def _skip_point(self, result_file_name, config_info, fields, error):
+        '''
+        该方法用于信令等待超时后，将测量点的功率、电流记录为'Timeout'，并记录为已完成，
+        续测时不再重复等待。
+        '''
+        self.logger.error('%s, skip %s' % (error, config_info))
+        self.data_recorder.record_result(result_file_name, config_info, 'Timeout', 'Timeout',
+                                         fields=fields)
+        self._complete_point(result_file_name, config_info)
+
+    def _log_wait_stats(self):
+        '''
+        该方法用于记录各信令等待的次数、耗时、恢复及超时次数。
+        '''
+        for name, stats in sorted(wait.get_stats().items()):
+            self.logger.info('Wait %s: %d times, %.1fs total, %.1fs max, %d recoveries, %d timeouts'
+                             % (name, stats['count'], stats['seconds'], stats['max_seconds'],
+                                stats['recoveries'], stats['timeouts']))
+
+    def _archive_waveform(self, config_info, current):
+        '''
+        该方法用于存档测量点的原始电流波形，电流不稳定时不存档。
+        config_info：配置说明；
+        current：平均电流。
+        '''
+        if isinstance(current, str) or not len(self.dc_source.waveform):
+            return
+        start_time, end_time = self.dc_source.waveform_times
+        self.waveform_archive.append(config_info, self.dc_source.waveform,
+                                     self.dc_source.sampling_period, start_time, end_time)
+
+    def run(self, tasklist=None):
         '''
         该方法用于依照GSM、WCDMA、LTE的顺序执行用例。
+        tasklist：待执行的任务列表，默认解析Power.xml并优化测试计划。
         '''
         try:
             task_func = [self.run_gsm_task, self.run_wcdma_task, self.run_lte_task]
-            tasklist = xml_parser.get_tasklist()
+            instruments = (self.cmw500._inst, self.dc_source._inst)
+            if tasklist is None:
+                # 执行前删除重复配置项，并按重配置代价排序
+                tasklist = planner.optimize_tasklist(xml_parser.get_tasklist())
             seq = [-1, -1, -1]
             for index, task in enumerate(tasklist):
                 if not cmp(task['Format'], 'GSM'):
@@ -202,14 +334,40 @@ class TestCase(object):
                     seq[2] = index
             for index, item in enumerate(seq):
                 if cmp(item, -1):
+                    saved_seconds = instrument.get_opc_saved_seconds(*instruments)
                     task_func[index](tasklist[item]['configuration'])
+                    self.logger.info('%s task: operation completion saved %.1fs'
+                                     % (tasklist[item]['Format'],
+                                        instrument.get_opc_saved_seconds(*instruments) -
+                                        saved_seconds))
+            # 只在正常执行结束时保存快照；异常中断时仪器状态未知，不保存，下次热启动时复位
+            self.cmw500.save_snapshot()
         except Exception, e:
             self.logger.error(e)
             self.cmw500.stop_trace()
 
+        self._log_wait_stats()
+        self.logger.info('Profile report: %s' % self.profiler.write_report(self.case_folder_name))
         self.data_recorder.save_xlsx()
 
 
 if __name__ == '__main__':
-    testcase = TestCase()
-    testcase.run()
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--stations', help='station inventory xml, shard the tasks across stations')
+    parser.add_argument('--resume', metavar='FOLDER',
+                        help='resume an interrupted run in its case folder, skipping completed points')
+    parser.add_argument('--log-level', metavar='NAME=LEVEL[,...]',
+                        help='per-class log levels, e.g. DCSource=INFO,LTE=WARNING')
+    parser.add_argument('--warm-start', action='store_true',
+                        help='skip *RST when the tester still holds the settings of the last run')
+    args = parser.parse_args()
+    if args.log_level:
+        pylogger.set_levels(args.log_level)
+    if args.stations:
+        executor.run_parallel(os.path.splitext(os.path.basename(__file__))[0],
+                              xml_parser.get_stationlist(args.stations),
+                              planner.optimize_tasklist(xml_parser.get_tasklist()),
+                              args.log_level, args.warm_start, args.resume)
+    else:
+        testcase = TestCase(case_folder_name=args.resume, warm_start=args.warm_start)
+        testcase.run()
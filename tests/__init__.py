@@ -0,0 +1,8 @@
+# -*- coding:utf-8 -*-
+from Utility import global_variable
+import logging
+import tempfile
+
+# 日志文件写入临时文件夹，不在仓库中生成；用例中预期的告警不输出
+global_variable.file_folder = tempfile.mkdtemp() + '/'
+logging.disable(logging.WARNING)
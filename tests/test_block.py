@@ -0,0 +1,94 @@
+# -*- coding:utf-8 -*-
+###############################################################################
+# Copyright (C), 2018, TP-LINK Technologies Co., Ltd.
+#
+# 作者：吴扬波
+# 版本：V1.0
+# 变更历史:
+# 1，2026-10-18， 吴扬波——首次创建：read_message在数据中含有终止符字节时的分段读取
+# 2，2026-10-18， 吴扬波——增加Instrument.query_binary直接读取visa资源时的用例
+# 若引用或修改API，请保留API变更历史。
+###############################################################################
+from Utility import block, instrument, visa_backend
+import struct
+import unittest
+
+# 最低字节为0x0A的单精度浮点数
+LF_VALUE = struct.unpack('<f', '\x0a\x00\x80\x3f')[0]
+
+
+def _format_block(data):
+    length = str(len(data))
+    return '#%d%s%s' % (len(length), length, data)
+
+
+class _SplitResource(object):
+    '''
+    模拟设置了read_termination的visa资源：read_raw读到终止符字节即返回。
+    '''
+
+    def __init__(self, message=''):
+        self.read_termination = '\n'
+        self.reads = 0
+        self.written = []
+        self._pending = message
+
+    def write(self, message):
+        self.written.append(message)
+        return len(message), 0
+
+    def read_raw(self):
+        self.reads += 1
+        size = len(self._pending)
+        if self.read_termination:
+            size = self._pending.find(self.read_termination) + 1 or size
+        data, self._pending = self._pending[:size], self._pending[size:]
+        return data
+
+
+class ReadMessageTest(unittest.TestCase):
+
+    def test_terminator_in_data(self):
+        data = struct.pack('<4f', 1.0, LF_VALUE, 2.0, LF_VALUE)
+        message = _format_block(data) + '\n'
+        resource = _SplitResource(message)
+        self.assertEqual(block.read_message(resource.read_raw), message)
+        self.assertEqual(resource.reads, 3)
+        self.assertEqual(list(block.read_block_array(message, '<f4')), [1.0, LF_VALUE, 2.0, LF_VALUE])
+
+    def test_multiple_blocks(self):
+        message = '%s,%s\n' % (_format_block('\n#\n#'), _format_block('ab\n'))
+        resource = _SplitResource(message)
+        self.assertEqual(block.read_message(resource.read_raw), message)
+        self.assertEqual(resource.read_raw(), '')
+
+    def test_header_split(self):
+        message = _format_block('x' * 1000) + '\n'
+        chunks = [message[:3], message[3:500], message[500:]]
+        self.assertEqual(block.read_message(lambda: chunks.pop(0)), message)
+
+    def test_ascii_response(self):
+        resource = _SplitResource('+1.00000E-01,+2.00000E-01\n')
+        self.assertEqual(block.read_message(resource.read_raw), '+1.00000E-01,+2.00000E-01\n')
+
+    def test_read_block_message(self):
+        message = _format_block(struct.pack('<2f', LF_VALUE, LF_VALUE)) + '\n'
+        resource = _SplitResource(message)
+        self.assertEqual(visa_backend.read_block_message(resource), message)
+        self.assertEqual(resource.reads, 1)
+        self.assertEqual(resource.read_termination, '\n')
+
+
+class QueryBinaryTest(unittest.TestCase):
+
+    def test_resource_without_query_raw(self):
+        values = [LF_VALUE, 2.0, LF_VALUE]
+        resource = _SplitResource(_format_block(struct.pack('<3f', *values)) + '\n')
+        inst = instrument.Instrument(resource, 'DCSource')
+        self.assertEqual(list(inst.query_binary('FETC:ARR:CURR?')), values)
+        self.assertEqual(resource.written, ['FETC:ARR:CURR?'])
+        self.assertEqual(resource.read_termination, '\n')
+
+
+if __name__ == '__main__':
+    unittest.main()
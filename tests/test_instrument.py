@@ -0,0 +1,181 @@
+# -*- coding:utf-8 -*-
+###############################################################################
+# Copyright (C), 2018, TP-LINK Technologies Co., Ltd.
+#
+# 作者：吴扬波
+# 版本：V1.0
+# 变更历史:
+# 1，2026-10-18， 吴扬波——首次创建：影子缓存的回读查询
+# 2，2026-10-18， 吴扬波——增加仪器报告错误时读空错误队列的用例
+# 3，2026-10-18， 吴扬波——增加等待操作完成时超时、链路断开的用例
+# 4，2026-10-18， 吴扬波——增加批量写入的用例
+# 若引用或修改API，请保留API变更历史。
+###############################################################################
+from Utility import instrument, scpi, visa_backend
+import unittest
+
+
+class FakeVisaError(Exception):
+
+    def __init__(self, error_code):
+        Exception.__init__(self, 'visa error %d' % error_code)
+        self.error_code = error_code
+
+
+class FakeResource(object):
+    '''
+    记录收发指令的visa资源，设置项按写入值保存，responses中的值优先作为查询的返回值。
+    '''
+
+    def __init__(self, responses=None):
+        self.timeout = 2000
+        self.read_termination = '\n'
+        self.settings = {}
+        self.responses = dict(responses or {})
+        self.written = []
+        self.queried = []
+
+    def write(self, message):
+        self.written.append(message)
+        for header, args in scpi.parse_message(message):
+            self.settings[header] = args
+        return len(message), 0
+
+    def query(self, message):
+        self.queried.append(message)
+        header = scpi.parse_message(message)[0][0]
+        response = self.responses.get(header)
+        if isinstance(response, Exception):
+            raise response
+        if isinstance(response, list):
+            return response.pop(0)
+        if response is not None:
+            return response
+        return self.settings.get(header.rstrip('?'), '')
+
+    def close(self):
+        pass
+
+
+class CacheTest(unittest.TestCase):
+
+    def test_written_setting_read_back_once(self):
+        # 仪器把写入的'-50.5'按自身格式返回，回读得到的应为仪器实际生效的值
+        resource = FakeResource({'CONF:LTE:SIGN:DL:RSEP:LEV?': '-5.050000E+001'})
+        inst = instrument.Instrument(resource, 'CMW500')
+        inst.write('CONFigure:LTE:SIGN:DL:RSEPre:LEVel -50.5')
+        self.assertEqual(inst.query('CONF:LTE:SIGN:DL:RSEP:LEV?'), '-5.050000E+001')
+        self.assertEqual(inst.query('CONF:LTE:SIGN:DL:RSEP:LEV?'), '-5.050000E+001')
+        self.assertEqual(len(resource.queried), 1)
+        # 再次写入后重新回读
+        inst.write('CONFigure:LTE:SIGN:DL:RSEPre:LEVel -60')
+        inst.query('CONF:LTE:SIGN:DL:RSEP:LEV?')
+        self.assertEqual(len(resource.queried), 2)
+
+    def test_read_back_cached(self):
+        resource = FakeResource({'CONF:LTE:SIGN:BAND?': 'OB1'})
+        inst = instrument.Instrument(resource, 'CMW500')
+        self.assertEqual(inst.query('CONFigure:LTE:SIGN:BAND?'), 'OB1')
+        self.assertEqual(inst.query('CONF:LTE:SIGN:BAND?'), 'OB1')
+        self.assertEqual(len(resource.queried), 1)
+
+    def test_same_setting_skipped(self):
+        resource = FakeResource()
+        inst = instrument.Instrument(resource, 'CMW500')
+        inst.write('CONFigure:LTE:SIGN:BAND OB1')
+        inst.write('CONF:LTE:SIGN:BAND ob1')
+        self.assertEqual(resource.written, ['CONFigure:LTE:SIGN:BAND OB1'])
+
+
+class ErrorQueueTest(unittest.TestCase):
+
+    def test_drain_error_queue(self):
+        resource = FakeResource({
+            '*OPC?': '1;+16',
+            'SYST:ERR?': ['-222,"Data out of range"', '-221,"Settings conflict"',
+                          '+0,"No error"']})
+        inst = instrument.Instrument(resource, 'CMW500')
+        inst.write('CONFigure:LTE:SIGN:BAND OB99')
+        inst.wait_for_operation_done()
+        self.assertEqual(resource.queried.count('SYSTem:ERRor?'), 3)
+        # 被拒绝的设置项已从缓存中清除，再次写入时发往仪器
+        inst.write('CONFigure:LTE:SIGN:BAND OB99')
+        self.assertEqual(len(resource.written), 2)
+
+    def test_error_queue_limit(self):
+        resource = FakeResource({'*OPC?': '1;+32', 'SYST:ERR?': '-100,"Command error"'})
+        inst = instrument.Instrument(resource, 'CMW500')
+        inst.write('CONFigure:LTE:SIGN:BAND OB1')
+        inst.wait_for_operation_done()
+        self.assertEqual(resource.queried.count('SYSTem:ERRor?'), instrument.MAX_ERROR_QUEUE_LENGTH)
+
+
+class OperationDoneTest(unittest.TestCase):
+
+    def test_timeout(self):
+        resource = FakeResource({'*OPC?': FakeVisaError(visa_backend.TIMEOUT_ERROR_CODE)})
+        inst = instrument.Instrument(resource, 'CMW500')
+        inst.write('CONFigure:LTE:SIGN:BAND OB1')
+        self.assertRaises(instrument.OperationTimeoutError, inst.wait_for_operation_done, 5)
+        self.assertEqual(resource.timeout, 2000)
+
+    def test_link_error(self):
+        error = FakeVisaError(visa_backend.LINK_ERROR_CODES[0])
+        resource = FakeResource({'*OPC?': error})
+        inst = instrument.Instrument(resource, 'CMW500')
+        inst.write('CONFigure:LTE:SIGN:BAND OB1')
+        try:
+            inst.wait_for_operation_done()
+        except Exception, e:
+            self.assertIs(e, error)
+        else:
+            self.fail('link error not raised')
+        # 出错时仪器状态未知，影子缓存已清除
+        inst.write('CONFigure:LTE:SIGN:BAND OB1')
+        self.assertEqual(len(resource.written), 2)
+
+    def test_saved_seconds(self):
+        resource = FakeResource({'*OPC?': '1;0'})
+        cmw, dc = instrument.Instrument(resource, 'CMW500'), instrument.Instrument(resource, 'DC')
+        cmw.write('CONFigure:LTE:SIGN:BAND OB1')
+        cmw.wait_for_operation_done()
+        # 没有挂起的操作时不等待，不计节省的时长
+        dc.wait_for_operation_done()
+        self.assertAlmostEqual(instrument.get_opc_saved_seconds(cmw, dc),
+                               instrument.LEGACY_POLL_INTERVAL)
+
+
+class BatchTest(unittest.TestCase):
+
+    def test_merged_wait(self):
+        resource = FakeResource({'*OPC?': '1;0'})
+        inst = instrument.Instrument(resource, 'CMW500')
+        with inst.batch():
+            inst.write('CONFigure:LTE:SIGN:BAND OB1')
+            inst.wait_for_operation_done()
+            inst.write('CONFigure:LTE:SIGN:RFSettings:CHANnel:DL 300')
+            inst.wait_for_operation_done()
+        self.assertEqual(resource.written,
+                         [':CONFigure:LTE:SIGN:BAND OB1;:CONFigure:LTE:SIGN:RFSettings:CHANnel:DL 300'])
+        self.assertEqual(resource.queried, ['*OPC?;*ESR?'])
+        self.assertAlmostEqual(inst.opc_stats['saved_seconds'], instrument.LEGACY_POLL_INTERVAL)
+
+    def test_discard_on_exception(self):
+        resource = FakeResource({'*OPC?': '1;0'})
+        inst = instrument.Instrument(resource, 'CMW500')
+        try:
+            with inst.batch():
+                inst.write('CONFigure:LTE:SIGN:BAND OB1')
+                inst.wait_for_operation_done()
+                raise ValueError('abort')
+        except ValueError:
+            pass
+        self.assertEqual(resource.written, [])
+        self.assertEqual(resource.queried, [])
+        # 丢弃的设置项不在缓存中，再次写入时发往仪器
+        inst.write('CONFigure:LTE:SIGN:BAND OB1')
+        self.assertEqual(resource.written, ['CONFigure:LTE:SIGN:BAND OB1'])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,49 @@
+# -*- coding:utf-8 -*-
+###############################################################################
+# Copyright (C), 2018, TP-LINK Technologies Co., Ltd.
+#
+# 作者：吴扬波
+# 版本：V1.0
+# 变更历史:
+# 1，2026-10-18， 吴扬波——首次创建：指令头规范化
+# 若引用或修改API，请保留API变更历史。
+###############################################################################
+from Utility import scpi
+import unittest
+
+
+class NormalizeNodeTest(unittest.TestCase):
+
+    def test_mixed_case(self):
+        self.assertEqual(scpi.normalize_node('CONFigure'), 'CONF')
+        self.assertEqual(scpi.normalize_node('MODulation'), 'MOD')
+
+    def test_long_keyword(self):
+        self.assertEqual(scpi.normalize_node('CONFIGURE'), 'CONF')
+        self.assertEqual(scpi.normalize_node('modulation'), 'MOD')
+        self.assertEqual(scpi.normalize_node('voltage'), 'VOLT')
+
+    def test_short_keyword(self):
+        # 不超过4个字母的关键字本身即为短格式，第4个字母为元音时不截取
+        self.assertEqual(scpi.normalize_node('MODE'), 'MODE')
+        self.assertEqual(scpi.normalize_node('mode'), 'MODE')
+        self.assertEqual(scpi.normalize_node('DATA'), 'DATA')
+        self.assertEqual(scpi.normalize_node('BASE'), 'BASE')
+        self.assertNotEqual(scpi.normalize_node('MODE'), scpi.normalize_node('MODulation'))
+
+    def test_suffix(self):
+        self.assertEqual(scpi.normalize_node('OUTPut1'), 'OUTP1')
+        self.assertEqual(scpi.normalize_node('output1'), 'OUTP1')
+        self.assertEqual(scpi.normalize_node('FILE1'), 'FILE1')
+
+
+class NormalizeHeaderTest(unittest.TestCase):
+
+    def test_header(self):
+        self.assertEqual(scpi.normalize_header('FORMat:BASE:DATA'), 'FORM:BASE:DATA')
+        self.assertEqual(scpi.normalize_header(':TRACe:REMote:MODE:FILE1:ENABle?'),
+                         'TRAC:REM:MODE:FILE1:ENAB?')
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,111 @@
+# -*- coding:utf-8 -*-
+###############################################################################
+# Copyright (C), 2018, TP-LINK Technologies Co., Ltd.
+#
+# 作者：吴扬波
+# 版本：V1.0
+# 变更历史:
+# 1，2026-10-18， 吴扬波——首次创建：SequentialMean置信区间、自适应测量的提前结束
+# 若引用或修改API，请保留API变更历史。
+###############################################################################
+from DCSource import dcsource, stability
+import contextlib
+import math
+import random
+import unittest
+
+
+class SequentialMeanTest(unittest.TestCase):
+
+    def test_half_width(self):
+        statistics = stability.SequentialMean(1)
+        statistics.add_samples([1.0, 2.0, 3.0, 4.0, 5.0])
+        self.assertEqual(statistics.count, 5)
+        self.assertAlmostEqual(statistics.mean(), 3.0)
+        # 样本标准差sqrt(2.5)，标准误差sqrt(0.5)，t(0.975, 4) = 2.776
+        self.assertAlmostEqual(statistics.half_width(0.95), 2.776 * math.sqrt(0.5), delta=0.01)
+
+    def test_half_width_large_freedom(self):
+        # 自由度很大时t分布趋近正态分布，0.975分位数约为1.960
+        self.assertAlmostEqual(stability.t_quantile(0.975, 10000), 1.960, delta=0.001)
+        self.assertAlmostEqual(stability.t_quantile(0.975, 10), 2.228, delta=0.005)
+
+    def test_too_few_blocks(self):
+        statistics = stability.SequentialMean(4)
+        self.assertEqual(statistics.half_width(), None)
+        statistics.add_samples([1.0, 1.0, 3.0, 3.0, 5.0])
+        self.assertEqual(statistics.count, 1)
+        self.assertAlmostEqual(statistics.mean(), 2.0)
+        self.assertEqual(statistics.half_width(), None)
+
+    def test_weighted_samples(self):
+        # 每个值代表2个采样点，4个值组成2个分块
+        statistics = stability.SequentialMean(4)
+        statistics.add_samples([1.0, 3.0, 5.0, 7.0], weight=2)
+        self.assertEqual(statistics.count, 2)
+        self.assertAlmostEqual(statistics.mean(), 4.0)
+
+    def test_constant(self):
+        statistics = stability.SequentialMean(2)
+        statistics.add_samples([0.1] * 20)
+        self.assertAlmostEqual(statistics.half_width(), 0.0)
+
+
+class _FakeInstrument(object):
+
+    @contextlib.contextmanager
+    def phase(self, name):
+        yield self
+
+
+class ReadSweepsUntilTest(unittest.TestCase):
+    BLOCK_SIZE = 8
+    SWEEP_POINTS = 4
+
+    def _create_source(self, signal):
+        '''
+        创建不连接仪器的DCSource，_read_sweep依次返回signal生成的采样值。
+        '''
+        source = dcsource.DCSource.__new__(dcsource.DCSource)
+        source._inst = _FakeInstrument()
+        source.sweep_count = 0
+
+        def read_sweep():
+            source.sweep_count += 1
+            return [signal() for _ in range(self.SWEEP_POINTS)], 1
+        source._read_sweep = read_sweep
+        return source
+
+    def test_constant_stops_at_min_blocks(self):
+        source = self._create_source(lambda: 0.1)
+        statistics = stability.SequentialMean(self.BLOCK_SIZE)
+        sweeps = source._read_sweeps_until(statistics, 0.5, 0.95, 0, 1000)
+        self.assertEqual(statistics.count, dcsource.MIN_BLOCKS)
+        self.assertEqual(sum(len(samples) for samples, weight in sweeps),
+                         dcsource.MIN_BLOCKS * self.BLOCK_SIZE)
+
+    def test_min_samples(self):
+        source = self._create_source(lambda: 0.1)
+        statistics = stability.SequentialMean(self.BLOCK_SIZE)
+        source._read_sweeps_until(statistics, 0.5, 0.95, 10 * self.BLOCK_SIZE, 1000)
+        self.assertEqual(statistics.count, 10)
+
+    def test_noise_runs_to_cap(self):
+        rand = random.Random(0)
+        source = self._create_source(lambda: 0.1 + rand.gauss(0.0, 0.01))
+        statistics = stability.SequentialMean(self.BLOCK_SIZE)
+        sweeps = source._read_sweeps_until(statistics, 0.001, 0.95, 0, 400)
+        self.assertEqual(sum(len(samples) for samples, weight in sweeps), 400)
+
+    def test_already_satisfied(self):
+        source = self._create_source(lambda: 0.1)
+        statistics = stability.SequentialMean(self.BLOCK_SIZE)
+        statistics.add_samples([0.1] * (dcsource.MIN_BLOCKS * self.BLOCK_SIZE))
+        sweeps = source._read_sweeps_until(statistics, 0.5, 0.95, 0, 1000,
+                                           dcsource.MIN_BLOCKS * self.BLOCK_SIZE)
+        self.assertEqual(sweeps, [])
+        self.assertEqual(source.sweep_count, 0)
+
+
+if __name__ == '__main__':
+    unittest.main()